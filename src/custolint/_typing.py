@@ -1,8 +1,8 @@
 """
 Keep here all custom data type used within this package
 """
-from typing import (Callable, Dict, NamedTuple, Sequence, Tuple, TypedDict,
-                    Union)
+from typing import (Callable, Dict, MutableMapping, NamedTuple, Sequence,
+                    Tuple, TypedDict, Union)
 
 from datetime import datetime
 from pathlib import Path
@@ -52,7 +52,10 @@ class Blame(NamedTuple):
             int(porcelain[3].replace('author-time ', ''))
         ).strftime('%Y-%m-%d')
 
-        file_name = porcelain[10].split()[-1]
+        # optional ``previous`` and ``boundary`` lines come before the file name
+        file_name = next(
+            line for line in porcelain[10:] if line.startswith('filename ')
+        ).split(maxsplit=1)[1]
 
         return cls(
             author=author,
@@ -92,7 +95,7 @@ class Coverage(NamedTuple):
 
 Changes: TypeAlias = Dict[str, Dict[int, Contributor]]
 
-FiltersType: TypeAlias = Callable[[Path, str, int, Dict[Path, Sequence[str]]], bool]
+FiltersType: TypeAlias = Callable[[Path, str, int, MutableMapping[Path, Sequence[str]]], bool]
 LogLine: TypeAlias = Union[FiltersType, Lint]
 
 __all__ = [
@@ -0,0 +1,411 @@
+"""
+Caches of custolint, kept in a :py:class:`Storage` shared by the runs and the CI runners.
+
+Lint results
+------------
+
+The messages of a file depend only on its content, the tool version and configuration,
+so the key is the normalized path and the git blob id of the file within a namespace of
+``(tool name, tool version, configuration file content, command)``, see :py:func:`namespace`.
+The messages are reported with the file name, so two files of the same content
+do not share their entry.
+
+The cached messages are the raw ``(file_name, line_number, message)`` fields,
+they still go through the git changes intersection and the filters chain.
+
+.. note:: the messages depending on other modules, e.g. ``duplicate-code`` or
+    inferred members of an imported module, are refreshed only when the file itself changes.
+
+Blame records and changes snapshots
+-----------------------------------
+
+The blames of a file and the blamed changes of a diff are keyed by the ``HEAD`` commit,
+see :py:mod:`custolint.git`. The lines not committed yet are never kept,
+since they are blamed with the current date.
+
+Mypy cache
+----------
+
+The mypy incremental cache of the target branch is archived into the storage,
+see :py:mod:`custolint.mypycache`.
+
+Storage
+-------
+
+- :py:class:`DirectoryStorage`: the ``entries`` directory of ``CUSTOLINT_CACHE_DIR``,
+  a local or a shared directory, bounded by ``CUSTOLINT_CACHE_SIZE`` bytes,
+  the least recently used entries are evicted. The mypy cache and the mypy daemon status
+  are kept next to it, they are never evicted
+- :py:class:`HttpStorage`: a plain HTTP ``GET``/``PUT`` store ``CUSTOLINT_CACHE_URL``,
+  e.g. shared by the CI runners, the requests time out after ``CUSTOLINT_CACHE_TIMEOUT`` seconds
+
+The entries are written atomically, a concurrent run never reads a partial entry.
+Disable the caches with ``--no-cache`` or ``CUSTOLINT_NO_CACHE`` environment variable.
+"""
+from typing import (Any, Dict, Iterable, List, Optional, Sequence, Tuple,
+                    Union)
+
+import abc
+import hashlib
+import http.client
+import json
+import logging
+import os
+import tempfile
+import urllib.error
+import urllib.request
+from importlib import metadata
+from pathlib import Path
+from stat import S_ISREG
+
+from . import env
+
+LOG = logging.getLogger(__name__)
+
+Messages = List[Tuple[str, int, str]]
+
+ENABLED = not env.NO_CACHE
+# the directory of the entries within the cache directory
+STORAGE_DIR = 'entries'
+# the kinds of entries, see key
+KINDS = ('blame', 'changes', 'combined', 'imports', 'lint', 'mypy')
+
+
+class Storage(abc.ABC):
+    """
+    Entries of the caches by key, alike ``lint/4f/4f7d....json``
+    """
+
+    @abc.abstractmethod
+    def get(self, entry_key: str) -> Optional[bytes]:
+        """
+        Value of the entry, None if missing or not available
+        """
+
+    @abc.abstractmethod
+    def put(self, entry_key: str, value: bytes) -> None:
+        """
+        Write the entry atomically, failures are only reported
+        """
+
+    def evict(self, max_size: Optional[int] = None) -> None:
+        """
+        Keep the storage within its size, nothing to do by default
+        """
+
+
+class DirectoryStorage(Storage):
+    """
+    Entries as files of a local or a shared filesystem directory
+    """
+
+    def __init__(self, root: Union[str, Path], max_size: int) -> None:
+        self.root = Path(root)
+        self.max_size = max_size
+
+    def get(self, entry_key: str) -> Optional[bytes]:
+        entry = self.root / entry_key
+        try:
+            value = entry.read_bytes()
+            # keep the recently used entries on eviction
+            os.utime(entry)
+        except OSError:
+            return None
+
+        return value
+
+    def put(self, entry_key: str, value: bytes) -> None:
+        entry = self.root / entry_key
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            descriptor, tmp_path = tempfile.mkstemp(dir=entry.parent, suffix='.tmp')
+            with os.fdopen(descriptor, 'wb') as tmp_file:
+                tmp_file.write(value)
+            os.replace(tmp_path, entry)
+        except OSError as error:
+            LOG.warning('Could not write cache entry %r: %s', entry_key, error)
+
+    def evict(self, max_size: Optional[int] = None) -> None:
+        """
+        Remove the least recently used entries above the cache size
+        """
+        max_size = self.max_size if max_size is None else max_size
+
+        entries = []
+        for entry in (entry for kind in KINDS for entry in self.root.glob(f'{kind}/*/*')):
+            if entry.suffix == '.tmp':  # being written by a concurrent run
+                continue
+
+            try:
+                stat = entry.stat()
+            except OSError:  # removed by a concurrent run
+                continue
+            if S_ISREG(stat.st_mode):
+                entries.append((stat.st_mtime, stat.st_size, entry))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, entry in sorted(entries):
+            if size <= max_size:
+                break
+
+            try:
+                entry.unlink(missing_ok=True)
+            except OSError as error:
+                LOG.warning('Could not evict cache entry %s: %s', entry, error)
+            size -= entry_size
+
+
+class HttpStorage(Storage):
+    """
+    Entries behind a plain HTTP ``GET``/``PUT`` store, e.g. a WebDAV server or a bucket proxy.
+
+    The store is a speed-up only: once it does not answer,
+    custolint continues without it until the end of the run.
+    """
+
+    def __init__(self, url: str, timeout: float) -> None:
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.available = True
+
+    def _request(self, request: urllib.request.Request) -> Optional[bytes]:
+        if not self.available:
+            return None
+
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:  # nosec
+                return bytes(response.read())
+        except urllib.error.HTTPError as error:
+            if error.code != 404:
+                LOG.warning('Cache store replied %r to %s %r',
+                            error.code, request.get_method(), request.full_url)
+        except (OSError, http.client.HTTPException) as error:  # including the timeouts
+            LOG.warning('Cache store %r is not available, continue without it: %s',
+                        self.url, error)
+            self.available = False
+
+        return None
+
+    def get(self, entry_key: str) -> Optional[bytes]:
+        return self._request(urllib.request.Request(f"{self.url}/{entry_key}"))
+
+    def put(self, entry_key: str, value: bytes) -> None:
+        self._request(urllib.request.Request(
+            f"{self.url}/{entry_key}",
+            data=value,
+            method='PUT',
+            headers={'Content-Type': 'application/json'}
+        ))
+
+
+_STORAGE: Optional[Storage] = None
+
+
+def storage() -> Storage:
+    """
+    The global storage, :py:class:`HttpStorage` if ``CUSTOLINT_CACHE_URL`` is set,
+    else :py:class:`DirectoryStorage`
+    """
+    global _STORAGE  # pylint: disable=global-statement
+
+    if _STORAGE is None:
+        if env.CACHE_URL:
+            LOG.info('Share the cache store %r', env.CACHE_URL)
+            _STORAGE = HttpStorage(env.CACHE_URL, env.CACHE_TIMEOUT)
+        else:
+            _STORAGE = DirectoryStorage(Path(env.CACHE_DIR, STORAGE_DIR), env.CACHE_SIZE)
+
+    return _STORAGE
+
+
+def use(new_storage: Storage) -> None:
+    """
+    Replace the global storage, e.g. by :py:class:`custolint.notes.NotesStorage`
+    """
+    global _STORAGE  # pylint: disable=global-statement
+    _STORAGE = new_storage
+
+
+def disable() -> None:
+    """
+    Do not read nor write the cache, e.g. ``--no-cache``
+    """
+    global ENABLED  # pylint: disable=global-statement
+    ENABLED = False
+
+
+def key(kind: str, *parts: str, suffix: str = '.json') -> str:
+    """
+    Key of an entry, the digest of its parts prefixed by the kind of entry,
+    one of :py:data:`KINDS`
+
+    >>> key('lint', 'namespace', 'blob id')
+    'lint/a9/a94af8f3d733ded082a364ae9c6284c974441c1c45a20df1c594596b5da9f208.json'
+    """
+    digest = hashlib.sha256(":".join(parts).encode()).hexdigest()
+    return f"{kind}/{digest[:2]}/{digest}{suffix}"
+
+
+def get(entry_key: str) -> Optional[Any]:
+    """
+    Decoded JSON entry, None if missing or the cache is disabled
+    """
+    if not ENABLED:
+        return None
+
+    value = storage().get(entry_key)
+    if value is None:
+        return None
+
+    try:
+        return json.loads(value)
+    except ValueError:
+        LOG.warning('Ignore corrupted cache entry %r', entry_key)
+        return None
+
+
+def put(entry_key: str, value: Any) -> None:
+    """
+    Keep a JSON entry, unless the cache is disabled
+    """
+    if ENABLED:
+        storage().put(entry_key, json.dumps(value).encode())
+
+
+def evict(max_size: Optional[int] = None) -> None:
+    """
+    Keep the storage within ``CUSTOLINT_CACHE_SIZE`` or ``max_size`` bytes
+    """
+    storage().evict(max_size)
+
+
+def namespace(tool: str, config: Optional[Path], command: str) -> Optional[str]:
+    """
+    Digest of everything but the file content the messages depend on, None if cache is disabled
+    """
+    if not ENABLED:
+        return None
+
+    digest = hashlib.sha256()
+    digest.update(tool.encode())
+    digest.update(metadata.version(tool).encode())
+    digest.update(command.encode())
+    if config and config.exists():
+        digest.update(config.read_bytes())
+
+    return digest.hexdigest()
+
+
+def blob_id(path: Path) -> str:
+    """
+    Same id as ``git hash-object``, without starting a git process
+    """
+    return hash_object(path.read_bytes())
+
+
+def hash_object(content: bytes) -> str:
+    """
+    Git blob id of a content
+
+    >>> hash_object(b'')
+    'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391'
+    """
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def _lint_key(cache_namespace: str, file_name: str) -> str:
+    return key('lint', cache_namespace, os.path.normpath(file_name), blob_id(Path(file_name)))
+
+
+def lookup(cache_namespace: str, paths: Sequence[str]) -> Tuple[Messages, List[str]]:
+    """
+    Split the files into the cached messages and the files to lint
+    """
+    messages: Messages = []
+    misses = []
+    for file_name in paths:
+        try:
+            cached = get(_lint_key(cache_namespace, file_name))
+        except OSError:
+            cached = None
+
+        if cached is None:
+            misses.append(file_name)
+            continue
+
+        messages.extend((message_file_name, line_number, message)
+                        for message_file_name, line_number, message in cached)
+
+    LOG.info('Lint cache hits %r of %r files', len(paths) - len(misses), len(paths))
+    return messages, misses
+
+
+def store(cache_namespace: str,
+          paths: Sequence[str],
+          messages: Iterable[Tuple[str, int, str]]) -> None:
+    """
+    Keep the messages of each linted file, including the files without any message
+    """
+    per_file: Dict[str, Messages] = {os.path.normpath(file_name): [] for file_name in paths}
+    for fields in messages:
+        file_messages = per_file.get(os.path.normpath(fields[0]))
+        if file_messages is not None:
+            file_messages.append(fields)
+
+    for file_name in paths:
+        put(_lint_key(cache_namespace, file_name), per_file[os.path.normpath(file_name)])
+
+    evict()
+
+
+def lookup_combined(cache_namespace: str, paths: Sequence[str]) -> Optional[Messages]:
+    """
+    Cached messages of a check across the files, e.g. pylint ``duplicate-code``,
+    keyed by the content of all the files
+    """
+    cached = get(_combined_key(cache_namespace, paths))
+    if cached is None:
+        return None
+
+    messages: Messages = []
+    messages.extend((file_name, line_number, message)
+                    for file_name, line_number, message in cached)
+    return messages
+
+
+def store_combined(cache_namespace: str,
+                   paths: Sequence[str],
+                   messages: Iterable[Tuple[str, int, str]]) -> None:
+    """
+    Keep the messages of a check across the files, see :py:func:`lookup_combined`
+    """
+    put(_combined_key(cache_namespace, paths), list(messages))
+    evict()
+
+
+def _combined_key(cache_namespace: str, paths: Sequence[str]) -> str:
+    return key('combined', cache_namespace,
+               *(f"{os.path.normpath(path)}:{blob_id(Path(path))}" for path in sorted(paths)))
+
+
+__all__ = [
+    'DirectoryStorage',
+    'HttpStorage',
+    'KINDS',
+    'STORAGE_DIR',
+    'Storage',
+    'blob_id',
+    'disable',
+    'evict',
+    'get',
+    'hash_object',
+    'key',
+    'lookup',
+    'lookup_combined',
+    'namespace',
+    'put',
+    'storage',
+    'store',
+    'store_combined',
+    'use',
+]
@@ -3,17 +3,20 @@
 """
 Command line interface API based on python click library
 """
-from typing import Any, Callable, Dict, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import functools
 import logging
 import sys
+import time
 from configparser import ConfigParser
+from datetime import datetime
 from pathlib import Path
 
 import click
 
-from . import __version__, coverage, env, flake8, generics, log, mypy, pylint
+from . import (__version__, cache, coverage, env, flake8, generics, jobs, log,
+               mypy, notes, pylint, stats)
 from .contributors import Contributors
 
 FuncType = Callable[..., None]
@@ -38,24 +41,71 @@ def common_params(func: FuncType) -> FuncType:
                   help='Fast halt when reaching N messages. '
                        'Is taken in consideration only if greater the zero.')
     @click.option('--skip-contributors',
+                  envvar=env.SKIP_CONTRIBUTORS_ENV,
                   default='',
                   help='Exclude contributors by name or emails,'
                        'mutually exclusive with --contributors')
     @click.option('--contributors',
+                  envvar=env.CONTRIBUTORS_ENV,
                   default='',
                   help='Include only contributors by name or emails,'
                        'mutually exclusive with --contributors')
+    @click.option('--time-budget',
+                  envvar=env.TIME_BUDGET_ENV,
+                  default=0.0,
+                  type=float,
+                  help='Stop after N seconds and report the files not checked, '
+                       'the files with the most changed lines are checked first. '
+                       'Is taken in consideration only if greater the zero.')
+    @click.option('--since-date',
+                  envvar=env.SINCE_DATE_ENV,
+                  type=click.DateTime(formats=['%Y-%m-%d']),
+                  help='Include only changes authored on or after the date, e.g. 2023-06-01')
+    @click.option('--until-date',
+                  envvar=env.UNTIL_DATE_ENV,
+                  type=click.DateTime(formats=['%Y-%m-%d']),
+                  help='Include only changes authored on or before the date, e.g. 2023-06-30')
+    @click.option('--no-cache',
+                  is_flag=True,
+                  default=env.NO_CACHE,
+                  help='Lint all the files again, do not use the lint results cache')
+    @click.option('--git-notes',
+                  type=click.Choice(notes.MODES),
+                  default=env.GIT_NOTES or None,
+                  help='Read the results of HEAD commit from refs/notes/custolint, '
+                       'with "write" write and push them as well')
+    @click.option('--filter-stats',
+                  default=env.FILTER_STATS or None,
+                  help='Count the evaluations, hits and time of the filters and their rules, '
+                       'log the N most expensive with a number N, or write them to a .json file')
+    @click.option('--low-priority',
+                  is_flag=True,
+                  default=env.LOW_PRIORITY,
+                  help='Run with the lowest CPU and I/O priority, e.g. in background on a laptop')
     @click.option('--log-level', type=click.Choice(log.LEVEL_NAMES))
     @cli.command(name=func_name)
     @functools.wraps(func)
     def wrapper(log_level: str,
+                low_priority: bool,
+                filter_stats: Optional[str],
+                git_notes: Optional[str],
+                no_cache: bool,
+                time_budget: float,
+                until_date: Optional[datetime],
+                since_date: Optional[datetime],
                 contributors: str,
                 skip_contributors: str,
                 halt_on_n_messages: int,
                 color_output: bool,
                 **kwargs: Any) -> Any:
+        # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
         try:
-            _contributors = Contributors.from_cli(contributors, skip_contributors)
+            _contributors = Contributors.from_cli(
+                contributors,
+                skip_contributors,
+                since=since_date.date() if since_date else None,
+                until=until_date.date() if until_date else None
+            )
         except ValueError as value_error:
             raise click.UsageError('Mutually exclusion for arguments '
                                    '--skip-contributors and --contributor') from value_error
@@ -64,35 +114,94 @@ def common_params(func: FuncType) -> FuncType:
             log_level=log_level or env.LOG_LEVEL,
             color_output=color_output
         )
+        if low_priority:
+            jobs.lower_priority()
+
+        if filter_stats:
+            try:
+                stats.enable(filter_stats)
+            except ValueError as value_error:
+                raise click.BadParameter(str(value_error),
+                                         param_hint='--filter-stats') from value_error
+
+        if no_cache:
+            cache.disable()
+
+        notes_storage = notes.attach(git_notes) if git_notes else None
+
+        deadline = time.monotonic() + time_budget if time_budget > 0 else None
+
         LOG.info('---- %s ------', func_name)
-        return func(_contributors, halt_on_n_messages, **kwargs)
+        try:
+            return func(_contributors, halt_on_n_messages, deadline=deadline, **kwargs)
+        finally:
+            # the commands exit with the halt code
+            if notes_storage and git_notes:
+                notes.detach(notes_storage, git_notes)
+            if filter_stats:
+                stats.report(filter_stats)
     return wrapper
 
 
+@click.option('--mypy-daemon',
+              is_flag=True,
+              default=env.MYPY_DAEMON,
+              help='Check with a reused dmypy daemon, restarted when mypy or its config changes')
+@click.option('--mypy-dependents',
+              type=int,
+              default=env.MYPY_DEPENDENTS,
+              help='Check as well the files importing the changed files, up to N levels, '
+                   'by default none')
+@click.option('--export-cache',
+              is_flag=True,
+              help='Check all the files and export the mypy cache for the branches targeting '
+                   'this one, e.g. on main, instead of comparing with the target branch')
 @common_params
-def _mypy(contributors: Contributors, halt_on_n_messages: int, halt: bool) -> None:
+def _mypy(contributors: Contributors,
+          halt_on_n_messages: int,
+          halt: bool,
+          deadline: Optional[float],
+          export_cache: bool,
+          mypy_dependents: int,
+          mypy_daemon: bool) -> None:
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    if export_cache:
+        mypy.export_cache()
+        return
+
     mypy.cli(
         contributors=contributors,
         halt_on_n_messages=halt_on_n_messages,
-        halt=halt
+        halt=halt,
+        deadline=deadline,
+        daemon=mypy_daemon,
+        dependents=mypy_dependents
     )
 
 
 @common_params
-def _pylint(contributors: Contributors, halt_on_n_messages: int, halt: bool) -> None:
+def _pylint(contributors: Contributors,
+            halt_on_n_messages: int,
+            halt: bool,
+            deadline: Optional[float]) -> None:
     pylint.cli(
         contributors=contributors,
         halt_on_n_messages=halt_on_n_messages,
-        halt=halt
+        halt=halt,
+        deadline=deadline
     )
 
 
 @common_params
-def _flake8(contributors: Contributors, halt_on_n_messages: int, halt: bool) -> None:
+def _flake8(contributors: Contributors,
+            halt_on_n_messages: int,
+            halt: bool,
+            deadline: Optional[float]) -> None:
     flake8.cli(
         contributors=contributors,
         halt_on_n_messages=halt_on_n_messages,
-        halt=halt
+        halt=halt,
+        deadline=deadline
     )
 
 
@@ -105,11 +214,13 @@ if coverage.coverage:
     def _coverage(contributors: Contributors,
                   halt_on_n_messages: int,
                   halt: bool,
+                  deadline: Optional[float],
                   data_file: click.Path) -> None:
         coverage.cli(
             contributors=contributors,
             halt_on_n_messages=halt_on_n_messages,
             halt=halt,
+            deadline=deadline,
             data_file=click.format_filename(data_file)  # type: ignore[arg-type]
         )
 
@@ -144,19 +255,20 @@ def _parse_cmd_kwargs(value: str) -> Dict[str, str]:
 def _from_config(contributors: Contributors,
                  halt_on_n_messages: int,
                  halt: bool,
+                 deadline: Optional[float],
                  config: click.Path) -> None:
     config_path = Path(config)  # type: ignore[arg-type]
     if config_path.name == 'setup.cfg':
         setup_cfg = ConfigParser()
         setup_cfg.read(config_path)
-        commands = _parse_cmd_array(setup_cfg['tool:custolint']['commands'])
+        commands_names = _parse_cmd_array(setup_cfg['tool:custolint']['commands'])
         halt = halt or setup_cfg['tool:custolint'].getboolean('halt')
-        LOG.info('The following commands: %r will run with halt=%r', commands, halt)
+        LOG.info('The following commands: %r will run with halt=%r', commands_names, halt)
 
         _globals = globals()
 
-        halt_error_code = generics.SYSTEM_EXIT_CODE_DRY_AND_CLEAN
-        for cmd in commands:
+        commands = []
+        for cmd in commands_names:
             try:
                 cmd_kwargs_raw = setup_cfg['tool:custolint'][cmd + '_kwargs']
             except KeyError:
@@ -167,15 +279,20 @@ def _from_config(contributors: Contributors,
 
             LOG.info('---- from_config:%s ------', cmd)
 
-            return_code = getattr(_globals[cmd], 'cli')(
+            commands.append(functools.partial(
+                getattr(_globals[cmd], 'cli_async'),
                 contributors=contributors,
                 halt_on_n_messages=halt_on_n_messages,
-                halt=halt,
+                deadline=deadline,
                 **cmd_kwargs,
-            )
+            ))
 
-            if return_code != generics.SYSTEM_EXIT_CODE_DRY_AND_CLEAN:
-                halt_error_code = return_code
+        # the commands run concurrently over the same git changes
+        halt_error_code = jobs.run(generics.run_commands(
+            commands,
+            halt=halt,
+            contributors=contributors
+        ))
 
         sys.exit(halt_error_code)
 
@@ -0,0 +1,161 @@
+"""
+Context of the lines of a python file, the function or class enclosing each line.
+
+The filter rules ask where a message is rather than what its line looks like,
+e.g. in the signature of a test function or of a ``@property``, see :py:mod:`custolint.rules`.
+A multi-line signature or a stack of decorators does not fool them.
+
+A file is parsed once with :py:mod:`ast` into a :py:class:`Context`, a line is then
+looked up by its index. The context is kept with the content of the file,
+see :py:mod:`custolint.sources`, and its scopes are kept in memory by the git blob id
+of the content, up to :py:const:`SCOPES_SIZE` contents. Parsing is cheaper than
+a round trip to the cache storage, see :py:mod:`custolint.cache`.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import ast
+import logging
+from pathlib import Path
+
+from . import cache, sources
+
+LOG = logging.getLogger(__name__)
+# the contents whose scopes are kept in memory
+SCOPES_SIZE = 1024
+
+_ScopeNode = Union[ast.AsyncFunctionDef, ast.FunctionDef, ast.ClassDef]
+
+
+class Scope(NamedTuple):
+    """
+    A function or a class, from its first decorator to its last line
+    """
+    name: str
+    # ``def`` or ``class``
+    kind: str
+    decorators: Tuple[str, ...]
+    first_line: int
+    # the last line of the decorators and the ``def`` or ``class`` statement
+    signature_line: int
+    last_line: int
+
+    def signature(self, line_number: int) -> bool:
+        """
+        The line is one of the decorators or the statement of the scope
+        """
+        return self.first_line <= line_number <= self.signature_line
+
+
+class Context(NamedTuple):
+    """
+    The scopes of a file and the innermost scope of each line
+    """
+    scopes: Tuple[Scope, ...]
+    # position of the innermost scope of each line, -1 outside of any scope
+    lines: Tuple[int, ...]
+
+    @classmethod
+    def from_scopes(cls, scopes: Sequence[Scope], line_count: int) -> 'Context':
+        """
+        Index the lines, the scopes are ordered from the outer ones to the inner ones
+        """
+        lines = [-1] * line_count
+        for position, scope in enumerate(scopes):
+            lines[scope.first_line - 1:scope.last_line] = \
+                [position] * (min(scope.last_line, line_count) - scope.first_line + 1)
+
+        return cls(scopes=tuple(scopes), lines=tuple(lines))
+
+    def scope(self, line_number: int) -> Optional[Scope]:
+        """
+        The innermost function or class of the line, None at the module level
+        """
+        position = self.lines[line_number - 1] if 0 < line_number <= len(self.lines) else -1
+        return self.scopes[position] if position >= 0 else None
+
+
+def _dotted(node: ast.expr) -> str:
+    """
+    Name of a decorator, without its arguments
+
+    >>> _dotted(ast.parse('pytest.fixture(name="a")', mode='eval').body)
+    'pytest.fixture'
+    """
+    if isinstance(node, ast.Call):
+        return _dotted(node.func)
+    if isinstance(node, ast.Attribute):
+        return f"{_dotted(node.value)}.{node.attr}"
+    if isinstance(node, ast.Name):
+        return node.id
+
+    return ''
+
+
+def _scope(node: _ScopeNode) -> Scope:
+    # the body starts on the statement line of a one-liner
+    return Scope(
+        name=node.name,
+        kind='class' if isinstance(node, ast.ClassDef) else 'def',
+        decorators=tuple(_dotted(decorator) for decorator in node.decorator_list),
+        first_line=min((node.lineno, *(decorator.lineno for decorator in node.decorator_list))),
+        signature_line=max(node.lineno, node.body[0].lineno - 1),
+        last_line=node.end_lineno or node.lineno
+    )
+
+
+def _parse(source: bytes) -> List[Scope]:
+    """
+    The functions and classes of a file, the outer ones first
+
+    >>> [scope.name for scope in _parse(b'class A:\\n    def a(self):\\n        pass\\n')]
+    ['A', 'a']
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):  # reported by the linters
+        return []
+
+    # breadth first, an enclosing scope comes before the scopes it encloses
+    return [
+        _scope(node) for node in ast.walk(tree)
+        if isinstance(node, (ast.AsyncFunctionDef, ast.FunctionDef, ast.ClassDef))
+    ]
+
+
+_SCOPES: Dict[str, List[Scope]] = {}
+
+
+def index(path: Path, content: Sequence[str]) -> Context:
+    """
+    Context of the lines of a file, parsed once per content
+
+    The scopes are kept in memory by git blob id of the content, the lines index is kept
+    with a :py:class:`custolint.sources.Source` content.
+    """
+    if isinstance(content, sources.Source) and content.context is not None:
+        return content.context
+
+    source = content.data if isinstance(content, sources.Source) else "\n".join(content).encode()
+    blob_id = cache.hash_object(source)
+    scopes = _SCOPES.pop(blob_id, None)
+    if scopes is None:
+        scopes = _parse(source)
+        if len(_SCOPES) >= SCOPES_SIZE:
+            # the least recently used first
+            del _SCOPES[next(iter(_SCOPES))]
+    _SCOPES[blob_id] = scopes
+
+    LOG.debug('Indexed %r scopes of %s', len(scopes), path)
+    context = Context.from_scopes(scopes, len(content))
+    if isinstance(content, sources.Source):
+        content.context = context
+
+    return context
+
+
+__all__ = [
+    'Context',
+    'SCOPES_SIZE',
+    'Scope',
+    'index',
+]
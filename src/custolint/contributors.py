@@ -1,14 +1,18 @@
 """
 Exclude/Include contributors by name or emails with:
 ``--contributors`` and ``--skip-contributors``
+
+Keep only the changes authored within a date range with:
+``--since-date`` and ``--until-date``
 """
-from typing import Iterable, Tuple
+from typing import Iterable, Optional, Tuple
 
 import logging
+from datetime import date
 
 from pydantic import BaseModel
 
-from custolint import _typing
+from custolint import _typing, env
 
 LOG = logging.getLogger(__name__)
 
@@ -19,9 +23,15 @@ class Contributors(BaseModel):
     """
     white: Tuple[str, ...]
     black: Tuple[str, ...]
+    since: Optional[date] = None
+    until: Optional[date] = None
 
     @classmethod
-    def from_cli(cls, white: str, black: str) -> 'Contributors':
+    def from_cli(cls,
+                 white: str,
+                 black: str,
+                 since: Optional[date] = None,
+                 until: Optional[date] = None) -> 'Contributors':
         """
         Strings to Contributors
         """
@@ -31,12 +41,42 @@ class Contributors(BaseModel):
         if _white and _black:
             raise ValueError('Mutually exclusion for ``white`` and ``black`` arguments')
 
-        return cls(white=_white, black=_black)
+        return cls(white=_white, black=_black, since=since, until=until)
 
-    def _filter(self, email: str, author: str) -> bool:
+    @classmethod
+    def from_env(cls) -> 'Contributors':
+        """
+        Contributors of the environment variables, for the linters plugins without custolint CLI,
+        see :py:const:`custolint.env.CONTRIBUTORS_ENV`
+        """
+        return cls.from_cli(
+            env.CONTRIBUTORS,
+            env.SKIP_CONTRIBUTORS,
+            since=date.fromisoformat(env.SINCE_DATE) if env.SINCE_DATE else None,
+            until=date.fromisoformat(env.UNTIL_DATE) if env.UNTIL_DATE else None
+        )
+
+    def _out_of_range(self, author_date: str) -> bool:
+        """
+        Exclude changes authored outside ``since`` and ``until`` dates, both included
+        """
+        if self.since and author_date < self.since.isoformat():
+            LOG.debug('Skip %r because is before %r', author_date, self.since)
+            return True
+
+        if self.until and author_date > self.until.isoformat():
+            LOG.debug('Skip %r because is after %r', author_date, self.until)
+            return True
+
+        return False
+
+    def _filter(self, email: str, author: str, author_date: Optional[str] = None) -> bool:
         """
         Include or exclude contributors
         """
+        if author_date and self._out_of_range(author_date):
+            return True
+
         clause = {email, author}
         if self.white:
             if not clause.intersection(self.white):
@@ -63,9 +103,35 @@ class Contributors(BaseModel):
                 yield line
                 continue
 
-            if not self._filter(line.email, line.author):
+            if not self._filter(line.email, line.author, line.date):
                 yield line
 
+    def filter_changes(self, changes: _typing.Changes) -> _typing.Changes:
+        """
+        Include or exclude contributors from git changes, before any linter runs.
+
+        The files without any remaining line are dropped, so they are not linted at all.
+        """
+        if not any((self.white, self.black, self.since, self.until)):
+            return changes
+
+        filtered: _typing.Changes = {}
+        for file_name, lines in changes.items():
+            kept = {
+                line_number: contributor for line_number, contributor in lines.items()
+                if not self._filter(
+                    contributor['email'],
+                    contributor['author'],
+                    contributor['date']
+                )
+            }
+            if kept:
+                filtered[file_name] = kept
+
+        LOG.info('Keep %r of %r changed files owned by the contributors within the date range',
+                 len(filtered), len(changes))
+        return filtered
+
     def filter_coverage(self, coverages: Iterable[_typing.Coverage]) -> Iterable[_typing.Coverage]:
         """
         Include or exclude contributors from coverage report
@@ -73,7 +139,8 @@ class Contributors(BaseModel):
         for coverage in coverages:
             if not self._filter(
                 coverage.contributor['email'],
-                coverage.contributor['author']
+                coverage.contributor['author'],
+                coverage.contributor['date']
             ):
                 yield coverage
 
@@ -32,14 +32,13 @@
         :emphasize-lines: 2
 """
 
-from typing import Iterator
+from typing import AsyncIterator, Iterator, Optional, Tuple
 
+import asyncio
 import logging
 import sys
 from pathlib import Path
 
-import bash
-
 try:
     import coverage
     import coverage.cmdline
@@ -48,17 +47,19 @@ except ImportError:  # pragma: no cover when coverage is installed
     coverage = None  # type: ignore[assignment]
 
 
-from . import _typing, env, generics, git
+from . import _typing, env, generics, git, jobs, spill
 from .contributors import Contributors
 
 LOG = logging.getLogger(__name__)
 
 
-def _process_missing_lines(
-        file_name: str,
-        missing: str,
-        changes: _typing.Changes) -> Iterator[_typing.Coverage]:
-
+def _missing_line_numbers(missing: str) -> range:
+    """
+    >>> _missing_line_numbers('36-38')
+    range(36, 39)
+    >>> _missing_line_numbers('58->56')
+    range(58, 59)
+    """
     if "-" in missing:
         # The condition was nether false or nether true, we will just point to the first line
         if missing.endswith("->exit"):  # alike '8->exit'
@@ -70,10 +71,15 @@ def _process_missing_lines(
     else:
         start = end = missing
 
-    start_end = list(range(int(start), int(end) + 1))
-    del start, end
+    return range(int(start), int(end) + 1)
 
-    for line_number in start_end:
+
+def _process_missing_lines(
+        file_name: str,
+        missing: str,
+        changes: _typing.Changes) -> Iterator[_typing.Coverage]:
+
+    for line_number in _missing_line_numbers(missing):
         contributor = changes.get(file_name, {}).get(int(line_number))
         if contributor:
             yield _typing.Coverage(
@@ -83,30 +89,10 @@ def _process_missing_lines(
             )
 
 
-def compare_with_main_branch(coverage_file_location: str) -> Iterator[_typing.Coverage]:
+def _parse_report(stdout: spill.Stdout) -> Iterator[Tuple[str, str]]:
     """
-    Apply coverage check on the changes only
+    Missing lines of the coverage report, alike ``('src/custolint/git.py', '25-26')``
     """
-    changes = git.changes()
-    config = Path(env.CONFIG_D, '.coveragerc')
-    config_argument = f"--rcfile={config}" if config.exists() else "--show-missing"
-    execute_command = " ".join((
-        "coverage",
-        'report',
-        config_argument,
-        f"--data-file={coverage_file_location}"
-    ))
-
-    # --include=space/*
-    LOG.info('execute coverage command: %r', execute_command)
-
-    command = bash.bash(execute_command)
-
-    if command.code:
-        logging.error('Coverage command failed: %s', (command.stderr or command.stdout).decode())
-        sys.exit(command.code)
-
-    stdout = command.stdout.decode()
     # stdout alike
     # $ coverage report --data-file=.coverage --show-missing
     # Name                        Stmts   Miss Branch BrPart  Cover   Missing
@@ -117,7 +103,7 @@ def compare_with_main_branch(coverage_file_location: str) -> Iterator[_typing.Co
     # -----------------------------------------------------------------------
     # TOTAL                          77      4     26      2    92%
 
-    for coverage_line in stdout.split("\n"):
+    for coverage_line in spill.text_lines(stdout):
 
         if not coverage_line:
             continue
@@ -144,28 +130,108 @@ def compare_with_main_branch(coverage_file_location: str) -> Iterator[_typing.Co
         if len(fields) > 4 and "Missing" not in fields[-1]:
             missing_coverage_lines = "".join(fields[6:]).split(",")
             for missing in missing_coverage_lines:
-                for line in _process_missing_lines(
-                    file_name=fields[0],
-                    missing=missing,
-                    changes=changes
-                ):
-                    yield line
+                yield fields[0], missing
 
 
-def cli(contributors: Contributors,
-        halt_on_n_messages: int,
-        data_file: str,
-        halt: bool = True) -> int:
-    """Provide interface for coverage CLI"""
-    return generics.group_by_email_and_file_name(
-        log=compare_with_main_branch(data_file),
+def compare_with_main_branch(coverage_file_location: str) -> Iterator[_typing.Coverage]:
+    """
+    Apply coverage check on the changes only
+
+    Synchronous variant of :py:func:`compare_with_main_branch_async`
+    """
+    yield from jobs.run(jobs.collect(compare_with_main_branch_async(coverage_file_location)))
+
+
+async def compare_with_main_branch_async(
+        coverage_file_location: str,
+        changes: Optional[_typing.Changes] = None,
+        deadline: Optional[float] = None) -> AsyncIterator[_typing.Coverage]:
+    """
+    Apply coverage check on the changes only
+
+    :param changes: reuse the changes already computed by another command
+    :param deadline: :py:func:`time.monotonic` time to stop at,
+        the changed files are reported as not checked if the report is not done by then
+    """
+    if changes is None:
+        changes = await git.changes_async()
+
+    if not changes:
+        LOG.info("No file was affected")
+        return
+
+    config = Path(env.CONFIG_D, '.coveragerc')
+    config_argument = f"--rcfile={config}" if config.exists() else "--show-missing"
+    execute_command = " ".join((
+        "coverage",
+        'report',
+        config_argument,
+        f"--data-file={coverage_file_location}"
+    ))
+
+    # --include=space/*
+    LOG.info('execute coverage command: %r', execute_command)
+
+    try:
+        stdout, command = await asyncio.wait_for(spill.execute(execute_command),
+                                                 generics.remaining_time(deadline))
+    except asyncio.TimeoutError:
+        generics.report_not_checked(list(changes))
+        return
+
+    if command.code:
+        logging.error('Coverage command failed: %s',
+                      command.stderr.decode() or "\n".join(spill.text_lines(stdout)))
+        stdout.close()
+        sys.exit(command.code)
+
+    missing_lines = list(_parse_report(stdout))
+    await git.attribute(changes, (
+        (file_name, line_number)
+        for file_name, missing in missing_lines
+        for line_number in _missing_line_numbers(missing)
+    ))
+
+    for file_name, missing in missing_lines:
+        for line in _process_missing_lines(
+            file_name=file_name,
+            missing=missing,
+            changes=changes
+        ):
+            yield line
+
+
+async def cli_async(contributors: Contributors,
+                    halt_on_n_messages: int,
+                    data_file: str,
+                    halt: bool = True,
+                    changes: Optional[_typing.Changes] = None,
+                    deadline: Optional[float] = None) -> int:
+    """Asynchronous interface for coverage CLI"""
+    # pylint:disable=duplicate-code,too-many-arguments,too-many-positional-arguments
+    if changes is None:
+        # skip the files without any line of the contributors
+        changes = await git.changes_async(contributors=contributors)
+
+    return await generics.group_by_email_and_file_name_async(
+        log=compare_with_main_branch_async(data_file, changes=changes, deadline=deadline),
         contributors=contributors,
         halt_on_n_messages=halt_on_n_messages,
         halt=halt
     )
 
 
+def cli(contributors: Contributors,
+        halt_on_n_messages: int,
+        data_file: str,
+        halt: bool = True,
+        deadline: Optional[float] = None) -> int:
+    """Provide interface for coverage CLI"""
+    return jobs.run(cli_async(contributors, halt_on_n_messages, data_file, halt, deadline=deadline))
+
+
 __all__ = [
     'cli',
+    'cli_async',
     'coverage',
 ]
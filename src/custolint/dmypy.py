@@ -0,0 +1,124 @@
+"""
+`Mypy daemon <https://mypy.readthedocs.io/en/stable/mypy_daemon.html>`_ backend.
+
+A cold ``mypy`` run rebuilds the whole import graph, even when a single line changed.
+With ``--mypy-daemon`` option or ``CUSTOLINT_MYPY_DAEMON`` environment variable
+the changed files are checked by a ``dmypy`` daemon instead, started by the first run
+and reused by the next ones, which check only what changed since.
+
+.. code-block:: bash
+
+    $ custolint mypy --mypy-daemon
+
+The daemon of a project is kept under the cache directory, see
+:py:const:`custolint.env.CACHE_DIR`, with the fingerprint of its mypy version,
+options and configuration. It is restarted when the fingerprint changes,
+and stops by itself after :py:const:`IDLE_TIMEOUT` seconds without a check.
+"""
+from typing import Optional, Sequence
+
+import hashlib
+import logging
+import os
+import sys
+from pathlib import Path
+
+from mypy.version import __version__ as mypy_version
+
+from . import env, jobs, spill
+
+LOG = logging.getLogger(__name__)
+IDLE_TIMEOUT = 3600
+
+
+def status_dir() -> Path:
+    """
+    Directory of the daemon status of the current project
+    """
+    project = hashlib.sha256(os.getcwd().encode()).hexdigest()[:16]
+    return Path(env.CACHE_DIR, 'dmypy', project)
+
+
+def fingerprint(flags: str, config: Optional[Path]) -> str:
+    """
+    Digest of everything the daemon is started with, it is restarted when it changes
+    """
+    digest = hashlib.sha256()
+    digest.update(mypy_version.encode())
+    digest.update(flags.encode())
+    if config and config.exists():
+        digest.update(config.read_bytes())
+
+    return digest.hexdigest()
+
+
+def _command(*arguments: str) -> str:
+    return " ".join(("dmypy", f"--status-file={status_dir() / 'status.json'}", *arguments))
+
+
+async def _running() -> bool:
+    status = await jobs.execute(_command("status"))
+    return not status.code
+
+
+async def start(flags: str, config: Optional[Path]) -> None:
+    """
+    Start the daemon, or restart it if it runs with a different fingerprint
+    """
+    fingerprint_file = status_dir() / 'fingerprint'
+    expected = fingerprint(flags, config)
+    running = await _running()
+    if running and fingerprint_file.exists() and fingerprint_file.read_text() == expected:
+        LOG.debug("Reuse the mypy daemon of %r", str(status_dir()))
+        return
+
+    action = "restart" if running else "start"
+    LOG.info("%s the mypy daemon with %r", action.capitalize(), flags)
+
+    status_dir().mkdir(parents=True, exist_ok=True)
+    fingerprint_file.unlink(missing_ok=True)
+    command = await jobs.execute(_command(action, f"--timeout={IDLE_TIMEOUT}", "--", flags))
+    if command.code:
+        logging.error('Mypy daemon failed to %s: %s', action,
+                      (command.stderr or command.stdout).decode())
+        sys.exit(command.code)
+
+    fingerprint_file.write_text(expected)
+
+
+async def stop() -> None:
+    """
+    Stop the daemon of the current project, if any
+    """
+    if await _running():
+        await jobs.execute(_command("stop"))
+
+    (status_dir() / 'fingerprint').unlink(missing_ok=True)
+
+
+async def check(paths: Sequence[str], flags: str, config: Optional[Path]) -> spill.Output:
+    """
+    Check the files with the daemon, started if needed, return its stdout
+    """
+    await start(flags, config)
+
+    LOG.info("Check %r files with the mypy daemon", len(paths))
+    output, command = await spill.execute(_command("check", *paths))
+
+    # 1 is the exit code of type errors, 2 of a daemon failure
+    if command.stderr or command.code > 1:
+        output.close()
+        logging.error('Mypy daemon check failed: %s', command.stderr.decode())
+        sys.exit(command.code)
+
+    return output
+
+
+__all__ = [
+    'IDLE_TIMEOUT',
+    'check',
+    'fingerprint',
+    'start',
+    'status_dir',
+    'stop',
+]
@@ -61,12 +61,188 @@ The configuration could be store into a different git repository
     $ git clone $GIT_SOME_REPO
     $ CUSTOLINT_CONFIG_D=$GIT_SOME_REPO/path/projectname/custolint.config.d custolint mypy
 
+In-process execution
+--------------------
+
+Run pylint, flake8 and mypy through their Python API instead of a subprocess
+with ``CUSTOLINT_IN_PROCESS`` environment variable, see :py:mod:`custolint.inprocess`.
+
+.. code-block:: bash
+
+    $ CUSTOLINT_IN_PROCESS=1 custolint pylint
+
+Mypy daemon
+-----------
+
+Check the changed files with a reused ``dmypy`` daemon instead of a cold ``mypy`` run
+with ``CUSTOLINT_MYPY_DAEMON`` environment variable (or ``--mypy-daemon``),
+see :py:mod:`custolint.dmypy`.
+
+.. code-block:: bash
+
+    $ CUSTOLINT_MYPY_DAEMON=1 custolint mypy
+
+Mypy dependents
+---------------
+
+mypy checks as well the files importing the changed files, and the ones importing them,
+up to ``CUSTOLINT_MYPY_DEPENDENTS`` levels (or ``--mypy-dependents``), by default 0,
+checking only the changed files. The import graph reads all the python files of the project,
+see :py:mod:`custolint.imports`.
+
+.. code-block:: bash
+
+    $ CUSTOLINT_MYPY_DEPENDENTS=2 custolint mypy
+
+Contributors
+------------
+
+Include or exclude contributors, and keep the changes of a date range, with
+``CUSTOLINT_CONTRIBUTORS``, ``CUSTOLINT_SKIP_CONTRIBUTORS``, ``CUSTOLINT_SINCE_DATE`` and
+``CUSTOLINT_UNTIL_DATE`` environment variables (or ``--contributors``, ``--skip-contributors``,
+``--since-date`` and ``--until-date``), e.g. for the pylint reporter and the flake8 formatter,
+see :py:mod:`custolint.pylint_reporter` and :py:mod:`custolint.flake8_formatter`.
+
+.. code-block:: bash
+
+    $ CUSTOLINT_SINCE_DATE=2023-06-01 flake8 --format=custolint src
+
+Lazy blame
+----------
+
+By default every changed line is blamed before the linters run.
+With ``CUSTOLINT_LAZY_BLAME`` environment variable only the lines with findings are blamed,
+after the linters, see :py:class:`custolint.git.LazyChanges`.
+
+.. code-block:: bash
+
+    $ CUSTOLINT_LAZY_BLAME=1 custolint pylint
+
+Cache
+-----
+
+The pylint and flake8 messages are cached per file content, tool version and configuration,
+see :py:mod:`custolint.cache`. The cache directory is ``CUSTOLINT_CACHE_DIR``,
+by default ``~/.cache/custolint``, bounded to ``CUSTOLINT_CACHE_SIZE`` bytes, by default 64 MiB.
+Disable it with ``CUSTOLINT_NO_CACHE`` (or ``--no-cache``).
+
+.. code-block:: bash
+
+    $ CUSTOLINT_CACHE_DIR=.custolint_cache custolint pylint
+
+The blame records and the blamed changes are cached as well.
+Share the cache across the CI runners with a directory on a shared filesystem,
+or with a plain HTTP ``GET``/``PUT`` store ``CUSTOLINT_CACHE_URL``, whose requests time out
+after ``CUSTOLINT_CACHE_TIMEOUT`` seconds, by default 2. custolint continues without the cache
+when the store is not available.
+
+.. code-block:: bash
+
+    $ CUSTOLINT_CACHE_URL=http://cache.ci.local/custolint custolint pylint
+
+The files read by the filters are kept in memory for the pylint, flake8 and mypy stages of a run,
+bounded to ``CUSTOLINT_SOURCES_SIZE`` bytes, by default 32 MiB, see :py:mod:`custolint.sources`.
+
+Filter statistics
+-----------------
+
+Count the evaluations, hits and time of the filters and their rules with ``CUSTOLINT_FILTER_STATS``
+environment variable (or ``--filter-stats``), a number ``N`` logs the ``N`` most expensive
+at the end of the run, a ``.json`` file name writes all of them, see :py:mod:`custolint.stats`.
+
+.. code-block:: bash
+
+    $ CUSTOLINT_FILTER_STATS=filter-stats.json custolint pylint
+
+Git notes
+---------
+
+Share the results of a commit through ``refs/notes/custolint`` with ``CUSTOLINT_GIT_NOTES``
+environment variable (or ``--git-notes``), ``read`` or ``write``, see :py:mod:`custolint.notes`.
+
+.. code-block:: bash
+
+    $ CUSTOLINT_GIT_NOTES=write custolint pylint
+
+Time budget
+-----------
+
+Stop after ``CUSTOLINT_TIME_BUDGET`` seconds (or ``--time-budget``) and report the files
+not checked, the files with the most changed lines are checked first, chunk by chunk,
+see :py:func:`custolint.generics.prioritize`. The checks across the files,
+e.g. pylint ``duplicate-code``, still compare all the files, see
+:py:func:`custolint.pylint.duplicate_code`.
+
+.. code-block:: bash
+
+    $ CUSTOLINT_TIME_BUDGET=300 custolint pylint
+
+Jobs
+----
+
+The git blames, linters and coverage report run concurrently within a single budget,
+sized from the cgroup CPU quota, see :py:mod:`custolint.jobs`.
+Override it with ``CUSTOLINT_JOBS`` environment variable.
+Run in background with ``CUSTOLINT_LOW_PRIORITY`` (or ``--low-priority``),
+custolint and its child processes get the lowest CPU and I/O priority.
+
+.. code-block:: bash
+
+    $ CUSTOLINT_JOBS=2 CUSTOLINT_LOW_PRIORITY=1 custolint from-config setup.cfg
+
+Under ``make -jN`` the jobserver of ``MAKEFLAGS`` environment variable is shared as well,
+make older than 4.4 passes it only to the recipes marked with ``+``, e.g. ``+custolint pylint``.
+
+.. code-block:: bash
+
+    $ make -j4 custolint_validate
+
 """
 import os
 
 BRANCH_ENV = 'CUSTOLINT_MAIN_BRANCH'
+CACHE_DIR_ENV = 'CUSTOLINT_CACHE_DIR'
+CACHE_SIZE_ENV = 'CUSTOLINT_CACHE_SIZE'
+CACHE_TIMEOUT_ENV = 'CUSTOLINT_CACHE_TIMEOUT'
+CACHE_URL_ENV = 'CUSTOLINT_CACHE_URL'
 CONFIG_D_ENV = 'CUSTOLINT_CONFIG_D'
+CONTRIBUTORS_ENV = 'CUSTOLINT_CONTRIBUTORS'
+FILTER_STATS_ENV = 'CUSTOLINT_FILTER_STATS'
+GIT_NOTES_ENV = 'CUSTOLINT_GIT_NOTES'
+IN_PROCESS_ENV = 'CUSTOLINT_IN_PROCESS'
+JOBS_ENV = 'CUSTOLINT_JOBS'
+LAZY_BLAME_ENV = 'CUSTOLINT_LAZY_BLAME'
+LOW_PRIORITY_ENV = 'CUSTOLINT_LOW_PRIORITY'
+MYPY_DAEMON_ENV = 'CUSTOLINT_MYPY_DAEMON'
+MYPY_DEPENDENTS_ENV = 'CUSTOLINT_MYPY_DEPENDENTS'
+NO_CACHE_ENV = 'CUSTOLINT_NO_CACHE'
+SINCE_DATE_ENV = 'CUSTOLINT_SINCE_DATE'
+SOURCES_SIZE_ENV = 'CUSTOLINT_SOURCES_SIZE'
+SKIP_CONTRIBUTORS_ENV = 'CUSTOLINT_SKIP_CONTRIBUTORS'
+TIME_BUDGET_ENV = 'CUSTOLINT_TIME_BUDGET'
+UNTIL_DATE_ENV = 'CUSTOLINT_UNTIL_DATE'
 
 LOG_LEVEL = os.getenv('CUSTOLINT_LOG_LEVEL') or "INFO"
 BRANCH_NAME = os.getenv(BRANCH_ENV) or ""
+CACHE_DIR = os.getenv(CACHE_DIR_ENV) or os.path.join(
+    os.getenv('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'custolint'
+)
+CACHE_SIZE = int(os.getenv(CACHE_SIZE_ENV) or 64 * 1024 * 1024)
+CACHE_TIMEOUT = float(os.getenv(CACHE_TIMEOUT_ENV) or 2)
+CACHE_URL = os.getenv(CACHE_URL_ENV) or ""
 CONFIG_D = os.getenv(CONFIG_D_ENV) or "config.d"
+CONTRIBUTORS = os.getenv(CONTRIBUTORS_ENV) or ""
+FILTER_STATS = os.getenv(FILTER_STATS_ENV) or ""
+GIT_NOTES = (os.getenv(GIT_NOTES_ENV) or "").lower()
+IN_PROCESS = (os.getenv(IN_PROCESS_ENV) or "").lower() in ("1", "true", "yes")
+JOBS = int(os.getenv(JOBS_ENV) or 0)
+LAZY_BLAME = (os.getenv(LAZY_BLAME_ENV) or "").lower() in ("1", "true", "yes")
+LOW_PRIORITY = (os.getenv(LOW_PRIORITY_ENV) or "").lower() in ("1", "true", "yes")
+MAKEFLAGS = os.getenv('MAKEFLAGS') or ""
+MYPY_DAEMON = (os.getenv(MYPY_DAEMON_ENV) or "").lower() in ("1", "true", "yes")
+MYPY_DEPENDENTS = int(os.getenv(MYPY_DEPENDENTS_ENV) or 0)
+NO_CACHE = (os.getenv(NO_CACHE_ENV) or "").lower() in ("1", "true", "yes")
+SINCE_DATE = os.getenv(SINCE_DATE_ENV) or ""
+SOURCES_SIZE = int(os.getenv(SOURCES_SIZE_ENV) or 32 * 1024 * 1024)
+SKIP_CONTRIBUTORS = os.getenv(SKIP_CONTRIBUTORS_ENV) or ""
+UNTIL_DATE = os.getenv(UNTIL_DATE_ENV) or ""
@@ -22,43 +22,89 @@
     :cwd: ..
 
 """
-from typing import Dict, Iterator, Sequence, Union
+from typing import (Any, AsyncIterator, Dict, Iterator, MutableMapping,
+                    Optional, Sequence, Tuple, Union)
 
+import functools
 from pathlib import Path
 
-from . import _typing, env, generics
+from . import _typing, env, generics, git, inprocess, jobs, rules
+from .cache import namespace as cache_namespace
 from .contributors import Contributors
 
 
-# pylint: disable=unused-argument
-def _filter(path: Path, message: str, line_number: int, cache: Dict[Path, Sequence[str]]) -> bool:
+def _filter(path: Path,
+            message: str,
+            line_number: int,
+            cache: MutableMapping[Path, Sequence[str]]) -> bool:
     """
-    Return True if we want to skip the check else False if we want this check
+    Return True if we want to skip the check else False if we want this check,
+    see :py:mod:`custolint.rules`
     """
-    return False
-# pylint: enable=unused-argument
+    return rules.matcher('flake8').skip(path, message, line_number, cache)
+
+
+FILTERS: Tuple[_typing.FiltersType, ...] = (_filter, )
+
+
+def _lint_arguments() -> Dict[str, Any]:
+    config = Path(env.CONFIG_D, '.flake8')
+    config_argument = f"--config={config}" if config.exists() else ""
+    # do not let the configuration change the format parsed by custolint
+    command = " ".join(("flake8", config_argument, "--format=default", "{lint_file}"))
+
+    return {
+        'execute_command': command,
+        'filters': FILTERS,
+        'in_process': functools.partial(inprocess.flake8,
+                                        config=config if config.exists() else None),
+        'cache_namespace': cache_namespace('flake8', config, command)
+    }
 
 
 def compare_with_main_branch() -> Iterator[Union[_typing.Lint, _typing.FiltersType]]:
     """
     Compare all flake8 messages against code different to target branch.
     """
-    config = Path(env.CONFIG_D, '.flake8')
-    config_argument = f"--config={config}" if config.exists() else ""
-    command = " ".join(("flake8", config_argument, "{lint_file}"))
+    return generics.lint_compare_with_main_branch(**_lint_arguments())
 
-    return generics.lint_compare_with_main_branch(
-        execute_command=command,
-        filters=(_filter,)
+
+def compare_with_main_branch_async(
+        changes: Optional[_typing.Changes] = None,
+        deadline: Optional[float] = None
+) -> AsyncIterator[_typing.LogLine]:
+    """
+    Asynchronous variant of :py:func:`compare_with_main_branch`
+    """
+    return generics.lint_compare_with_main_branch_async(
+        **_lint_arguments(),
+        changes=changes,
+        deadline=deadline
     )
 
 
-def cli(contributors: Contributors, halt_on_n_messages: int, halt: bool = True) -> int:
-    """Provide interface for flake8 CLI"""
+async def cli_async(contributors: Contributors,
+                    halt_on_n_messages: int,
+                    halt: bool = True,
+                    changes: Optional[_typing.Changes] = None,
+                    deadline: Optional[float] = None) -> int:
+    """Asynchronous interface for flake8 CLI"""
     # pylint:disable=duplicate-code
-    return generics.filer_output(
-        log=compare_with_main_branch(),
+    if changes is None:
+        # skip the files without any line of the contributors
+        changes = await git.changes_async(contributors=contributors)
+
+    return await generics.filer_output_async(
+        log=compare_with_main_branch_async(changes=changes, deadline=deadline),
         contributors=contributors,
         halt_on_n_messages=halt_on_n_messages,
         halt=halt
     )
+
+
+def cli(contributors: Contributors,
+        halt_on_n_messages: int,
+        halt: bool = True,
+        deadline: Optional[float] = None) -> int:
+    """Provide interface for flake8 CLI"""
+    return jobs.run(cli_async(contributors, halt_on_n_messages, halt, deadline=deadline))
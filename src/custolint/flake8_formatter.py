@@ -0,0 +1,54 @@
+"""
+Flake8 formatter filtering the violations with custolint rules while flake8 reports them.
+
+A CI already running flake8 would run it a second time through ``custolint flake8``.
+Instead the flake8 run reports only the violations of the changed lines,
+kept by the contributors and the :py:const:`custolint.flake8.FILTERS`,
+see :py:class:`custolint.generics.InlineFilter`.
+
+The formatter is registered as ``custolint`` through the ``flake8.report`` entry point.
+
+.. code-block:: bash
+
+    $ flake8 --format=custolint src
+    src/custolint/git.py:42 80: E501 line too long (101 > 100 characters) \
+        ## john@snow.eu:2023-06-01
+
+The contributors come from the environment variables,
+see :py:meth:`custolint.contributors.Contributors.from_env`.
+Run it from the root of the repository, as custolint.
+
+.. note:: the exit status is still flake8 one, computed on all the violations
+"""
+from typing import Any, Optional
+
+from flake8.formatting.base import BaseFormatter
+
+from . import flake8, generics, inprocess
+
+
+class Formatter(BaseFormatter):  # type: ignore[misc]
+    """
+    Write the violations kept by custolint as soon as flake8 reports them
+    """
+
+    def after_init(self) -> None:
+        self.inline_filter = generics.InlineFilter(filters=flake8.FILTERS)
+
+    def stop(self) -> None:
+        self.inline_filter.close()
+        super().stop()
+
+    def format(self, error: Any) -> Optional[str]:
+        line = self.inline_filter.lint(inprocess.flake8_fields(error))
+        return self.inline_filter.format(line) if line else None
+
+    def handle(self, error: Any) -> None:
+        line = self.format(error)
+        if line:  # no source of the violations filtered out
+            self.write(line, self.show_source(error))
+
+
+__all__ = [
+    'Formatter',
+]
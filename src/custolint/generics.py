@@ -1,18 +1,22 @@
 """
 Keep here all tools, helpers and utility API.
 """
-from typing import (Dict, Iterable, Iterator, List, Optional, Sequence, Tuple,
-                    Union)
+from typing import (AsyncIterable, AsyncIterator, Awaitable, Callable,
+                    Iterable, Iterator, List, MutableMapping, Optional,
+                    Sequence, Tuple, Union)
 
+import asyncio
 import builtins
 import logging
+import mmap
+import os
 import re
 import sys
+import time
+from contextvars import ContextVar
 from pathlib import Path
 
-import bash
-
-from . import _typing, git
+from . import _typing, cache, env, git, inprocess, jobs, sources, spill, stats
 from .contributors import Contributors
 
 LOG = logging.getLogger(__name__)
@@ -20,14 +24,25 @@ SYSTEM_EXIT_CODE_DRY_AND_CLEAN = 0
 SYSTEM_EXIT_CODE_WITH_ALL_MESSAGES_INCLUDED = 41
 SYSTEM_EXIT_CODE_WITH_HALT_ON_N_MESSAGES = 42
 TEST_FILES_REGEX = re.compile(r"(^|/)(test_.*|conftest)\.py")
+PRIORITY_CHUNK_SIZE = 8
+LINT_FORMAT = '%s:%d %s ## %s:%s'
+
+_OUTPUT_BUFFER: ContextVar[Optional[List[str]]] = ContextVar('output_buffer', default=None)
 
 
 def output(msg: str, *args: Union[str, int], log: Optional[logging.Logger] = None) -> None:
     """
     A unified version of output to stdout or log.
+
+    Within :py:func:`run_commands` the output is kept per command and shown in order.
     """
     if log:
         log.info(msg, *args)
+        return
+
+    buffer = _OUTPUT_BUFFER.get()
+    if buffer is not None:
+        buffer.append(msg % args)
     else:
         builtins.print(msg % args)
 
@@ -60,6 +75,69 @@ def _parse_message_line(stdout_line: str) -> Optional[Tuple[str, int, str]]:
     raise RuntimeError(f"Can not parse lint line {stdout_line!r}")
 
 
+# one alternative per kind of line, the whole output is matched at once,
+# the messages first since they are most of the lines
+_TEXT_OUTPUT_RE = re.compile(rb"""
+    ^(?:
+        (?!\*{5}|Your\ code\ has\ been\ rated\ at\ )
+        (?P<file_name>.+?):(?P<line_number>\d+):(?P<message>.+)
+      | -*                                          # empty or separator line
+      | Your\ code\ has\ been\ rated\ at\ .*          # pylint score
+      | \*{5}.*                                     # pylint module banner
+      | (?P<unexpected>.+)
+    )$
+""", re.MULTILINE | re.VERBOSE)
+
+
+def _parse_text_buffer(buffer: Union[bytes, mmap.mmap]) -> Iterator[Tuple[str, int, str]]:
+    """
+    Same as :py:func:`_parse_message_line` on each line, in a single regular expression pass
+
+    >>> list(_parse_text_buffer(b"************* Module a\\na.py:1:0: C0114: Missing docstring\\n"))
+    [('a.py', 1, '0: C0114: Missing docstring')]
+    """
+    for match in _TEXT_OUTPUT_RE.finditer(buffer):
+        file_name, line_number, message, unexpected = match.groups()
+        if message is None:
+            if unexpected is not None:
+                raise RuntimeError(f"Can not parse lint line {unexpected.decode()!r}")
+            continue
+
+        yield file_name.decode(), int(line_number), message.decode()
+
+        if b'Similar lines in' in message:
+            return
+
+
+def _parse_text_output(stdout: spill.Stdout) -> Iterator[Tuple[str, int, str]]:
+    """
+    Text fallback parser for the tools output, one message per line
+
+    The spilled output is parsed in bulk through its memory map, see :py:func:`_parse_text_buffer`.
+
+    .. note:: once a ``Similar lines in`` message is found the rest of
+        the output is the duplicated code, so it is skipped
+    """
+    if isinstance(stdout, spill.Output):
+        with stdout.mapped() as buffer:
+            yield from _parse_text_buffer(buffer)
+        return
+
+    if isinstance(stdout, str):
+        yield from _parse_text_buffer(stdout.encode())
+        return
+
+    for lint_line in stdout:
+        fields = _parse_message_line(lint_line)
+        if not fields:
+            continue
+
+        yield fields
+
+        if 'Similar lines in' in fields[2]:
+            return
+
+
 def _process_line(fields: Tuple[str, int, str], changes: _typing.Changes) -> Optional[_typing.Lint]:
     """
     Process a single line message from PyLint or Flake8 report
@@ -83,60 +161,258 @@ def _process_line(fields: Tuple[str, int, str], changes: _typing.Changes) -> Opt
     return None
 
 
-def lint_compare_with_main_branch(
-        execute_command: str,
-        filters: Iterable[_typing.FiltersType]
-) -> Iterator[Union[_typing.Lint, _typing.FiltersType]]:
-    """
-    A common API for pylint and flake8
+async def _execute_lint_command(execute_command: str,
+                                paths: Sequence[str],
+                                options: Sequence[str] = ()) -> spill.Output:
     """
-    # pylint: disable=too-many-locals
-    changes = git.changes()
-
-    includes = re.compile(r'.py$')
-    excludes = re.compile(r"/setup.py")
-
-    paths = list(i for i in changes if includes.search(i) and not excludes.search(i))
-    if not paths:
-        return
+    Run the lint command in a subprocess and return its stdout, spilled to disk
 
+    :param options: given to the command before the files
+    """
     LOG.info("Execute lint commands %r for %r files ...", execute_command, len(paths))
-    lint_files = ' '.join(i for i in paths)
+    lint_files = ' '.join((*options, *paths))
 
     executed_command = execute_command.format(lint_file=lint_files)
     LOG.info("Execute lint command: %r", executed_command)
-    command = bash.bash(executed_command)
+    stdout, command = await spill.execute(executed_command)
 
     if command.stderr:
+        stdout.close()
         logging.error('Lint command failed: %s', command.stderr.decode())
         sys.exit(command.code)
 
-    stdout = command.stdout.decode()
+    LOG.debug('Lint stdout: %r bytes', stdout.size())
 
-    for filter_item in filters:
-        yield filter_item
+    return stdout
 
-    LOG.debug('Lint stdout: %s', stdout)
 
-    similar_line = None
+def prioritize(paths: Iterable[str], changes: _typing.Changes) -> List[str]:
+    """
+    Order the files with the most changed lines first
+    """
+    return sorted(paths, key=lambda path: -git.changed_line_count(changes, path))
 
-    for lint_line in stdout.split("\n"):
-        if similar_line:
-            continue
 
-        fields = _parse_message_line(lint_line)
-        if not fields:
-            continue
+def remaining_time(deadline: Optional[float]) -> Optional[float]:
+    """
+    Seconds left until the :py:func:`time.monotonic` deadline, None if there is no deadline
+    """
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
 
-        msg = fields[2]
-        if 'Similar lines in' in msg:
-            similar_line = True
-        else:
-            similar_line = None
 
-        results = _process_line(fields, changes)
-        if results:
-            yield results
+def report_not_checked(paths: Sequence[str]) -> None:
+    """
+    Report the files left out by the time budget, instead of failing
+    """
+    LOG.warning('Time budget exceeded, %r files were not checked: %s', len(paths), ', '.join(paths))
+
+
+def split_test_files(paths: Sequence[str],
+                     test_files_options: Sequence[str]) -> List[Tuple[Tuple[str, ...], List[str]]]:
+    """
+    Group the files by the options of their lint command, the test files are linted
+    with ``test_files_options``, e.g. the messages always filtered out in test files
+    are not computed at all
+
+    >>> split_test_files(['a.py', 'tests/test_a.py', 'b.py'], ['--disable=protected-access'])
+    [((), ['a.py', 'b.py']), (('--disable=protected-access',), ['tests/test_a.py'])]
+    """
+    if not test_files_options:
+        return [((), list(paths))]
+
+    # the file name, as the filters do
+    tests = {path for path in paths if TEST_FILES_REGEX.search(Path(path).name)}
+    groups: Tuple[Tuple[Tuple[str, ...], List[str]], ...] = (
+        ((), [path for path in paths if path not in tests]),
+        (tuple(test_files_options), [path for path in paths if path in tests])
+    )
+    return [(options, group) for options, group in groups if group]
+
+
+async def _lint_chunk(
+        execute_command: str,
+        parser: Callable[[spill.Stdout], Iterable[Tuple[str, int, str]]],
+        in_process: Optional[Callable[[Sequence[str]], Iterable[Tuple[str, int, str]]]],
+        options: Sequence[str],
+        chunk: Sequence[str]
+) -> List[Tuple[str, int, str]]:
+    """
+    The messages of a chunk, from the lint command or from the linter Python API
+    called in a worker process, see :py:func:`custolint.jobs.call`
+    """
+    if env.IN_PROCESS and in_process:
+        return await jobs.call(inprocess.collect, in_process, [*options, *chunk])
+
+    return list(parser(await _execute_lint_command(execute_command, chunk, options)))
+
+
+async def _lint_chunks(
+        execute_command: str,
+        parser: Callable[[spill.Stdout], Iterable[Tuple[str, int, str]]],
+        in_process: Optional[Callable[[Sequence[str]], Iterable[Tuple[str, int, str]]]],
+        paths: Sequence[str],
+        deadline: Optional[float],
+        test_files_options: Sequence[str] = ()
+) -> AsyncIterator[Tuple[Tuple[str, ...], Sequence[str], List[Tuple[str, int, str]]]]:
+    """
+    Lint all the files at once, or with a deadline chunk by chunk in the paths order,
+    streaming the options, the linted files and their messages as soon as a chunk is done
+
+    The test files of a chunk are linted apart with ``test_files_options``,
+    see :py:func:`split_test_files`. A check comparing the files sees only the files
+    of its group, it is left to the ``cross_file_job``
+    of :py:func:`lint_compare_with_main_branch_async`.
+    """
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    chunks = [group for chunk in ([paths] if deadline is None else [
+        paths[i:i + PRIORITY_CHUNK_SIZE] for i in range(0, len(paths), PRIORITY_CHUNK_SIZE)
+    ]) for group in split_test_files(chunk, test_files_options)]
+
+    # the scheduler starts the tasks in the creation order, so in priority order
+    tasks = [asyncio.ensure_future(
+        _lint_chunk(execute_command, parser, in_process, options, chunk)
+    ) for options, chunk in chunks]
+    pending = set(tasks)
+    try:
+        while pending and remaining_time(deadline) != 0:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=remaining_time(deadline),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in sorted(done, key=tasks.index):
+                yield (*chunks[tasks.index(task)], task.result())
+
+        if pending:
+            report_not_checked([path for task in tasks if task in pending
+                                for path in chunks[tasks.index(task)][1]])
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def lint_compare_with_main_branch(
+        execute_command: str,
+        filters: Iterable[_typing.FiltersType],
+        parser: Callable[[spill.Stdout], Iterable[Tuple[str, int, str]]] = _parse_text_output,
+        in_process: Optional[Callable[[Sequence[str]], Iterable[Tuple[str, int, str]]]] = None,
+        cache_namespace: Optional[str] = None,
+        test_files_options: Sequence[str] = (),
+        cross_file_job: Optional[Callable[[Sequence[str]],
+                                          Awaitable[List[Tuple[str, int, str]]]]] = None
+) -> Iterator[Union[_typing.Lint, _typing.FiltersType]]:
+    """
+    A common API for pylint and flake8
+
+    Synchronous variant of :py:func:`lint_compare_with_main_branch_async`
+    """
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    yield from jobs.run(jobs.collect(lint_compare_with_main_branch_async(
+        execute_command=execute_command,
+        filters=filters,
+        parser=parser,
+        in_process=in_process,
+        cache_namespace=cache_namespace,
+        test_files_options=test_files_options,
+        cross_file_job=cross_file_job
+    )))
+
+
+async def lint_compare_with_main_branch_async(
+        execute_command: str,
+        filters: Iterable[_typing.FiltersType],
+        parser: Callable[[spill.Stdout], Iterable[Tuple[str, int, str]]] = _parse_text_output,
+        in_process: Optional[Callable[[Sequence[str]], Iterable[Tuple[str, int, str]]]] = None,
+        changes: Optional[_typing.Changes] = None,
+        deadline: Optional[float] = None,
+        cache_namespace: Optional[str] = None,
+        test_files_options: Sequence[str] = (),
+        cross_file_job: Optional[Callable[[Sequence[str]],
+                                          Awaitable[List[Tuple[str, int, str]]]]] = None
+) -> AsyncIterator[_typing.LogLine]:
+    """
+    A common API for pylint and flake8
+
+    The files with the most changed lines are linted first.
+
+    :param parser: decode the tool output into ``(file_name, line_number, message)``,
+        by default the text report is parsed line by line
+    :param in_process: run the tool through its Python API when
+        :py:const:`custolint.env.IN_PROCESS` is enabled, see :py:mod:`custolint.inprocess`
+    :param changes: reuse the changes already computed by another command
+    :param deadline: :py:func:`time.monotonic` time to stop at,
+        the files not linted by then are reported, see :py:func:`report_not_checked`
+    :param cache_namespace: lint only the files missing from the cache,
+        see :py:mod:`custolint.cache`
+    :param test_files_options: lint the test files apart with these options,
+        given to the command and to ``in_process`` before the files
+    :param cross_file_job: a check across the files, e.g. pylint ``duplicate-code``,
+        run once for all the files along the chunks, its messages are merged
+        before the filters, see :py:func:`custolint.pylint.duplicate_code`
+    """
+    # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    if changes is None:
+        changes = await git.changes_async()
+
+    includes = re.compile(r'.py$')
+    excludes = re.compile(r"/setup.py")
+
+    paths = prioritize((i for i in changes if includes.search(i) and not excludes.search(i)),
+                       changes)
+    if not paths:
+        return
+
+    for filter_item in filters:
+        yield filter_item
+
+    async def _per_file() -> AsyncIterator[List[Tuple[str, int, str]]]:
+        if not cache_namespace:
+            async for _, _, messages in _lint_chunks(
+                    execute_command, parser, in_process, paths, deadline, test_files_options):
+                yield messages
+            return
+
+        groups = split_test_files(paths, test_files_options)
+        # the options change the messages
+        namespaces = {options: " ".join((cache_namespace, *options)) for options, _ in groups}
+        misses: List[str] = []
+        for options, group in groups:
+            messages, group_misses = cache.lookup(namespaces[options], group)
+            misses.extend(group_misses)
+            yield messages
+
+        if misses:
+            async for options, chunk, messages in _lint_chunks(
+                    execute_command, parser, in_process, prioritize(misses, changes), deadline,
+                    test_files_options):
+                cache.store(namespaces[options], chunk, messages)
+                yield messages
+
+    cross_file = asyncio.ensure_future(cross_file_job(paths)) if cross_file_job else None
+
+    async def _linted() -> AsyncIterator[List[Tuple[str, int, str]]]:
+        async for messages in _per_file():
+            yield messages
+
+        if cross_file is not None:
+            try:
+                yield await asyncio.wait_for(cross_file, remaining_time(deadline))
+            except asyncio.TimeoutError:
+                LOG.warning('Time budget exceeded, the checks across the files were not done')
+
+    try:
+        async for messages in _linted():
+            await git.attribute(changes, ((fields[0], fields[1]) for fields in messages))
+
+            for fields in messages:
+                results = _process_line(fields, changes)
+                if results:
+                    yield results
+    finally:
+        if cross_file is not None and not cross_file.done():
+            cross_file.cancel()
+            await asyncio.gather(cross_file, return_exceptions=True)
 
 
 def _output_grouping_by_email_and_file_name(chunk: Iterable[_typing.Coverage]) -> None:
@@ -217,6 +493,145 @@ def group_by_email_and_file_name(
     return SYSTEM_EXIT_CODE_WITH_ALL_MESSAGES_INCLUDED
 
 
+async def group_by_email_and_file_name_async(
+    log: AsyncIterable[_typing.Coverage],
+    contributors: Contributors,
+    halt_on_n_messages: int,
+    halt: bool = True
+) -> int:
+    """
+    Group by email and file name, used for coverage.
+
+    The chunks are built across consecutive lines, so the log is collected first.
+    """
+    return group_by_email_and_file_name(
+        log=await jobs.collect(log),
+        contributors=contributors,
+        halt_on_n_messages=halt_on_n_messages,
+        halt=halt
+    )
+
+
+def _exit(code: int, halt: bool) -> int:
+    if halt:
+        sys.exit(code)
+
+    return code
+
+
+class _LintOutput:
+    """
+    Filter and output the lint lines,
+    shared by :py:func:`filer_output` and :py:func:`filer_output_async`
+    """
+
+    def __init__(self, halt_on_n_messages: int) -> None:
+        self.halt_on_n_messages = halt_on_n_messages
+        # shared by the tools of the run, see :py:mod:`custolint.sources`
+        self.cache: MutableMapping[Path, Sequence[str]] = sources.SOURCES
+
+        # get filters from env, configuration and cli
+        self.filters_chain: List[_typing.FiltersType] = []
+
+        self.found_count = 0
+
+    def send(self, line: _typing.LogLine) -> bool:
+        """
+        Output the line if no filter skip it, return True when reaching N messages
+        """
+        if callable(line):
+            self.filters_chain.append(stats.instrument(line))
+            return False
+
+        if self.skipped(line):
+            return False
+
+        output(LINT_FORMAT, line.file_name, line.line_number, line.message, line.email, line.date)
+
+        self.found_count += 1
+
+        return bool(self.halt_on_n_messages and self.found_count == self.halt_on_n_messages)
+
+    def skipped(self, line: _typing.Lint) -> bool:
+        """
+        True if a filter of the chain skips the line
+        """
+        return any(
+            filter_item(Path(line.file_name), line.message, line.line_number, self.cache)
+            for filter_item in self.filters_chain
+        )
+
+    def exit_code(self, halt: bool, halted: bool) -> int:
+        """
+        Exit code according to the found messages
+        """
+        if halted:
+            return _exit(SYSTEM_EXIT_CODE_WITH_HALT_ON_N_MESSAGES, halt)
+
+        if not self.found_count:
+            output("::Dry and Clean::")
+            return SYSTEM_EXIT_CODE_DRY_AND_CLEAN
+
+        return _exit(SYSTEM_EXIT_CODE_WITH_ALL_MESSAGES_INCLUDED, halt)
+
+
+class InlineFilter:
+    """
+    custolint filtering of the messages emitted by a linter run outside custolint,
+    shared by :py:class:`custolint.pylint_reporter.Reporter` and
+    :py:class:`custolint.flake8_formatter.Formatter`
+
+    The changes are computed at the first message, once for the whole run,
+    the blamed changes of ``HEAD`` come from the cache, see :py:func:`custolint.git.changes_async`.
+    """
+
+    def __init__(self,
+                 filters: Iterable[_typing.FiltersType],
+                 contributors: Optional[Contributors] = None,
+                 changes: Optional[_typing.Changes] = None) -> None:
+        self.contributors = contributors or Contributors.from_env()
+        self.changes = changes
+        if env.FILTER_STATS:
+            stats.enable(env.FILTER_STATS)
+        self.lint_output = _LintOutput(halt_on_n_messages=0)
+        self.lint_output.filters_chain.extend(map(stats.instrument, filters))
+
+    def lint(self, fields: Tuple[str, int, str]) -> Optional[_typing.Lint]:
+        """
+        The message of a changed line, kept by the contributors and the filters, else None
+        """
+        if self.changes is None:
+            # the linter runs within the checkout, do not rebase it
+            self.changes = jobs.run(git.changes_async(do_pull_rebase=False,
+                                                      lazy=False,
+                                                      contributors=self.contributors))
+
+        # e.g. flake8 reports ``./src/a.py``
+        line = _process_line((os.path.normpath(fields[0]), fields[1], fields[2]), self.changes)
+        if line is None or not list(self.contributors.filter_log_line((line, ))):
+            return None
+
+        if self.lint_output.skipped(line):
+            return None
+
+        return line
+
+    def close(self) -> None:
+        """
+        End of the linter run, report the filter statistics of ``CUSTOLINT_FILTER_STATS``,
+        see :py:mod:`custolint.stats`
+        """
+        if env.FILTER_STATS:
+            stats.report(env.FILTER_STATS)
+
+    @staticmethod
+    def format(line: _typing.Lint) -> str:
+        """
+        The line as output by custolint
+        """
+        return LINT_FORMAT % (line.file_name, line.line_number, line.message, line.email, line.date)
+
+
 def filer_output(log: Iterable[_typing.LogLine],
                  contributors: Contributors,
                  halt_on_n_messages: int,
@@ -227,47 +642,64 @@ def filer_output(log: Iterable[_typing.LogLine],
     - include contributor
     - exclude contributor
     """
-    cache: Dict[Path, Sequence[str]] = {}
+    lint_output = _LintOutput(halt_on_n_messages)
 
-    # get filters from env, configuration and cli
-    filters_chain: List[_typing.FiltersType] = []
+    for line in contributors.filter_log_line(log):
+        if lint_output.send(line):
+            return lint_output.exit_code(halt, halted=True)
 
-    found_count = 0
+    return lint_output.exit_code(halt, halted=False)
 
-    for line in contributors.filter_log_line(log):
 
-        if callable(line):
-            filters_chain.append(line)
-            continue
+async def filer_output_async(log: AsyncIterable[_typing.LogLine],
+                             contributors: Contributors,
+                             halt_on_n_messages: int,
+                             halt: bool = True) -> int:
+    """
+    Asynchronous variant of :py:func:`filer_output`, the lines are output as they come
+    """
+    lint_output = _LintOutput(halt_on_n_messages)
 
-        do_continue = False
-        for filter_item in filters_chain:
-            if filter_item(
-                Path(line.file_name),
-                line.message,
-                line.line_number,
-                cache
-            ):
-                do_continue = True
-                break
-        if do_continue:
-            continue
+    async for line in log:
+        for contributor_line in contributors.filter_log_line((line, )):
+            if lint_output.send(contributor_line):
+                return lint_output.exit_code(halt, halted=True)
 
-        output('%s:%d %s ## %s:%s',
-               line.file_name, line.line_number, line.message, line.email, line.date)
+    return lint_output.exit_code(halt, halted=False)
 
-        found_count += 1
 
-        if halt_on_n_messages and found_count == halt_on_n_messages:
-            if halt:
-                sys.exit(SYSTEM_EXIT_CODE_WITH_HALT_ON_N_MESSAGES)
-            return SYSTEM_EXIT_CODE_WITH_HALT_ON_N_MESSAGES
+async def run_commands(commands: Sequence[Callable[..., Awaitable[int]]],
+                       halt: bool,
+                       contributors: Optional[Contributors] = None) -> int:
+    """
+    Orchestrate several commands, e.g. ``pylint.cli_async``, ``mypy.cli_async``.
 
-    if not found_count:
-        output("::Dry and Clean::")
-        return SYSTEM_EXIT_CODE_DRY_AND_CLEAN
+    The git changes are computed once and the commands run concurrently,
+    the output of each command is kept apart and shown in the commands order.
 
-    if halt:
-        sys.exit(SYSTEM_EXIT_CODE_WITH_ALL_MESSAGES_INCLUDED)
+    :param commands: called with ``changes`` and ``halt`` keywords
+    :param halt: exit at the first command, in order, having messages
+    :param contributors: keep only the changes of the contributors, see
+        :py:meth:`custolint.contributors.Contributors.filter_changes`
+    """
+    changes = await git.changes_async(contributors=contributors)
+    buffers: List[List[str]] = [[] for _ in commands]
 
-    return SYSTEM_EXIT_CODE_WITH_ALL_MESSAGES_INCLUDED
+    async def _run(command: Callable[..., Awaitable[int]], buffer: List[str]) -> int:
+        # each task runs in a copy of the context
+        _OUTPUT_BUFFER.set(buffer)
+        return await command(changes=changes, halt=False)
+
+    return_codes = await asyncio.gather(*(
+        _run(command, buffer) for command, buffer in zip(commands, buffers)
+    ))
+
+    halt_error_code = SYSTEM_EXIT_CODE_DRY_AND_CLEAN
+    for buffer, return_code in zip(buffers, return_codes):
+        for line in buffer:
+            builtins.print(line)
+
+        if return_code != SYSTEM_EXIT_CODE_DRY_AND_CLEAN:
+            halt_error_code = _exit(return_code, halt)
+
+    return halt_error_code
@@ -1,21 +1,32 @@
 """
 API to get the affected code lines by comparing current branch to a target branch.
+
+The changed lines are blamed upfront, or on demand with ``CUSTOLINT_LAZY_BLAME``
+environment variable, see :py:class:`LazyChanges`.
+
+The blame records and the blamed changes of a diff are cached by ``HEAD`` commit,
+see :py:mod:`custolint.cache`.
 """
-from typing import Iterable, Iterator, List, Optional, Tuple, Union, cast
+from typing import (Dict, Iterable, Iterator, List, Optional, Sequence, Set,
+                    Tuple, cast)
 
+import asyncio
 import json
 import logging
 import re
 import sys
 from collections import defaultdict
+from datetime import date
 from pathlib import Path
 
 import bash
 
-from . import _typing, env
+from . import _typing, cache, env, jobs
+from .contributors import Contributors
 
 LOG = logging.getLogger(__name__)
 MINIMUM_GIT_RECOMMEND_VERSION = (2, 39, 2)
+NOT_COMMITTED_YET = 'not.committed.yet'
 
 
 def _autodetect() -> Tuple[Path, str]:
@@ -55,41 +66,39 @@ def _autodetect() -> Tuple[Path, str]:
     return root_dir, branch_name
 
 
-def _split_as_blame_porcelain(output: str) -> Iterator[_typing.Blame]:
+def _split_as_blame_porcelain(output: str,
+                              skip_boundary: bool = False) -> Iterator[_typing.Blame]:
     """
     Process the output from git blame with porcelain argument
+
+    :param skip_boundary: drop the lines of the boundary commits,
+        older than ``--since`` date
     """
-    buffer: List[str] = []
+    chunks: List[List[str]] = []
 
     # 005661f440bcdfefb2fd41d4e781351471dfb3ef 26 33 1
     head_re = re.compile(r'^[0-9a-f]{40} \d+ \d+')
     for line in output.splitlines():
-        if buffer and head_re.search(line):
-            yield _typing.Blame.from_porcelain(tuple(buffer))
-            buffer.clear()
+        if not chunks or head_re.search(line):
+            chunks.append([])
 
-        buffer.append(line)
+        chunks[-1].append(line)
+
+    for chunk in chunks or [[]]:
+        if skip_boundary and 'boundary' in chunk:
+            continue
 
-    yield _typing.Blame.from_porcelain(tuple(buffer))
+        yield _typing.Blame.from_porcelain(tuple(chunk))
 
 
-def _blame(root_dir: Path, line_number: str, file_name: str) -> Iterator[_typing.Blame]:
+def _line_range(line_number: str) -> Tuple[int, int]:
     """
-    Parse blame log to extract: author email, author name, date and  file_name
+    Start line and number of lines of a diff hunk
 
-    > git blame --line-porcelain -L 33,+1 --show-email --show-name -- setup.cfg
-    005661f440bcdfefb2fd41d4e781351471dfb3ef 26 33 1
-    author John Snow
-    author-mail <John.Snow@John.Snow.tld>
-    author-time 1661418629
-    author-tz +0200
-    committer John Snow
-    committer-mail <John.Snow@John.Snow.tld>
-    committer-time 1661418629
-    committer-tz +0200
-    summary make custolint installable
-    filename setup.cfg
-            bash==0.6
+    >>> _line_range('33,2')
+    (33, 2)
+    >>> _line_range('33')
+    (33, 1)
     """
     if "-" in line_number:
         start, ends = [int(_) for _ in line_number.split("-")]
@@ -100,11 +109,81 @@ def _blame(root_dir: Path, line_number: str, file_name: str) -> Iterator[_typing
         plus_start = 1
         start = int(line_number)
 
-    # git blame -L 33,+1 --show-email -- helpers/src/banana_sdk/helpers/service_api/metadata.py
-    # 6d2056da7 (<saul.goodman@some-domain.com> 2020-06-03 14:11:42 +0200 33)  if event_count > 0:
-    execute_command = f"git blame --line-porcelain -L {start},+{plus_start} -- {root_dir/file_name}"
+    return start, plus_start
+
+
+def _consecutive_ranges(line_numbers: Iterable[int]) -> List[Tuple[int, int]]:
+    """
+    Merge line numbers into ``(start, number of lines)`` ranges
+
+    >>> _consecutive_ranges([7, 1, 2, 3])
+    [(1, 3), (7, 1)]
+    """
+    ranges: List[Tuple[int, int]] = []
+    for line_number in sorted(set(line_numbers)):
+        if ranges and sum(ranges[-1]) == line_number:
+            ranges[-1] = (ranges[-1][0], ranges[-1][1] + 1)
+        else:
+            ranges.append((line_number, 1))
+
+    return ranges
+
+
+async def _head() -> Optional[str]:
+    """
+    The ``HEAD`` commit keying the cached blames, None if the cache is disabled
+    """
+    if not cache.ENABLED:
+        return None
+
+    command = await jobs.execute("git rev-parse HEAD")
+    if command.code:
+        LOG.warning('Could not find HEAD commit, do not cache the blames: %s',
+                    command.stderr.decode())
+        return None
+
+    return command.stdout.decode().strip()
+
+
+def _blame_cache_key(root_dir: Path,
+                     file_name: str,
+                     ranges: Sequence[Tuple[int, int]],
+                     since: Optional[date],
+                     head: str) -> Optional[str]:
+    try:
+        blob_id = cache.blob_id(root_dir / file_name)
+    except OSError:
+        return None
+
+    return cache.key('blame', head, blob_id, file_name, repr(list(ranges)),
+                     since.isoformat() if since else "")
+
+
+async def _blame_ranges(root_dir: Path,
+                        file_name: str,
+                        ranges: Sequence[Tuple[int, int]],
+                        since: Optional[date] = None,
+                        head: Optional[str] = None) -> Iterator[_typing.Blame]:
+    """
+    Blame several ranges of the same file within a single git command
+
+    :param since: do not look for the commits older than the date,
+        their lines are blamed on boundary commits and dropped
+    :param head: the ``HEAD`` commit, the blames of the committed lines are cached by it
+    """
+    cache_key = _blame_cache_key(root_dir, file_name, ranges, since, head) if head else None
+    if cache_key:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return iter([_typing.Blame(*fields) for fields in cached])
+
+    line_ranges = " ".join(f"-L {start},+{plus_start}" for start, plus_start in ranges)
+    # the root commits are boundaries too, unless ``--root``
+    since_argument = f"--root --since={since.isoformat()} " if since else ""
+    execute_command = (f"git blame --line-porcelain {since_argument}{line_ranges} "
+                       f"-- {root_dir/file_name}")
     LOG.debug("Execute git blame command: %r", execute_command)
-    command = bash.bash(execute_command)
+    command = await jobs.execute(execute_command)
 
     if command.code:
         logging.error('Blame command failed: %s', command.stderr.decode())
@@ -112,32 +191,160 @@ def _blame(root_dir: Path, line_number: str, file_name: str) -> Iterator[_typing
 
     stdout = command.stdout.decode().strip()
 
-    return _split_as_blame_porcelain(stdout)
+    blames = list(_split_as_blame_porcelain(stdout, skip_boundary=since is not None))
+    if cache_key and all(blame.email != NOT_COMMITTED_YET for blame in blames):
+        cache.put(cache_key, blames)
 
+    return iter(blames)
+
+
+async def _blame(root_dir: Path,
+                 line_number: str,
+                 file_name: str,
+                 since: Optional[date] = None,
+                 head: Optional[str] = None) -> Iterator[_typing.Blame]:
+    """
+    Parse blame log to extract: author email, author name, date and  file_name
 
-def _process_diff_line(
-        root_dir: Path,
-        diff_line: str,
-        file_name: str) -> Union[str, None, Iterator[_typing.Blame]]:
+    > git blame --line-porcelain -L 33,+1 --show-email --show-name -- setup.cfg
+    005661f440bcdfefb2fd41d4e781351471dfb3ef 26 33 1
+    author John Snow
+    author-mail <John.Snow@John.Snow.tld>
+    author-time 1661418629
+    author-tz +0200
+    committer John Snow
+    committer-mail <John.Snow@John.Snow.tld>
+    committer-time 1661418629
+    committer-tz +0200
+    summary make custolint installable
+    filename setup.cfg
+            bash==0.6
+    """
+    # git blame -L 33,+1 --show-email -- helpers/src/banana_sdk/helpers/service_api/metadata.py
+    # 6d2056da7 (<saul.goodman@some-domain.com> 2020-06-03 14:11:42 +0200 33)  if event_count > 0:
+    return await _blame_ranges(root_dir, file_name, (_line_range(line_number),), since, head)
+
+
+def _process_diff_line(diff_line: str, file_name: str) -> Tuple[str, Optional[str]]:
+    """
+    Return the file name of the diff and the affected lines of a hunk, alike ``146`` or ``1,146``
+    """
     # line like +++ b/care/share/calc/_methods2.py
     if diff_line.startswith("+++ "):
         _, file_name = diff_line.split("+++ ", maxsplit=1)
-        return file_name[2:]
+        return file_name[2:], None
 
     # line like @@ -0,0 +1,146 @@
     if not diff_line.startswith("@@"):
-        return None
+        return file_name, None
 
     affected_lines = diff_line.split("+", maxsplit=1)[1].split(maxsplit=1)[0]
 
     if affected_lines.endswith(",0"):  # the line is deleted and have to be ignored
-        return None
+        return file_name, None
+
+    return file_name, affected_lines
 
-    return _blame(
-        root_dir=root_dir,
-        line_number=affected_lines,
-        file_name=file_name
-    )
+
+def _parse_diff(stdout: str) -> Dict[str, List[str]]:
+    """
+    Affected lines of each hunk grouped by file name
+    """
+    hunks: Dict[str, List[str]] = defaultdict(list)
+    the_file = ""
+    for line in stdout.split("\n"):
+        the_file, affected_lines = _process_diff_line(diff_line=line, file_name=the_file)
+        if affected_lines:
+            hunks[the_file].append(affected_lines)
+
+    return hunks
+
+
+def _contributor(blame: _typing.Blame) -> _typing.Contributor:
+    return {
+        'author': blame.author,
+        'email': blame.email,
+        'date': blame.date
+    }
+
+
+class LazyChanges(Dict[str, Dict[int, _typing.Contributor]]):
+    """
+    Changes of the diff blamed on demand.
+
+    Only the changed file names are known upfront, the lines are attributed by
+    :py:func:`attribute` once the tools have reported their findings.
+    Usually less than 1% of the changed lines have a finding, so most of the blames are saved.
+    """
+
+    def __init__(self,
+                 root_dir: Path,
+                 lines: Dict[str, Set[int]],
+                 contributors: Optional[Contributors] = None,
+                 head: Optional[str] = None) -> None:
+        super().__init__((file_name, {}) for file_name in lines)
+        self.root_dir = root_dir
+        self.lines = lines
+        self.contributors = contributors
+        self.head = head
+        self._not_blamed = {file_name: set(numbers) for file_name, numbers in lines.items()}
+        self._lock = asyncio.Lock()
+
+    async def attribute(self, locations: Iterable[Tuple[str, int]]) -> None:
+        """
+        Blame the changed lines among the locations, batched per file
+        """
+        # concurrent commands share the changes, do not blame the same line twice
+        async with self._lock:
+            requested: Dict[str, Set[int]] = defaultdict(set)
+            for file_name, line_number in locations:
+                if line_number in self._not_blamed.get(file_name, ()):
+                    requested[file_name].add(line_number)
+
+            if not requested:
+                return
+
+            LOG.info("Blame %r lines with findings in %r files",
+                     sum(len(i) for i in requested.values()), len(requested))
+
+            blamed: _typing.Changes = defaultdict(dict)
+            for blames in await asyncio.gather(*(
+                    _blame_ranges(self.root_dir,
+                                  file_name,
+                                  _consecutive_ranges(line_numbers),
+                                  self.contributors.since if self.contributors else None,
+                                  self.head)
+                    for file_name, line_numbers in requested.items()
+            )):
+                for blame in blames:
+                    blamed[blame.file_name][blame.line_number] = _contributor(blame)
+
+            for file_name, line_numbers in requested.items():
+                self._not_blamed[file_name] -= line_numbers
+
+            if self.contributors:
+                blamed = self.contributors.filter_changes(blamed)
+
+            for file_name, lines in blamed.items():
+                self[file_name].update(lines)
+
+
+def changed_line_count(diff_changes: _typing.Changes, file_name: str) -> int:
+    """
+    Number of changed lines of a file, blamed or not yet
+    """
+    if isinstance(diff_changes, LazyChanges):
+        return len(diff_changes.lines.get(file_name, ()))
+
+    return len(diff_changes.get(file_name) or ())
+
+
+async def attribute(diff_changes: _typing.Changes, locations: Iterable[Tuple[str, int]]) -> None:
+    """
+    Blame the changed lines with findings when the changes are :py:class:`LazyChanges`
+    """
+    if isinstance(diff_changes, LazyChanges):
+        await diff_changes.attribute(locations)
 
 
 def _current_branch_name() -> str:
@@ -151,6 +358,20 @@ def _current_branch_name() -> str:
     return cast(str, command.stdout.decode().strip())
 
 
+def python_files() -> List[str]:
+    """
+    The python files tracked by git
+    """
+    execute_command = "git ls-files -- '*.py'"
+    LOG.info("Execute git command %r", execute_command)
+    command = bash.bash(execute_command)
+    if command.code:
+        logging.error('Could not list the files: %s', command.stderr.decode())
+        sys.exit(command.code)
+
+    return list(command.stdout.decode().splitlines())
+
+
 def _check_git_version() -> Tuple[int, ...]:
     """
     Show a warning if the git version used is lower than was tested with by developer
@@ -209,22 +430,80 @@ def _git_sync(do_pull_rebase: bool, main_branch: str) -> Optional[str]:
     return current_branch_name
 
 
+async def _blame_hunks(root_dir: Path,
+                       hunks: Dict[str, List[str]],
+                       diff: str,
+                       since: Optional[date],
+                       head: Optional[str]) -> _typing.Changes:
+    """
+    Blame the changed hunks concurrently, the snapshot of a diff at ``HEAD`` commit is cached
+    """
+    files: _typing.Changes = defaultdict(dict)
+
+    snapshot_key = cache.key('changes', head, diff, since.isoformat() if since else "") \
+        if head else None
+    snapshot = cache.get(snapshot_key) if snapshot_key else None
+    if snapshot is not None:
+        # JSON object keys are strings
+        for file_name, lines in snapshot.items():
+            files[file_name] = {int(line_number): contributor
+                                for line_number, contributor in lines.items()}
+        return files
+
+    blames = [
+        _blame(root_dir=root_dir,
+               line_number=line_number,
+               file_name=file_name,
+               since=since,
+               head=head)
+        for file_name, affected_lines in hunks.items()
+        for line_number in affected_lines
+    ]
+
+    for blame_result in await asyncio.gather(*blames):
+        for blame in blame_result:
+            files[blame.file_name][blame.line_number] = _contributor(blame)
+
+    if snapshot_key and all(contributor['email'] != NOT_COMMITTED_YET
+                            for lines in files.values()
+                            for contributor in lines.values()):
+        cache.put(snapshot_key, files)
+
+    return files
+
+
 def changes(do_pull_rebase: bool = True) -> _typing.Changes:
     """
     Get diff changes of current branch against master branch and
     return a mapping of affected filename and line numbers
+
+    Synchronous variant of :py:func:`changes_async`
+    """
+    return jobs.run(changes_async(do_pull_rebase))
+
+
+async def changes_async(do_pull_rebase: bool = True,
+                        lazy: Optional[bool] = None,
+                        contributors: Optional[Contributors] = None) -> _typing.Changes:
+    """
+    Get diff changes of current branch against master branch and
+    return a mapping of affected filename and line numbers.
+
+    The changed hunks are blamed concurrently.
+
+    :param lazy: skip the blames, return :py:class:`LazyChanges` to be attributed on demand,
+        by default :py:const:`custolint.env.LAZY_BLAME`
+    :param contributors: keep only the lines of the contributors within the date range,
+        the other files are not linted at all
     """
     root_dir, main_branch = _autodetect()
     LOG.info("Compare current branch with %r branch", main_branch)
 
-    files: _typing.Changes = defaultdict(dict)
-
     _git_sync(do_pull_rebase, main_branch)
 
-    the_file = ""
     execute_command = f"git diff origin/{main_branch} -U0 --diff-filter=ACMRTUXB"
     LOG.info("Execute git diff command %r", execute_command)
-    command = bash.bash(execute_command)
+    command = await jobs.execute(execute_command)
 
     if command.code:
         logging.error('Diff command failed: %s', command.stderr.decode())
@@ -233,32 +512,25 @@ def changes(do_pull_rebase: bool = True) -> _typing.Changes:
     stdout = command.stdout.decode()
     LOG.debug('Git diff output %s', stdout)
 
-    for line in stdout.split("\n"):
-
-        result = _process_diff_line(
-            root_dir=root_dir,
-            diff_line=line,
-            file_name=the_file
-        )
-
-        if not result:
-            continue
-
-        if isinstance(result, str):
-            the_file = result
-            continue
-
-        if isinstance(result, Iterable):  # pragma: no cover why is not cover : TODO
-            typed_result = cast(Iterable[_typing.Blame], result)
-            for blame in typed_result:
-                change = files[blame.file_name]
-
-                change[blame.line_number] = {
-                    'author': blame.author,
-                    'email': blame.email,
-                    'date': blame.date
-                }
-            continue
+    hunks = _parse_diff(stdout)
+    since = contributors.since if contributors else None
+    head = await _head()
+
+    if env.LAZY_BLAME if lazy is None else lazy:
+        lines = {
+            file_name: {
+                line_number
+                for start, plus_start in map(_line_range, affected_lines)
+                for line_number in range(start, start + plus_start)
+            } for file_name, affected_lines in hunks.items()
+        }
+        LOG.info("Git diff detected %r filed affected, blame on demand", len(lines))
+        return LazyChanges(root_dir, lines, contributors, head)
+
+    files = await _blame_hunks(root_dir, hunks, stdout, since, head)
+
+    if contributors:
+        files = contributors.filter_changes(files)
 
     LOG.info("Git diff detected %r filed affected", len(files))
     if LOG.isEnabledFor(logging.DEBUG):
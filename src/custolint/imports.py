@@ -0,0 +1,150 @@
+"""
+Import graph of the project, to type check the modules depending on the changed ones.
+
+mypy reports the errors of the files it is given, a changed signature breaks the unchanged
+modules importing it, which are not checked. The modules importing the changed modules,
+and the ones importing them, up to ``CUSTOLINT_MYPY_DEPENDENTS`` levels (or
+``--mypy-dependents``), are added to the mypy files, see :py:func:`dependents`.
+The messages are still reported only for the changed lines.
+
+The imports of a file are parsed with :py:mod:`ast` and cached by git blob id,
+see :py:mod:`custolint.cache`.
+"""
+from typing import Dict, Iterator, List, Optional, Sequence, Set
+
+import ast
+import logging
+from collections import defaultdict
+from pathlib import Path
+
+from . import cache, git
+
+LOG = logging.getLogger(__name__)
+
+
+def module_name(path: str) -> str:
+    """
+    Dotted name of the module of a file, its package being the parent directories
+    with a ``__init__.py``, as mypy does
+
+    >>> module_name('src/custolint/imports.py')
+    'custolint.imports'
+    >>> module_name('tests/test_imports.py')
+    'test_imports'
+    """
+    file_path = Path(path)
+    parts = [] if file_path.stem == '__init__' else [file_path.stem]
+    directory = file_path.parent
+    while (directory / '__init__.py').exists():
+        parts.insert(0, directory.name)
+        if directory.parent == directory:
+            break
+        directory = directory.parent
+
+    return '.'.join(parts)
+
+
+def _resolve(module: str, is_package: bool, node: ast.ImportFrom) -> Optional[str]:
+    """
+    Absolute name of the module of a ``from ... import`` statement
+    """
+    if not node.level:
+        return node.module
+
+    package = module.split('.') if is_package else module.split('.')[:-1]
+    if node.level - 1 > len(package):  # out of the project
+        return None
+
+    base = package[:len(package) - node.level + 1]
+    return '.'.join(base + ([node.module] if node.module else []))
+
+
+def _parse(path: str, module: str) -> List[str]:
+    """
+    Names of the modules imported by a file, including the packages of the imported modules
+    """
+    try:
+        tree = ast.parse(Path(path).read_bytes(), path)
+    except (OSError, SyntaxError, ValueError):  # reported by mypy
+        return []
+
+    imported: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imported.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = _resolve(module, Path(path).stem == '__init__', node)
+            if base:
+                imported.add(base)
+                # the imported names may be modules as well
+                imported.update(f"{base}.{alias.name}" for alias in node.names)
+
+    return sorted({
+        '.'.join(name.split('.')[:index + 1])
+        for name in imported for index in range(name.count('.') + 1)
+    })
+
+
+def imported_modules(path: str, module: str) -> List[str]:
+    """
+    Names of the modules imported by a file, cached by git blob id
+    """
+    try:
+        entry_key = cache.key('imports', module, cache.blob_id(Path(path)))
+    except OSError:
+        return []
+
+    imported = cache.get(entry_key)
+    if imported is None:
+        imported = _parse(path, module)
+        cache.put(entry_key, imported)
+
+    return list(imported)
+
+
+def reverse_graph(paths: Sequence[str]) -> Dict[str, Set[str]]:
+    """
+    The files importing each module
+    """
+    importers: Dict[str, Set[str]] = defaultdict(set)
+    for path in paths:
+        for imported in imported_modules(path, module_name(path)):
+            importers[imported].add(path)
+
+    return importers
+
+
+def _levels(changed: Sequence[str], importers: Dict[str, Set[str]]) -> Iterator[Set[str]]:
+    seen = set(changed)
+    level = set(changed)
+    while level:
+        level = {importer for path in level
+                 for importer in importers.get(module_name(path), ())} - seen
+        seen.update(level)
+        yield level
+
+
+def dependents(changed: Sequence[str], depth: int) -> List[str]:
+    """
+    The files importing the changed files, directly or through ``depth - 1`` other files
+    """
+    if depth <= 0 or not changed:
+        return []
+
+    importers = reverse_graph(git.python_files())
+
+    found: List[str] = []
+    for _, level in zip(range(depth), _levels(changed, importers)):
+        found.extend(sorted(level))
+
+    LOG.info('Found %r files importing the %r changed files, up to %r levels',
+             len(found), len(changed), depth)
+    return found
+
+
+__all__ = [
+    'dependents',
+    'imported_modules',
+    'module_name',
+    'reverse_graph',
+]
@@ -0,0 +1,138 @@
+"""
+In-process execution of the linters through their Python API.
+
+Saves the interpreter startup, plugin import and configuration parsing of a fresh subprocess.
+The messages are collected as objects and converted straight into
+``(file_name, line_number, message)`` fields, without serializing and re-parsing a text report.
+
+Enable it with ``CUSTOLINT_IN_PROCESS`` environment variable.
+The linters are called in the worker processes of :py:func:`custolint.jobs.call`,
+so the event loop and the deadlines keep running meanwhile. The workers are spawned,
+a script calling custolint API has to be guarded by ``if __name__ == '__main__':``.
+
+.. code-block:: bash
+
+    $ CUSTOLINT_IN_PROCESS=1 custolint pylint
+
+.. note:: ``mypy.api.run`` returns only the report text,
+    so mypy output is still decoded by :py:func:`custolint.mypy.compare_with_main_branch`.
+"""
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import logging
+from pathlib import Path
+
+LOG = logging.getLogger(__name__)
+
+
+def pylint_fields(message: Any) -> Tuple[str, int, str]:
+    """
+    ``(file_name, line_number, message)`` of a ``pylint.message.Message``,
+    the message as in the text report ``column: message-id: message (symbol)``
+    """
+    # duplicate-code message is followed by the duplicated code lines
+    text = message.msg.split("\n", maxsplit=1)[0]
+    return (
+        message.path,
+        message.line,
+        f"{message.column}: {message.msg_id}: {text} ({message.symbol})"
+    )
+
+
+def flake8_fields(violation: Any) -> Tuple[str, int, str]:
+    """
+    ``(file_name, line_number, message)`` of a ``flake8.violation.Violation``,
+    the message as in the default report ``column: code text``
+    """
+    return (
+        violation.filename,
+        violation.line_number,
+        f"{violation.column_number}: {violation.code} {violation.text}"
+    )
+
+
+def pylint(paths: Sequence[str],
+           config: Optional[Path],
+           options: Sequence[str] = ()) -> Iterator[Tuple[str, int, str]]:
+    """
+    Run ``pylint.lint.Run`` with a collecting reporter, the ``options`` as on the command line
+    """
+    # pylint: disable=import-outside-toplevel
+    from pylint.lint import Run
+    from pylint.reporters import CollectingReporter
+
+    config_argument = [f"--rcfile={config}"] if config else []
+
+    reporter = CollectingReporter()
+    LOG.info("Execute in-process pylint for %r files", len(paths))
+    Run([*config_argument, *options, *paths], reporter=reporter, exit=False)
+
+    for message in reporter.messages:
+        yield pylint_fields(message)
+
+
+def flake8(paths: Sequence[str], config: Optional[Path]) -> Iterator[Tuple[str, int, str]]:
+    """
+    Run flake8 legacy ``StyleGuide`` with a collecting formatter
+    """
+    # pylint: disable=import-outside-toplevel
+    from flake8.api import legacy
+    from flake8.formatting.base import BaseFormatter
+    from flake8.main import application
+    from flake8.options.parse_args import parse_args
+
+    violations: List[Any] = []
+
+    class CollectingFormatter(BaseFormatter):  # type: ignore[misc]
+        """Keep the violations instead of writing them"""
+
+        def handle(self, error: Any) -> None:
+            violations.append(error)
+
+        def format(self, error: Any) -> Optional[str]:
+            return None
+
+    # ``legacy.get_style_guide`` does not read the configuration file,
+    # so the application is provisioned with the same arguments as the CLI
+    app = application.Application()
+    app.plugins, app.options = parse_args([f"--config={config}"] if config else [])
+    app.make_formatter()
+    app.make_guide()
+    app.make_file_checker_manager([])
+
+    style_guide = legacy.StyleGuide(app)
+    style_guide.init_report(CollectingFormatter)
+
+    LOG.info("Execute in-process flake8 for %r files", len(paths))
+    style_guide.check_files(list(paths))
+
+    for violation in violations:
+        yield flake8_fields(violation)
+
+
+def collect(linter: Callable[..., Iterable[Tuple[str, int, str]]],
+            *args: Any) -> List[Tuple[str, int, str]]:
+    """
+    The messages of a linter as a list, sent back by a worker process
+    """
+    return list(linter(*args))
+
+
+def mypy(arguments: Sequence[str]) -> Tuple[str, str, int]:
+    """
+    Run ``mypy.api.run``, return stdout, stderr and exit status
+    """
+    from mypy import api  # pylint: disable=import-outside-toplevel
+
+    LOG.info("Execute in-process mypy %r", arguments)
+    return api.run(list(arguments))
+
+
+__all__ = [
+    'collect',
+    'flake8',
+    'flake8_fields',
+    'mypy',
+    'pylint',
+    'pylint_fields',
+]
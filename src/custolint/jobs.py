@@ -0,0 +1,407 @@
+"""
+Asynchronous execution of the subprocess work: git diff, git blame, linters and coverage report.
+
+All of them are I/O-bound waits on a child process, so they are started
+with :py:func:`asyncio.create_subprocess_exec` and awaited concurrently.
+The synchronous API is a thin :py:func:`asyncio.run` wrapper, see :py:func:`run`.
+
+Every child process takes a slot of a single :py:class:`Scheduler`,
+so the blames, the linters and the coverage report share one CPU budget.
+The budget is sized from the cgroup CPU quota, see :py:func:`cpu_budget`.
+
+Under ``make -jN`` every job but the first also takes a token of the
+`GNU make jobserver <https://www.gnu.org/software/make/manual/html_node/Job-Slots.html>`_,
+see :py:class:`JobServer`, so custolint and make share the same job slots.
+
+The linters run through their Python API, see :py:mod:`custolint.inprocess`, are CPU-bound
+and not thread-safe, so they are called in worker processes, see :py:func:`call`,
+within a slot as well.
+"""
+from typing import (IO, Any, AsyncIterable, AsyncIterator, Awaitable, Callable,
+                    Iterable, List, NamedTuple, Optional, Set, Tuple, TypeVar)
+
+import asyncio
+import concurrent.futures
+import contextlib
+import logging
+import math
+import multiprocessing
+import os
+import shlex
+import shutil
+import signal
+import weakref
+from pathlib import Path
+
+import bash
+
+from . import env
+
+LOG = logging.getLogger(__name__)
+T = TypeVar('T')
+CGROUP_ROOT = Path('/sys/fs/cgroup')
+LOW_PRIORITY_NICENESS = 19
+
+
+class Result(NamedTuple):
+    """
+    Completed subprocess, same attributes as the ``bash.bash`` result
+    """
+    stdout: bytes
+    stderr: bytes
+    code: int
+
+
+def _cgroup_path(root: Path) -> Path:
+    """
+    The cgroup v2 directory of the current process, ``/proc/self/cgroup`` line alike ``0::/a/b``
+    """
+    try:
+        for line in Path('/proc/self/cgroup').read_text(encoding='utf-8').splitlines():
+            if line.startswith('0::'):
+                return root / line[3:].lstrip('/')
+    except OSError:
+        pass
+
+    return root
+
+
+def cgroup_cpu_quota(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """
+    CPU quota of the container, e.g. ``1.5`` CPUs, None when not limited.
+
+    - cgroup v2: ``cpu.max`` alike ``150000 100000`` or ``max 100000``
+    - cgroup v1: ``cpu/cpu.cfs_quota_us`` (``-1`` when not limited) and ``cpu/cpu.cfs_period_us``
+    """
+    for cpu_max in (_cgroup_path(root) / 'cpu.max', root / 'cpu.max'):
+        try:
+            quota, period = cpu_max.read_text(encoding='utf-8').split()
+        except (OSError, ValueError):
+            continue
+
+        return None if quota == 'max' else int(quota) / int(period)
+
+    try:
+        quota = (root / 'cpu' / 'cpu.cfs_quota_us').read_text(encoding='utf-8').strip()
+        period = (root / 'cpu' / 'cpu.cfs_period_us').read_text(encoding='utf-8').strip()
+    except OSError:
+        return None
+
+    return None if int(quota) <= 0 else int(quota) / int(period)
+
+
+def cpu_budget(root: Path = CGROUP_ROOT) -> int:
+    """
+    Number of CPUs custolint may use: the cgroup quota, the CPU affinity then the CPU count
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = len(os.sched_getaffinity(0))
+    else:  # pragma: no cover not available on macOS
+        cpus = os.cpu_count() or 1
+
+    quota = cgroup_cpu_quota(root)
+    if quota:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+
+    return cpus
+
+
+def lower_priority() -> None:
+    """
+    Run custolint and its child processes in background: lowest CPU and idle I/O priority
+    """
+    os.nice(LOW_PRIORITY_NICENESS - os.nice(0))
+
+    if shutil.which('ionice'):
+        command = bash.bash(f'ionice -c 3 -p {os.getpid()}')
+        if command.code:
+            LOG.warning('Could not set idle I/O priority: %s', command.stderr.decode())
+
+
+class JobServer:
+    """
+    Client of the GNU make jobserver.
+
+    A process started by make owns one implicit job slot,
+    each additional concurrent job reads a token from the jobserver and writes it back when done.
+    """
+
+    def __init__(self, read_fd: int, write_fd: int) -> None:
+        self.read_fd = read_fd
+        self.write_fd = write_fd
+
+    @staticmethod
+    def _parse_makeflags(makeflags: str) -> Optional[str]:
+        """
+        >>> JobServer._parse_makeflags(' -j4 --jobserver-auth=3,4')
+        '3,4'
+        >>> JobServer._parse_makeflags('-j4 --jobserver-auth=fifo:/tmp/GMfifo1')
+        'fifo:/tmp/GMfifo1'
+        >>> JobServer._parse_makeflags('--jobserver-fds=3,4 -j')
+        '3,4'
+        >>> JobServer._parse_makeflags('-k')
+        """
+        auth = None
+        for flag in makeflags.split():
+            # the last one wins, older make versions use --jobserver-fds
+            for prefix in ('--jobserver-auth=', '--jobserver-fds='):
+                if flag.startswith(prefix):
+                    auth = flag[len(prefix):]
+
+        return auth
+
+    @classmethod
+    def from_makeflags(cls, makeflags: str) -> Optional['JobServer']:
+        """
+        Connect to the jobserver of ``MAKEFLAGS``, None if custolint does not run under ``make -jN``
+        """
+        auth = cls._parse_makeflags(makeflags)
+        if not auth:
+            return None
+
+        fds: Tuple[int, int]
+        try:
+            if auth.startswith('fifo:'):
+                fifo = os.open(auth[len('fifo:'):], os.O_RDWR)
+                fds = (fifo, fifo)
+            else:
+                read_fd, write_fd = auth.split(',')
+                fds = (int(read_fd), int(write_fd))
+                for descriptor in fds:
+                    os.fstat(descriptor)
+        except (OSError, ValueError) as error:
+            # make passes the file descriptors only to the recipes marked with ``+``
+            LOG.warning('Make jobserver %r is not available, ignore it: %s', auth, error)
+            return None
+
+        LOG.info('Share make jobserver %r', auth)
+        return cls(*fds)
+
+    async def acquire(self) -> bytes:
+        """
+        Wait for a token of the jobserver
+        """
+        loop = asyncio.get_running_loop()
+        # the jobserver pipe is shared with make, so it must stay in blocking mode
+        future = loop.run_in_executor(None, os.read, self.read_fd, 1)
+        try:
+            token = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(self._release_late_token)
+            raise
+
+        if not token:
+            raise OSError(f'Make jobserver {self.read_fd!r} is closed')
+
+        return token
+
+    def _release_late_token(self, future: 'asyncio.Future[bytes]') -> None:
+        # give back the token read after the cancellation
+        if not future.cancelled() and not future.exception() and future.result():
+            self.release(future.result())
+
+    def release(self, token: bytes) -> None:
+        """
+        Give back the token to the jobserver
+        """
+        os.write(self.write_fd, token)
+
+
+class Scheduler:
+    """
+    A single budget of concurrent jobs, shared by all parallel stages
+    """
+
+    def __init__(self, budget: int, jobserver: Optional[JobServer] = None) -> None:
+        self.budget = budget
+        self.jobserver = jobserver
+        self._implicit_slot_taken = False
+        self._semaphores: \
+            'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = \
+            weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to an event loop
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.budget)
+
+        return self._semaphores[loop]
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Wait for a free slot of the budget
+        """
+        async with self._semaphore():
+            if self.jobserver is None:
+                yield
+            elif not self._implicit_slot_taken:
+                self._implicit_slot_taken = True
+                try:
+                    yield
+                finally:
+                    self._implicit_slot_taken = False
+            else:
+                token = await self.jobserver.acquire()
+                try:
+                    yield
+                finally:
+                    self.jobserver.release(token)
+
+    async def submit(self, awaitable: Awaitable[T]) -> T:
+        """
+        Run a job within a slot of the budget
+        """
+        async with self.slot():
+            return await awaitable
+
+
+_SCHEDULER: Optional[Scheduler] = None
+
+
+def scheduler() -> Scheduler:
+    """
+    The global scheduler, sized by ``CUSTOLINT_JOBS`` or by :py:func:`cpu_budget`,
+    limited by the make jobserver when there is one
+    """
+    global _SCHEDULER  # pylint: disable=global-statement
+
+    if _SCHEDULER is None:
+        _SCHEDULER = Scheduler(env.JOBS or cpu_budget(), JobServer.from_makeflags(env.MAKEFLAGS))
+        LOG.info('Run up to %r jobs concurrently', _SCHEDULER.budget)
+
+    return _SCHEDULER
+
+
+async def execute(command: str, stdout: Optional[IO[bytes]] = None) -> Result:
+    """
+    Execute a command without a shell and wait for its completion
+
+    :param stdout: write the output into the file instead of the memory,
+        the result ``stdout`` is then empty, see :py:class:`custolint.spill.Output`
+    """
+    async with scheduler().slot():
+        LOG.debug("Execute command %r", command)
+        process = await asyncio.create_subprocess_exec(
+            *shlex.split(command),
+            stdout=stdout or asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            output, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            # e.g. the time budget is exceeded, do not leave the process behind
+            process.kill()
+            await process.wait()
+            raise
+
+    return Result(stdout=output or b'', stderr=stderr, code=process.returncode or 0)
+
+
+_EXECUTOR: Optional[concurrent.futures.ProcessPoolExecutor] = None
+# the pids of the worker processes, registered as they start
+_WORKERS: Optional['multiprocessing.SimpleQueue[int]'] = None
+_CALLS: 'Set[concurrent.futures.Future[Any]]' = set()
+
+
+def _register_worker(workers: 'multiprocessing.SimpleQueue[int]') -> None:
+    # before the worker takes any call, so a running call always has a registered worker
+    workers.put(os.getpid())
+
+
+def _executor() -> concurrent.futures.ProcessPoolExecutor:
+    """
+    The worker processes of the run, sized by the budget, started on first use
+    """
+    global _EXECUTOR, _WORKERS  # pylint: disable=global-statement
+
+    if _EXECUTOR is None:
+        # a forked worker would inherit the threads of the event loop
+        context = multiprocessing.get_context('spawn')
+        _WORKERS = context.SimpleQueue()
+        _EXECUTOR = concurrent.futures.ProcessPoolExecutor(
+            scheduler().budget, mp_context=context,
+            initializer=_register_worker, initargs=(_WORKERS,)
+        )
+
+    return _EXECUTOR
+
+
+async def call(function: Callable[..., T], *args: Any) -> T:
+    """
+    Call a synchronous function in a worker process within a slot of the budget,
+    so the event loop and the deadlines keep running meanwhile
+
+    The function, its arguments and its result are pickled, the workers are kept
+    along the run, so they import the linters only once.
+    """
+    async with scheduler().slot():
+        future = _executor().submit(function, *args)
+        _CALLS.add(future)
+        future.add_done_callback(_CALLS.discard)
+        return await asyncio.wrap_future(future)
+
+
+def shutdown() -> None:
+    """
+    Stop the worker processes, a call still running is abandoned, e.g. after a deadline
+    """
+    global _EXECUTOR, _WORKERS  # pylint: disable=global-statement
+
+    if _EXECUTOR is None or _WORKERS is None:
+        return
+
+    for future in list(_CALLS):
+        future.cancel()
+    # the executor would wait for the running calls, there is no public API to stop them
+    while not _WORKERS.empty():
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(_WORKERS.get(), signal.SIGTERM)
+    _EXECUTOR.shutdown(wait=True)
+    _EXECUTOR = _WORKERS = None
+
+
+async def collect(iterable: AsyncIterable[T]) -> List[T]:
+    """
+    Consume an asynchronous iterable into a list
+    """
+    return [item async for item in iterable]
+
+
+async def replay(iterable: Iterable[T]) -> AsyncIterator[T]:
+    """
+    Expose a synchronous iterable as an asynchronous one
+    """
+    for item in iterable:
+        yield item
+
+
+def run(awaitable: Awaitable[T]) -> T:
+    """
+    Synchronous entry point of the asynchronous API
+    """
+    async def _main() -> T:
+        return await awaitable
+
+    try:
+        return asyncio.run(_main())
+    finally:
+        shutdown()
+
+
+__all__ = [
+    'JobServer',
+    'Result',
+    'Scheduler',
+    'call',
+    'cgroup_cpu_quota',
+    'collect',
+    'cpu_budget',
+    'execute',
+    'lower_priority',
+    'replay',
+    'run',
+    'scheduler',
+    'shutdown',
+]
@@ -34,21 +34,28 @@ Filter all original Mypy message with custolint rules
     :cwd: ..
 
 """
-from typing import Dict, Iterable, Iterator, Optional, Sequence, Union
+from typing import (AsyncIterator, Awaitable, Iterable, Iterator,
+                    MutableMapping, Optional, Sequence, Tuple, Union)
 
+import asyncio
+import json
 import logging
 import re
+import shlex
 import sys
 import tempfile
 from pathlib import Path
 
-import bash
-from mypy import errorcodes
+from mypy.version import __version__ as mypy_version
 
-from . import _typing, env, generics, git
+from . import (_typing, dmypy, env, generics, git, imports, inprocess, jobs,
+               mypycache, rules, spill)
 from .contributors import Contributors
 
 LOG = logging.getLogger(__name__)
+JSON_OUTPUT_MINIMUM_VERSION = (1, 11)
+INCLUDES = re.compile(r'\.py$')
+EXCLUDES = re.compile(r"/setup\.py")
 
 
 def _process_line(fields: Sequence[str], changes: _typing.Changes) -> Optional[_typing.Lint]:
@@ -87,106 +94,110 @@ def _process_line(fields: Sequence[str], changes: _typing.Changes) -> Optional[_
     raise ValueError(str(fields))
 
 
-def _filter_test_function(message: str, line_content: str) -> bool:
+def _filter(path: Path,
+            message: str,
+            line_number: int,
+            cache: MutableMapping[Path, Sequence[str]]) -> bool:
     """
-    SubCase of the ``_filter``function
-
-    TODO: Check in configuration what is considered test function
-    by default is ``def test_.*``
+    Return True if we want to skip the check else False if we want this check,
+    see :py:mod:`custolint.rules`
     """
-    if "def test_" in line_content:
-        if f" [{errorcodes.TYPE_ARG.code}]" in message:
-            return True
+    return rules.matcher('mypy').skip(path, message, line_number, cache)
 
-        if f" [{errorcodes.NO_UNTYPED_DEF.code}]" in message:
-            return True
 
-        if f" [{errorcodes.ATTR_DEFINED.code}]" in message:
-            return True
+def _parse_message_line(message: str) -> Sequence[str]:
+    return message.split(":", 3)  # filepath, line number, level, message
 
-        if "Use \"-> None\" if function does not return a value" in message:
-            return True
 
-        if "dict-item" in message:
-            return True
+def _parse_json_line(message: str) -> Iterator[Sequence[str]]:
+    """
+    Decode a ``mypy --output=json`` record into the same fields as the text report.
 
-    return False
+    The hint is yielded as a separate ``note``, as mypy does in the text report.
+    """
+    record = json.loads(message)
 
+    text = record['message']
+    if record.get('code'):
+        text += f"  [{record['code']}]"
 
-def _filter_test_function_attr_defined(message: str,
-                                       line_content: str,
-                                       previous_line_content: Optional[str]) -> bool:
-    mocking_line = re.compile(r'(mock|mocker)\.patch\.object\(')
+    yield record['file'], str(record['line']), record['severity'], text
 
-    # mock a transient attribute which is not declared in __all__
-    # e.g.
-    # mock.patch.object(generics.git, "changes", return_value={
-    # test_b.py:78 Module has no attribute "git" [attr-defined]
-    if all((
-            f" [{errorcodes.ATTR_DEFINED.code}]" in message,
-            mocking_line.search(line_content),
-    )):
-        return True
+    if record.get('hint'):
+        yield record['file'], str(record['line']), 'note', record['hint']
 
-    # if the line is split check previous line
-    if previous_line_content and all((
-            f" [{errorcodes.ATTR_DEFINED.code}]" in message,
-            mocking_line.search(previous_line_content),
-    )):
-        return True
 
-    # It is normal practice to patch private api in tests
-    # from a.b.c.d import e
-    # ORIGINAL_E_GET_TIME = e._get_time
-    if re.search(r'Module ".+" does not explicitly export attribute "_.+"', message):
-        return True
+def _parse_output_line(message: str) -> Iterator[Sequence[str]]:
+    """
+    Prefer the JSON record, fall back to the text report line
+    """
+    if message.startswith('{'):
+        yield from _parse_json_line(message)
+    else:
+        yield _parse_message_line(message)
 
-    if 'Missing type parameters for generic type "Callable"  [type-arg]' in message:
-        return True
 
-    return False
+def _output_argument() -> str:
+    """
+    Request JSON output where mypy supports it (``--output=json`` since 1.11)
+    """
+    version = tuple(int(i) for i in re.findall(r'\d+', mypy_version)[:2])
+    return "--output=json" if version >= JSON_OUTPUT_MINIMUM_VERSION else ""
 
 
-def _filter(path: Path, message: str, line_number: int, cache: Dict[Path, Sequence[str]]) -> bool:
+async def _execute(execute_command: str) -> spill.Stdout:
     """
-    Return True if we want to skip the check else False if we want this check
+    Run mypy in a subprocess or in-process, return its stdout
     """
-    # pylint: disable=too-many-return-statements
+    if env.IN_PROCESS:
+        stdout, stderr, code = await jobs.call(inprocess.mypy, shlex.split(execute_command)[1:])
+        if stderr:
+            logging.error('Mypy command failed: %s', stderr)
+            sys.exit(code)
 
-    # pylint: disable=duplicate-code
-    if not generics.TEST_FILES_REGEX.search(path.name):
-        return False
+        return stdout
 
-    if path not in cache:
-        cache[path] = path.read_bytes().decode().splitlines()
+    LOG.info("Execute command %r", execute_command)
+    output, command = await spill.execute(execute_command)
 
-    content = cache[path]
+    if command.stderr:
+        output.close()
+        logging.error('Mypy command failed: %s', command.stderr.decode())
+        sys.exit(command.code)
 
-    line_content = content[line_number - 1]
-    previous_line_content = content[line_number - 2] if line_number - 2 >= 0 else None
+    return output
 
-    # pylint: disable=c-extension-no-member
-    # if a function have a 'dummy' or 'mock' in word in its name
-    # then it can be skipped for check
-    if all((
-        f" [{errorcodes.NO_UNTYPED_DEF.code}]" in message,
-        re.search(r'def .*(dummy|mock).*\(', line_content),
-    )):
-        return True
 
-    do_filter = _filter_test_function_attr_defined(message, line_content, previous_line_content)
-    if do_filter:
-        return do_filter
+def _config_flags() -> Tuple[Optional[Path], str]:
+    """
+    The configuration file if any and the mypy options,
+    the cache directory is kept by custolint, see :py:mod:`custolint.mypycache`
+    """
+    config = Path(env.CONFIG_D, "mypy.ini")
+    if not config.exists():
+        return None, " ".join(("--strict --show-error-codes", mypycache.argument(None)))
 
-    do_filter = _filter_test_function(message, line_content)
-    if do_filter:
-        return do_filter
+    return config, " ".join((f"--config-file={config}", mypycache.argument(config)))
+
+
+def _paths_argument(paths: Sequence[str]) -> str:
+    """
+    mypy accept a reference to a file as an argument
+    """
+    _, tmp_path = tempfile.mkstemp()
+    Path(tmp_path).write_text("\n".join(paths))  # pylint: disable=unspecified-encoding
 
-    return False
+    return f"@{tmp_path}"
 
 
-def _parse_message_line(message: str) -> Sequence[str]:
-    return message.split(":", 3)  # filepath, line number, level, message
+def export_cache() -> None:
+    """
+    Check all the files of the project, then export the mypy cache,
+    see :py:func:`custolint.mypycache.export_cache`
+    """
+    paths = [i for i in git.python_files() if not EXCLUDES.search(i)]
+    config, flags = _config_flags()
+    jobs.run(mypycache.export_cache(flags, config, _paths_argument(paths)))
 
 
 def compare_with_main_branch(
@@ -194,59 +205,111 @@ def compare_with_main_branch(
 ) -> Iterator[Union[_typing.Lint, _typing.FiltersType]]:
     """
     Compare mypy output against target branch
+
+    Synchronous variant of :py:func:`compare_with_main_branch_async`
     """
-    # pylint: disable=too-many-locals
+    yield from jobs.run(jobs.collect(compare_with_main_branch_async(filters)))
 
-    changes = git.changes()
 
-    includes = re.compile(r'\.py$')
-    excludes = re.compile(r"/setup\.py")
+async def compare_with_main_branch_async(
+        filters: Iterable[_typing.FiltersType] = (_filter,),
+        changes: Optional[_typing.Changes] = None,
+        deadline: Optional[float] = None,
+        daemon: Optional[bool] = None,
+        dependents: Optional[int] = None
+) -> AsyncIterator[_typing.LogLine]:
+    """
+    Compare mypy output against target branch
+
+    :param changes: reuse the changes already computed by another command
+    :param deadline: :py:func:`time.monotonic` time to stop at,
+        mypy checks the whole program at once so all the files are reported as not checked
+    :param daemon: check with the mypy daemon, see :py:mod:`custolint.dmypy`,
+        by default :py:const:`custolint.env.MYPY_DAEMON`
+    :param dependents: check as well the files importing the changed files up to this depth,
+        see :py:mod:`custolint.imports`, by default :py:const:`custolint.env.MYPY_DEPENDENTS`
+    """
+    # pylint: disable=too-many-locals
 
-    paths = "\n".join(i for i in changes if includes.search(i) and not excludes.search(i))
+    if changes is None:
+        changes = await git.changes_async()
+
+    paths = generics.prioritize(
+        (i for i in changes if INCLUDES.search(i) and not EXCLUDES.search(i)),
+        changes
+    )
 
     if not paths:
         LOG.info("No file was affected")
         return
 
-    # mypy accept a reference to a file as an argument
-    _, tmp_path = tempfile.mkstemp()
-    Path(tmp_path).write_text(paths)  # pylint: disable=unspecified-encoding
-
-    config = Path(env.CONFIG_D, "mypy.ini")
-    config_argument = f"--config-file={config}" if config.exists() else ""
-    command_args = " ".join((
-        "mypy",
-        config_argument or "--strict --show-error-codes",
-        "@{tmp_path}"
-    ))
-
-    execute_command = command_args.format(tmp_path=tmp_path)
-
-    LOG.info("Execute command %r", execute_command)
-    command = bash.bash(execute_command)
-    if command.stderr:
-        logging.error('Mypy command failed: %s', command.stderr.decode())
-        sys.exit(command.code)
-
-    stdout = command.stdout.decode()
+    # the messages of the dependents are reported only for the changed lines
+    targets = [*paths, *(path for path in imports.dependents(
+        paths, env.MYPY_DEPENDENTS if dependents is None else dependents
+    ) if INCLUDES.search(path) and not EXCLUDES.search(path))]
+
+    config, flags = _config_flags()
+    mypycache.import_cache(config)
+
+    checked: Awaitable[spill.Stdout]
+    if env.MYPY_DAEMON if daemon is None else daemon:
+        # the daemon reports as text only
+        checked = dmypy.check(targets, flags, config)
+    else:
+        checked = _execute(" ".join(("mypy", flags, _output_argument(), _paths_argument(targets))))
+
+    try:
+        stdout: spill.Stdout = await asyncio.wait_for(checked, generics.remaining_time(deadline))
+    except asyncio.TimeoutError:
+        generics.report_not_checked(paths)
+        return
 
     for filter_item in filters:
         yield filter_item
 
-    for mypy_line in stdout.split("\n"):
-        fields = _parse_message_line(mypy_line)
+    messages = [
+        fields for mypy_line in spill.text_lines(stdout) for fields in _parse_output_line(mypy_line)
+    ]
+    await git.attribute(
+        changes,
+        ((fields[0], int(fields[1])) for fields in messages if len(fields) == 4)
+    )
 
+    for fields in messages:
         results = _process_line(fields, changes)
         if results:
             yield results
 
 
-def cli(contributors: Contributors, halt_on_n_messages: int, halt: bool = True) -> int:
-    """Provide interface for mypy CLI"""
-    # pylint:disable=duplicate-code
-    return generics.filer_output(
-        log=compare_with_main_branch(),
+async def cli_async(contributors: Contributors,
+                    halt_on_n_messages: int,
+                    halt: bool = True,
+                    changes: Optional[_typing.Changes] = None,
+                    deadline: Optional[float] = None,
+                    daemon: Optional[bool] = None,
+                    dependents: Optional[int] = None) -> int:
+    """Asynchronous interface for mypy CLI"""
+    # pylint:disable=duplicate-code,too-many-arguments,too-many-positional-arguments
+    if changes is None:
+        # skip the files without any line of the contributors
+        changes = await git.changes_async(contributors=contributors)
+
+    return await generics.filer_output_async(
+        log=compare_with_main_branch_async(changes=changes, deadline=deadline,
+                                           daemon=daemon, dependents=dependents),
         contributors=contributors,
         halt_on_n_messages=halt_on_n_messages,
         halt=halt
     )
+
+
+def cli(contributors: Contributors,
+        halt_on_n_messages: int,
+        halt: bool = True,
+        deadline: Optional[float] = None,
+        daemon: Optional[bool] = None,
+        dependents: Optional[int] = None) -> int:
+    """Provide interface for mypy CLI"""
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    return jobs.run(cli_async(contributors, halt_on_n_messages, halt,
+                              deadline=deadline, daemon=daemon, dependents=dependents))
@@ -0,0 +1,148 @@
+"""
+The mypy incremental cache, warmed from the target branch.
+
+A fresh CI checkout has no ``.mypy_cache``, so mypy analyses the whole program again.
+custolint keeps the mypy ``--cache-dir`` under its cache directory, see
+:py:func:`cache_dir`, and shares it through the cache storage, see :py:mod:`custolint.cache`:
+
+1. on the target branch, ``custolint mypy --export-cache`` checks all the files of the project,
+   then archives the mypy cache into the storage, see :py:func:`export_cache`
+2. a branch without local mypy cache imports the archive of its target branch before
+   running mypy, see :py:func:`import_cache`, so mypy analyses only the modules
+   affected by the branch
+
+.. code-block:: bash
+
+    # CI, on main
+    $ CUSTOLINT_CACHE_URL=http://cache.ci.local/custolint custolint mypy --export-cache
+
+    # CI, on a merge request
+    $ CUSTOLINT_CACHE_URL=http://cache.ci.local/custolint custolint mypy
+
+The mypy cache is keyed on the mypy version, the Python version and the configuration
+content, see :py:func:`fingerprint`, the archive on the project and the target branch as well.
+"""
+from typing import Optional
+
+import hashlib
+import io
+import logging
+import os
+import sys
+import tarfile
+from pathlib import Path
+
+from mypy.version import __version__ as mypy_version
+
+from . import cache, env, git, spill
+
+LOG = logging.getLogger(__name__)
+
+
+def fingerprint(config: Optional[Path]) -> str:
+    """
+    Digest of everything a mypy cache depends on, but the files
+    """
+    digest = hashlib.sha256()
+    digest.update(mypy_version.encode())
+    digest.update(f"{sys.version_info.major}.{sys.version_info.minor}".encode())
+    if config and config.exists():
+        digest.update(config.read_bytes())
+
+    return digest.hexdigest()
+
+
+def cache_dir(config: Optional[Path]) -> Path:
+    """
+    The mypy ``--cache-dir`` of the current project
+    """
+    project = hashlib.sha256(f"{os.getcwd()}:{fingerprint(config)}".encode()).hexdigest()[:16]
+    return Path(env.CACHE_DIR, 'mypy', project)
+
+
+def argument(config: Optional[Path]) -> str:
+    """
+    The mypy ``--cache-dir`` option, none if the cache is disabled
+    """
+    return f"--cache-dir={cache_dir(config)}" if cache.ENABLED else ""
+
+
+def _archive_key(config: Optional[Path]) -> str:
+    root_dir, main_branch = git._autodetect()  # pylint: disable=protected-access
+    return cache.key('mypy', root_dir.name, main_branch, fingerprint(config), suffix='.tar.gz')
+
+
+def _safe_member(member: tarfile.TarInfo) -> bool:
+    """
+    A file or a directory within the extraction directory
+
+    >>> _safe_member(tarfile.TarInfo('./3.11/os.meta.json'))
+    True
+    >>> _safe_member(tarfile.TarInfo('./3.11/../../.bashrc'))
+    False
+    """
+    if not (member.isfile() or member.isdir()):
+        return False
+
+    return not member.name.startswith('/') and '..' not in Path(member.name).parts
+
+
+def import_cache(config: Optional[Path]) -> bool:
+    """
+    Extract the mypy cache of the target branch, unless there is a local one already
+    """
+    directory = cache_dir(config)
+    if not cache.ENABLED or directory.exists():
+        return False
+
+    archive = cache.storage().get(_archive_key(config))
+    if archive is None:
+        LOG.info('No mypy cache of the target branch, mypy analyses all the files')
+        return False
+
+    with tarfile.open(fileobj=io.BytesIO(archive), mode='r:gz') as tar:
+        members = tar.getmembers()
+        # the archive comes from a shared store, do not write out of the cache directory
+        if not all(_safe_member(member) for member in members):
+            LOG.warning('Ignore the mypy cache archive, unexpected member paths')
+            return False
+
+        tar.extractall(directory, members)  # nosec: the members are checked above
+
+    LOG.info('Imported the mypy cache of the target branch, %r bytes', len(archive))
+    return True
+
+
+async def export_cache(flags: str, config: Optional[Path], paths: str) -> None:
+    """
+    Check the files with mypy, then archive its cache into the storage
+
+    :param flags: mypy options, including the ``--cache-dir``
+    :param paths: ``@file`` with the list of files to check
+    """
+    if not cache.ENABLED:
+        LOG.warning('The cache is disabled, do not export the mypy cache')
+        return
+
+    LOG.info('Check all the files to export the mypy cache')
+    output, command = await spill.execute(f"mypy {flags} {paths}")
+    output.close()
+    if command.stderr:
+        logging.error('Mypy command failed: %s', command.stderr.decode())
+        sys.exit(command.code)
+
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w:gz') as tar:
+        tar.add(cache_dir(config), arcname='.')
+
+    cache.storage().put(_archive_key(config), archive.getvalue())
+    LOG.info('Exported the mypy cache of the target branch, %r bytes', len(archive.getvalue()))
+
+
+__all__ = [
+    'argument',
+    'cache_dir',
+    'export_cache',
+    'fingerprint',
+    'import_cache',
+]
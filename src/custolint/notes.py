@@ -0,0 +1,176 @@
+"""
+Results of a commit shared through `git notes <https://git-scm.com/docs/git-notes>`_.
+
+The cache entries used by a run (lint results, blame records and the blamed changes)
+are written into a note of the ``HEAD`` commit under ``refs/notes/custolint``,
+then pushed to ``origin``. Another run on the same commit, e.g. a developer pulling
+a branch already checked by the CI, fetches the notes and reads them back before
+doing any work, no additional infrastructure is required.
+
+The entries are content-addressed, see :py:mod:`custolint.cache`, so an entry of a note
+is never used for a different file content, configuration or tool version.
+
+Enable it with ``--git-notes`` option or ``CUSTOLINT_GIT_NOTES`` environment variable:
+
+- ``read``: fetch the notes and read the note of ``HEAD`` commit
+- ``write``: read, then write the note of ``HEAD`` commit and push the notes
+
+.. code-block:: bash
+
+    # CI
+    $ custolint pylint --git-notes=write
+
+    # developer
+    $ CUSTOLINT_GIT_NOTES=read custolint pylint
+"""
+from typing import Any, Dict, Optional
+
+import json
+import logging
+import tempfile
+
+import bash
+
+from . import cache
+
+LOG = logging.getLogger(__name__)
+NOTES_REF = 'refs/notes/custolint'
+MODES = ('read', 'write')
+
+
+class NotesStorage(cache.Storage):
+    """
+    The JSON entries of the ``HEAD`` commit note, in front of the other storage,
+    the other entries, e.g. the mypy cache archives, are not kept in the note
+    """
+
+    def __init__(self, storage: cache.Storage, commit: str, entries: Dict[str, Any]) -> None:
+        self.storage = storage
+        self.commit = commit
+        self.entries = entries
+        self.used: Dict[str, Any] = {}
+
+    def get(self, entry_key: str) -> Optional[bytes]:
+        if entry_key in self.entries:
+            self.used[entry_key] = self.entries[entry_key]
+            return json.dumps(self.entries[entry_key]).encode()
+
+        value = self.storage.get(entry_key)
+        if value is not None and entry_key.endswith('.json'):
+            self.used[entry_key] = json.loads(value)
+
+        return value
+
+    def put(self, entry_key: str, value: bytes) -> None:
+        if entry_key.endswith('.json'):
+            self.used[entry_key] = json.loads(value)
+        self.storage.put(entry_key, value)
+
+    def evict(self, max_size: Optional[int] = None) -> None:
+        self.storage.evict(max_size)
+
+
+def _git(command: str, failure: Optional[str] = None) -> Optional[str]:
+    """
+    Output of a git command, None if it failed
+
+    :param failure: warning shown when the command fails, followed by the git error
+    """
+    LOG.debug("Execute git notes command %r", command)
+    result = bash.bash(command)
+    if result.code:
+        if failure:
+            LOG.warning('%s: %s', failure, result.stderr.decode().strip())
+        return None
+
+    return str(result.stdout.decode())
+
+
+def fetch() -> None:
+    """
+    Fetch the notes of ``origin``, they override the local ones
+    """
+    _git(f'git fetch origin +{NOTES_REF}:{NOTES_REF}',
+         f'Could not fetch {NOTES_REF!r} from origin, use the local notes')
+
+
+def push() -> None:
+    """
+    Push the notes to ``origin``
+    """
+    _git(f'git push origin {NOTES_REF}', f'Could not push {NOTES_REF!r} to origin')
+
+
+def read(commit: str) -> Dict[str, Any]:
+    """
+    The entries of the commit note, empty if there is none
+    """
+    # no note is not an error
+    note = _git(f'git notes --ref={NOTES_REF} show {commit}')
+    if not note:
+        return {}
+
+    try:
+        entries = json.loads(note)
+    except ValueError:
+        LOG.warning('Ignore the note of %r, not written by custolint', commit)
+        return {}
+
+    return entries if isinstance(entries, dict) else {}
+
+
+def write(commit: str, entries: Dict[str, Any]) -> None:
+    """
+    Replace the commit note by the entries
+    """
+    with tempfile.NamedTemporaryFile('w', suffix='.json', encoding='utf-8') as note:
+        json.dump(entries, note, sort_keys=True)
+        note.flush()
+
+        _git(f'git notes --ref={NOTES_REF} add --force --file={note.name} {commit}',
+             f'Could not write the note of {commit!r}')
+
+
+def attach(mode: str) -> Optional[NotesStorage]:
+    """
+    Read the note of ``HEAD`` commit in front of the cache storage
+    """
+    if not cache.ENABLED:
+        return None
+
+    head = _git('git rev-parse HEAD', 'Could not find HEAD commit, do not use git notes')
+    if head is None:
+        return None
+
+    fetch()
+    storage = NotesStorage(cache.storage(), head.strip(), read(head.strip()))
+    LOG.info('Read %r entries from the git note of %r, mode %r',
+             len(storage.entries), storage.commit, mode)
+
+    cache.use(storage)
+    return storage
+
+
+def detach(storage: NotesStorage, mode: str) -> None:
+    """
+    Write the entries used by the run into the note of ``HEAD`` commit, then push it
+    """
+    if mode != 'write' or storage.used.items() <= storage.entries.items():
+        return
+
+    LOG.info('Write %r entries into the git note of %r', len(storage.used), storage.commit)
+    write(storage.commit, {**storage.entries, **storage.used})
+    push()
+
+
+__all__ = [
+    'MODES',
+    'NOTES_REF',
+    'NotesStorage',
+    'attach',
+    'detach',
+    'fetch',
+    'push',
+    'read',
+    'write',
+]
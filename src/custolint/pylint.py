@@ -24,138 +24,209 @@
     :cwd: ..
 
 """
-from typing import Dict, Iterable, Iterator, Optional, Sequence, Union
+from typing import (Any, AsyncIterator, Dict, Iterable, Iterator, List,
+                    MutableMapping, Optional, Sequence, Tuple, Union)
 
-import re
+import functools
+import itertools
+import json
+import logging
 from pathlib import Path
 
-from . import _typing, env, generics
+from . import _typing, env, generics, git, inprocess, jobs, rules, spill
+from .cache import lookup_combined
+from .cache import namespace as cache_namespace
+from .cache import store_combined
 from .contributors import Contributors
 
+LOG = logging.getLogger(__name__)
 
-def _filter_test_function(message: str, line_content: str) -> bool:  # pylint: disable=too-many-return-statements
-    # :check-description: test methods does not require to provide docstring
-    if "def test_" in line_content:
-        if '(missing-function-docstring)' in message:
-            return True
 
-    # :check-description: fixtures in test does not require to provide docstring
-    # e.g. def mock_get_data(*_, **__):
-    if 'def mock_' in line_content:
-        return True
-
-    if ' (missing-module-docstring)' in message:
-        return True
+def _filter(path: Path,
+            message: str,
+            line_number: int,
+            cache: MutableMapping[Path, Sequence[str]]) -> bool:
+    """
+    Return True if we want to skip the check else False if we want this check,
+    see :py:mod:`custolint.rules`
+    """
+    return rules.matcher('pylint').skip(path, message, line_number, cache)
 
-    if " (protected-access)" in message:
-        return True
 
-    if " (too-many-public-methods)" in message:
-        return True
+FILTERS: Tuple[_typing.FiltersType, ...] = (_filter, )
 
-    if 'R0801: Similar lines in ' in message:
-        return True
 
-    return False
+def _json_message_fields(message: Dict[str, Any]) -> Tuple[str, int, str]:
+    # duplicate-code message is followed by the duplicated code lines
+    text = message['message'].split("\n", maxsplit=1)[0]
 
+    return (
+        message['path'],
+        message['line'],
+        f"{message['column']}: {message['message-id']}: {text} ({message['symbol']})"
+    )
 
-def _filter_all_function(message: str,
-                         line_content: str,
-                         previous_line_content: Optional[str]) -> bool:
-    # :check-description:
-    # if function has embedded the description in the name do not ask for additional description
-    # e.g. ``def is_valid_target(``, ``update_calculation_id`` TODO: check for verbs in future
-    if all((
-            ' (missing-function-docstring)' in message,
-            re.search(r"^\s*def (\w{4,}|is|has|do)_\w{4,}(_\w{4,}|id)+\(", line_content)
-    )):
-        return True
 
-    # :check-description: if a property then do not ask for a description
-    if all(
-            ('@property' in (previous_line_content or ''),
-             ' (missing-function-docstring)' in message
-             )):
-        return True
+def _parse_json_output(stdout: spill.Stdout) -> Iterator[Tuple[str, int, str]]:
+    """
+    Decode ``pylint --output-format=json`` report message by message.
 
-    if all((
-            ' (logging-fstring-interpolation)' in message,
-            re.search(r"\w\.(critical|error|warning|info)\(", line_content)
-    )):
-        return True
+    The message is rebuilt as in the text report ``column: message-id: message (symbol)``,
+    so the filters work the same way. Falls back to the text parser if the output is not JSON.
 
-    # ignore all TODO marked with Jira reference
-    if re.search(r"TODO: [A-Z]{3,}-\d+: ", message, re.IGNORECASE):
-        return True
+    The report is an indented list, ``json.dumps(messages, indent=4)``, each message is decoded
+    once its closing brace line is read, so the whole report is never held in memory.
+    """
+    lines = spill.text_lines(stdout)
+    first_line = next((line for line in lines if line.strip()), '')
+    if not first_line.startswith('['):
+        if first_line:
+            LOG.warning('Pylint output is not a JSON document, fall back to text parsing')
+            yield from generics._parse_text_output(  # pylint: disable=protected-access
+                itertools.chain((first_line,), lines)
+            )
+        return
+
+    decoder = json.JSONDecoder()
+    record: List[str] = []
+    for line in itertools.chain((first_line[1:],), lines):
+        stripped = line.strip()
+        if not record and stripped in ('', ',', ']'):
+            continue
+
+        record.append(line)
+        if stripped.rstrip(',') != '}':
+            continue
+
+        try:
+            message, _ = decoder.raw_decode("\n".join(record).strip())
+        except json.JSONDecodeError:  # the end of a nested object
+            continue
+
+        record = []
+        yield _json_message_fields(message)
+
+    if record:
+        LOG.warning('Pylint JSON output is truncated: %s', "\n".join(record))
+
+
+async def duplicate_code(paths: Sequence[str]) -> List[Tuple[str, int, str]]:
+    """
+    ``duplicate-code`` messages of the files, checked by a pylint run of its own.
 
-    return False
+    The similarity checker compares every pair of files, so it dominates the pylint time
+    on a large change and its messages can not be cached per file. It runs once for all
+    the files along the main pylint run, its messages are cached by the content of all
+    the files. The main run lints the files in groups, see :py:func:`_lint_arguments`,
+    this run compares all of them, the test files included.
+    """
+    config = Path(env.CONFIG_D, 'pylintrc')
+    config_argument = f"--rcfile={config}" if config.exists() else ""
+    options = ("--disable=all", "--enable=duplicate-code")
+    command = " ".join(("pylint", config_argument, "--output-format=json", "{lint_file}"))
 
+    paths = sorted(paths)
+    if len(paths) < 2:
+        return []
 
-def _filter_pydantic(message: str,
-                     previous_line_content: Optional[str]) -> bool:
+    namespace = cache_namespace('pylint', config, " ".join((command, *options)))
+    cached = lookup_combined(namespace, paths) if namespace else None
+    if cached is not None:
+        LOG.info('Duplicate code cache hit for %r files', len(paths))
+        return cached
 
-    # :check-description: if validator of pydantic then cls is ok
-    if all(
-            ('@validator(' in (previous_line_content or ''),
-             ' should have "self" as first argument (no-self-argument)' in message
-             )):
-        return True
+    if env.IN_PROCESS:
+        messages = await jobs.call(inprocess.collect, inprocess.pylint, [*options, *paths],
+                                   config if config.exists() else None)
+    else:
+        messages = list(_parse_json_output(
+            await generics._execute_lint_command(command, paths, options)  # pylint: disable=protected-access
+        ))
 
-    return False
+    if namespace:
+        store_combined(namespace, paths, messages)
+    return messages
 
 
-def _filter(path: Path, message: str, line_number: int, cache: Dict[Path, Sequence[str]]) -> bool:
+def disabled_in_test_files() -> List[str]:
     """
-    Return True if we want to skip the check else False if we want this check
+    The messages always filtered out in the test files, see the rules, so not even computed
+    for them, but ``duplicate-code`` compares the test files with the other files,
+    see :py:func:`duplicate_code`
     """
-    # pylint: disable=too-many-return-statements
-
-    if path not in cache:
-        cache[path] = path.read_bytes().decode().splitlines()
-
-    content = cache[path]
-
-    line_content = content[line_number - 1]
-    previous_line_content = content[line_number - 2] if line_number - 2 >= 0 else None
-
-    if generics.TEST_FILES_REGEX.search(path.name):
-        do_filter = _filter_test_function(message, line_content)
-        if do_filter:
-            return True
+    return [code for code in rules.matcher('pylint').test_files_codes if code != 'duplicate-code']
 
-    do_filter = _filter_pydantic(message, previous_line_content)
-    if do_filter:
-        return True
 
-    return _filter_all_function(
-        message=message,
-        line_content=line_content,
-        previous_line_content=previous_line_content
+def _lint_arguments(filters: Iterable[_typing.FiltersType]) -> Dict[str, Any]:
+    config = Path(env.CONFIG_D, 'pylintrc')
+    config_argument = f"--rcfile={config}" if config.exists() else ""
+    # the files are linted in groups, the test files apart, the cache misses apart
+    # and chunk by chunk with a deadline, so duplicate-code is checked by its own job
+    # across all the files, see duplicate_code
+    disable_arguments = ("--disable=duplicate-code", )
+    command = " ".join(
+        ("pylint", config_argument, *disable_arguments, "--output-format=json", "{lint_file}")
     )
 
+    return {
+        'execute_command': command,
+        'filters': filters,
+        'parser': _parse_json_output,
+        'in_process': functools.partial(inprocess.pylint,
+                                        config=config if config.exists() else None,
+                                        options=disable_arguments),
+        'cache_namespace': cache_namespace('pylint', config, command),
+        'test_files_options': (f"--disable={','.join(disabled_in_test_files())}", ),
+        'cross_file_job': duplicate_code
+    }
+
 
 def compare_with_main_branch(
-        filters: Iterable[_typing.FiltersType] = (_filter, )
+        filters: Iterable[_typing.FiltersType] = FILTERS
 ) -> Iterator[Union[_typing.Lint, _typing.FiltersType]]:
     """
     Compare all pylint messages against code different to target branch.
     """
-    config = Path(env.CONFIG_D, 'pylintrc')
-    config_argument = f"--rcfile={config}" if config.exists() else ""
-    command = " ".join(("pylint", config_argument, "{lint_file}"))
+    return generics.lint_compare_with_main_branch(**_lint_arguments(filters))
+
 
-    return generics.lint_compare_with_main_branch(
-        execute_command=command,
-        filters=filters
+def compare_with_main_branch_async(
+        filters: Iterable[_typing.FiltersType] = FILTERS,
+        changes: Optional[_typing.Changes] = None,
+        deadline: Optional[float] = None
+) -> AsyncIterator[_typing.LogLine]:
+    """
+    Asynchronous variant of :py:func:`compare_with_main_branch`
+    """
+    return generics.lint_compare_with_main_branch_async(
+        **_lint_arguments(filters),
+        changes=changes,
+        deadline=deadline
     )
 
 
-def cli(contributors: Contributors, halt_on_n_messages: int, halt: bool = True) -> int:
-    """Provide interface for pylint CLI"""
+async def cli_async(contributors: Contributors,
+                    halt_on_n_messages: int,
+                    halt: bool = True,
+                    changes: Optional[_typing.Changes] = None,
+                    deadline: Optional[float] = None) -> int:
+    """Asynchronous interface for pylint CLI"""
     # pylint:disable=duplicate-code
-    return generics.filer_output(
-        log=compare_with_main_branch(),
+    if changes is None:
+        # skip the files without any line of the contributors
+        changes = await git.changes_async(contributors=contributors)
+
+    return await generics.filer_output_async(
+        log=compare_with_main_branch_async(changes=changes, deadline=deadline),
         contributors=contributors,
         halt_on_n_messages=halt_on_n_messages,
         halt=halt
     )
+
+
+def cli(contributors: Contributors,
+        halt_on_n_messages: int,
+        halt: bool = True,
+        deadline: Optional[float] = None) -> int:
+    """Provide interface for pylint CLI"""
+    return jobs.run(cli_async(contributors, halt_on_n_messages, halt, deadline=deadline))
@@ -0,0 +1,64 @@
+"""
+Pylint reporter filtering the messages with custolint rules while pylint emits them.
+
+A CI already running pylint would run it a second time through ``custolint pylint``.
+Instead the pylint run reports only the messages of the changed lines,
+kept by the contributors and the :py:const:`custolint.pylint.FILTERS`,
+see :py:class:`custolint.generics.InlineFilter`.
+
+.. code-block:: bash
+
+    $ pylint --load-plugins=custolint.pylint_reporter --output-format=custolint src
+    src/custolint/git.py:42 0: C0116: Missing function or method docstring \
+        (missing-function-docstring) ## john@snow.eu:2023-06-01
+
+    # or without loading the plugin
+    $ pylint --output-format=custolint.pylint_reporter.Reporter src
+
+The contributors come from the environment variables,
+see :py:meth:`custolint.contributors.Contributors.from_env`.
+Run it from the root of the repository, as custolint.
+
+.. note:: the exit status is still pylint one, computed on all the messages
+"""
+from typing import Any, Optional, TextIO
+
+from pylint.reporters import BaseReporter
+
+from . import generics, inprocess, pylint
+
+
+class Reporter(BaseReporter):
+    """
+    Write the messages kept by custolint as soon as pylint emits them
+    """
+    name = 'custolint'
+    extension = 'txt'
+
+    def __init__(self, output: Optional[TextIO] = None) -> None:
+        super().__init__(output)
+        self.inline_filter = generics.InlineFilter(filters=pylint.FILTERS)
+
+    def handle_message(self, msg: Any) -> None:
+        line = self.inline_filter.lint(inprocess.pylint_fields(msg))
+        if line:
+            self.writeln(self.inline_filter.format(line))
+
+    def _display(self, layout: Any) -> None:
+        """No report, the messages only"""
+
+    def on_close(self, stats: Any, previous_stats: Any) -> None:
+        self.inline_filter.close()
+
+
+def register(linter: Any) -> None:
+    """
+    Register the reporter with ``--load-plugins=custolint.pylint_reporter``
+    """
+    linter.register_reporter(Reporter)
+
+
+__all__ = [
+    'Reporter',
+    'register',
+]
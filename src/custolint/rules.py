@@ -0,0 +1,371 @@
+"""
+Declarative filter rules, the messages skipped by custolint.
+
+A rule is a section ``[<tool>:<name>]`` skipping the messages of the tool matching
+all its conditions:
+
+- ``codes``: the message codes, pylint symbols, mypy error codes or flake8 codes
+- ``message``: regular expression searched in the message
+- ``line``: regular expression searched in the line of the message
+- ``previous_line``: regular expression searched in the line before
+- ``scope``: regular expression matching the whole name of the innermost function or class
+  of the line
+- ``decorator``: regular expression matching the whole name of one of its decorators,
+  without the ``@`` nor the arguments, e.g. ``pytest.fixture``
+- ``signature``: ``yes`` to apply the rule only to the decorators and the ``def``
+  or ``class`` statement, which may span several lines
+- ``test_files``: ``yes`` to apply the rule only to the test files,
+  see :py:const:`custolint.generics.TEST_FILES_REGEX`
+
+.. literalinclude:: ../src/custolint/rules.ini
+    :caption: src/custolint/rules.ini
+    :language: ini
+    :start-at: [pylint:property-docstring]
+    :end-before: [pylint:logging-fstring-interpolation]
+
+The default rules, ``src/custolint/rules.ini``, are extended with ``rules.ini`` of the config.d
+directory, see :py:const:`custolint.env.CONFIG_D`. A section of the same name replaces
+the default rule, ``enabled = no`` drops it.
+
+The rules are loaded once and compiled per message code and kind of file, see :py:class:`Matcher`,
+a message is evaluated with a dict lookup and at most one regular expression
+per text, the message, the lines and the names of the scope. The scope of a line
+is looked up in the context of the file, parsed once, see :py:mod:`custolint.context`.
+
+The rules matched by a text are memoized, up to ``MEMO_SIZE`` texts per step,
+the messages and the lines repeated across the files, e.g. ``def test_`` or
+``Missing function or method docstring``, are evaluated once per run.
+Compiled again, e.g. with another config.d directory, the rules start with an empty memo.
+"""
+from typing import (Dict, FrozenSet, List, MutableMapping, NamedTuple,
+                    Optional, Pattern, Sequence, Tuple)
+
+import configparser
+import functools
+import logging
+import re
+import sys
+from pathlib import Path
+
+from . import context, env, generics, sources, stats
+
+LOG = logging.getLogger(__name__)
+DEFAULT_RULES = Path(__file__).with_name('rules.ini')
+# the code of the message, e.g. ``0: C0116: Missing docstring (missing-docstring)``,
+# matched from the start, the greedy ``.*`` finds the code at the end without scanning
+CODES = {
+    'flake8': re.compile(r"\d+: ([A-Z]+\d+) "),
+    'mypy': re.compile(r".* \[([\w-]+)\]$", re.DOTALL),
+    'pylint': re.compile(r".* \(([\w-]+)\)$", re.DOTALL),
+}
+TEXTS = ('message', 'line', 'previous_line', 'scope', 'decorator')
+MEMO_SIZE = 4096
+# the names are matched whole, the decorators being one per line
+_WHOLE = {
+    'scope': r'^(?:{})\Z',
+    'decorator': r'(?m-s:^(?:{})$)',
+}
+
+
+class Rule(NamedTuple):
+    """
+    Skip the messages matching all the conditions
+    """
+    name: str
+    codes: FrozenSet[str]
+    message: Optional[str] = None
+    line: Optional[str] = None
+    previous_line: Optional[str] = None
+    scope: Optional[str] = None
+    decorator: Optional[str] = None
+    signature: bool = False
+    test_files: bool = False
+
+    def conditions(self) -> Tuple[str, ...]:
+        """
+        The conditions on the message and the file content
+        """
+        texts = tuple(text for text in TEXTS if getattr(self, text) is not None)
+        return (*texts, 'signature') if self.signature else texts
+
+
+class _Step(NamedTuple):
+    """
+    A text to match, the rules being bits of an integer
+    """
+    text: str
+    # one group per rule with a condition on the text, its position and the rule bit,
+    # no regular expression for the ``signature`` condition
+    regex: Optional[Pattern[str]]
+    bits: Tuple[Tuple[int, int], ...]
+    # the rules with a condition on the text, and the ones with all their conditions matched
+    # once the text is matched
+    conditioned: int
+    complete: int
+    # the rules matched by the texts already evaluated
+    memo: Dict[str, int]
+
+
+class _Bucket(NamedTuple):
+    """
+    The rules of a message code and kind of file, with a combined regular expression per text
+    """
+    rules: int
+    # the rules without condition
+    unconditional: int
+    steps: Tuple[_Step, ...]
+    # the section names of the rules, by bit position, see :py:mod:`custolint.stats`
+    names: Tuple[str, ...]
+
+
+def _combine(patterns: Sequence[str]) -> Tuple[Pattern[str], Tuple[int, ...]]:
+    """
+    One regular expression searching all the patterns, matched at the start of the text,
+    and the positions of the groups, set when the pattern is found, in its ``groups()``
+
+    >>> regex, positions = _combine(['(a|c)', '^b'])
+    >>> [regex.match(text).groups()[position] for position in positions for text in ('ba', 'ab')]
+    ['ba', 'a', 'b', None]
+    """
+    regex = re.compile("".join(
+        f"(?:(?=(?P<r{index}>.*?(?:{pattern}))))?" for index, pattern in enumerate(patterns)
+    ), re.DOTALL)
+    # the patterns may have groups of their own
+    return regex, tuple(regex.groupindex[f"r{index}"] - 1 for index in range(len(patterns)))
+
+
+def _applies(rule: Rule, code: Optional[str], test_file: bool) -> bool:
+    """
+    The rule is evaluated for the messages of the code in the kind of file
+    """
+    if rule.test_files and not test_file:
+        return False
+
+    return not rule.codes or code in rule.codes
+
+
+def _bucket(rules: Sequence[Rule], tool: str) -> _Bucket:
+    bits = [1 << index for index in range(len(rules))]
+    conditions = [rule.conditions() for rule in rules]
+    texts = [text for text in (*TEXTS, 'signature')
+             if any(text in rule_conditions for rule_conditions in conditions)]
+
+    steps = []
+    for index, text in enumerate(texts):
+        conditioned = [(bit, getattr(rule, text)) for bit, rule, rule_conditions
+                       in zip(bits, rules, conditions) if text in rule_conditions]
+        regex, positions = _combine([
+            _WHOLE.get(text, '{}').format(pattern) for _, pattern in conditioned
+        ]) if text != 'signature' else (None, ())
+        steps.append(_Step(
+            text=text,
+            regex=regex,
+            bits=tuple(zip(positions, (bit for bit, _ in conditioned))),
+            conditioned=sum(bit for bit, _ in conditioned),
+            complete=sum(bit for bit, rule_conditions in zip(bits, conditions)
+                         if not set(rule_conditions) & set(texts[index + 1:])),
+            memo={}
+        ))
+
+    return _Bucket(
+        rules=sum(bits),
+        unconditional=sum(bit for bit, rule_conditions in zip(bits, conditions)
+                          if not rule_conditions),
+        steps=tuple(steps),
+        names=tuple(f"{tool}:{rule.name}" for rule in rules)
+    )
+
+
+class Matcher:  # pylint: disable=too-few-public-methods
+    """
+    The rules of a tool, compiled into a bucket per message code and kind of file
+    """
+
+    def __init__(self, rules: Sequence[Rule], tool: str) -> None:
+        self.code = CODES[tool]
+        self.buckets: Dict[Tuple[Optional[str], bool], _Bucket] = {}
+        # always skipped in the test files, the tool need not even compute them there
+        self.test_files_codes = tuple(sorted({
+            code for rule in rules if rule.test_files and not rule.conditions()
+            for code in rule.codes
+        }))
+
+        codes = {code for rule in rules for code in rule.codes}
+        for test_file in (False, True):
+            for message_code in (*sorted(codes), None):
+                self.buckets[message_code, test_file] = _bucket([
+                    rule for rule in rules if _applies(rule, message_code, test_file)
+                ], tool)
+
+    def skip(self,
+             path: Path,
+             message: str,
+             line_number: int,
+             cache: MutableMapping[Path, Sequence[str]]) -> bool:
+        """
+        True if a rule matches the message, see :py:data:`custolint._typing.FiltersType`
+
+        The file is read only if no rule matches the message without its lines,
+        and parsed only if no rule matches it without the scope of the line.
+        """
+        code = self.code.match(message)
+        test_file = bool(generics.TEST_FILES_REGEX.search(path.name))
+        bucket = self.buckets.get((code.group(1) if code else None, test_file)) \
+            or self.buckets[None, test_file]
+        fired = _fired(bucket, path, message, line_number, cache)
+        if stats.ENABLED:
+            stats.count_rules(bucket.names, (name for position, name in enumerate(bucket.names)
+                                             if fired >> position & 1))
+
+        return bool(fired)
+
+
+def _fired(bucket: _Bucket,
+           path: Path,
+           message: str,
+           line_number: int,
+           cache: MutableMapping[Path, Sequence[str]]) -> int:
+    """
+    The rules skipping the message
+    """
+    if bucket.unconditional:
+        return bucket.unconditional
+
+    alive = bucket.rules
+    for step in bucket.steps:
+        if step.regex is None:
+            scope = _scope(path, line_number, cache)
+            matched = ~step.conditioned
+            if scope is not None and scope.signature(line_number):
+                matched |= step.conditioned
+        else:
+            matched = ~step.conditioned | _matched(step, _text(step.text, path, message,
+                                                               line_number, cache))
+
+        alive &= matched
+        if not alive:
+            return 0
+
+        if alive & step.complete:
+            return alive & step.complete
+
+    return 0
+
+
+def _matched(step: _Step, text: str) -> int:
+    matched = step.memo.get(text)
+    if matched is not None:
+        return matched
+
+    # all the groups are optional, it always matches
+    groups = step.regex.match(text).groups()  # type: ignore[union-attr]
+    matched = 0
+    for position, bit in step.bits:
+        if groups[position] is not None:
+            matched |= bit
+
+    if len(step.memo) >= MEMO_SIZE:
+        step.memo.clear()
+    step.memo[text] = matched
+    return matched
+
+
+def _text(text: str,
+          path: Path,
+          message: str,
+          line_number: int,
+          cache: MutableMapping[Path, Sequence[str]]) -> str:
+    if text == 'message':
+        return message
+
+    if text in ('line', 'previous_line'):
+        return _line(path, line_number - (text == 'previous_line'), cache)
+
+    scope = _scope(path, line_number, cache)
+    if scope is None:
+        return ''
+
+    return scope.name if text == 'scope' else "\n".join(scope.decorators)
+
+
+def _line(path: Path, line_number: int, cache: MutableMapping[Path, Sequence[str]]) -> str:
+    content = sources.lines(path, cache)
+    return content[line_number - 1] if 0 < line_number <= len(content) else ''
+
+
+def _scope(path: Path,
+           line_number: int,
+           cache: MutableMapping[Path, Sequence[str]]) -> Optional[context.Scope]:
+    return context.index(path, sources.lines(path, cache)).scope(line_number)
+
+
+def _rule(parser: configparser.ConfigParser, section: str) -> Rule:
+    _, name = section.split(':', maxsplit=1)
+    options = dict(parser[section])
+    unknown = set(options) - {'codes', 'enabled', *TEXTS, 'signature', 'test_files'}
+    if unknown:
+        raise ValueError(f"unknown options {', '.join(sorted(unknown))}")
+
+    rule = Rule(
+        name=name,
+        codes=frozenset(options.get('codes', '').replace(',', ' ').split()),
+        message=options.get('message'),
+        line=options.get('line'),
+        previous_line=options.get('previous_line'),
+        scope=options.get('scope'),
+        decorator=options.get('decorator'),
+        signature=parser.getboolean(section, 'signature', fallback=False),
+        test_files=parser.getboolean(section, 'test_files', fallback=False)
+    )
+    for text in TEXTS:
+        if getattr(rule, text) is not None:
+            re.compile(getattr(rule, text))
+
+    return rule
+
+
+def load(tool: str, paths: Sequence[Path]) -> List[Rule]:
+    """
+    The enabled rules of the tool, the sections of the later files replace the earlier ones
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(paths)
+
+    rules = []
+    for section in parser.sections():
+        if section.split(':', maxsplit=1)[0] != tool:
+            continue
+
+        try:
+            if parser.getboolean(section, 'enabled', fallback=True):
+                rules.append(_rule(parser, section))
+        except (ValueError, re.error) as error:
+            logging.error('Invalid filter rule %r: %s', section, error)
+            sys.exit(1)
+
+    LOG.debug('Loaded %r %s filter rules from %s', len(rules), tool, ', '.join(map(str, paths)))
+    return rules
+
+
+@functools.lru_cache(maxsize=None)
+def _matcher(tool: str, config_d: str) -> Matcher:
+    config = Path(config_d, 'rules.ini')
+    return Matcher(load(tool, [DEFAULT_RULES, *([config] if config.exists() else [])]), tool)
+
+
+def matcher(tool: str) -> Matcher:
+    """
+    The compiled rules of the tool, loaded once per configuration
+    """
+    return _matcher(tool, env.CONFIG_D)
+
+
+__all__ = [
+    'CODES',
+    'DEFAULT_RULES',
+    'MEMO_SIZE',
+    'Matcher',
+    'Rule',
+    'load',
+    'matcher',
+]
@@ -0,0 +1,151 @@
+"""
+Contents of the files read by the filters, shared by the tools of a run.
+
+The filters read the lines of the messages and the one before, see :py:mod:`custolint.rules`.
+A file is read once into a :py:class:`Source`, its lines are decoded on demand with
+an index of the line offsets, built at the first line read.
+
+The contents are kept in :py:data:`SOURCES` for the pylint, flake8 and mypy stages of a run,
+the least recently used are evicted beyond ``CUSTOLINT_SOURCES_SIZE`` bytes.
+"""
+from typing import (TYPE_CHECKING, Iterator, List, MutableMapping, Optional,
+                    Sequence, Union, overload)
+
+import itertools
+import logging
+from collections import OrderedDict
+from pathlib import Path
+
+from . import env
+
+if TYPE_CHECKING:
+    from .context import Context
+
+LOG = logging.getLogger(__name__)
+
+
+class Source(Sequence[str]):
+    """
+    Lines of a file content, split as :py:meth:`str.splitlines` does on the line boundaries
+
+    >>> source = Source(b'a\\r\\nb\\n\\nc')
+    >>> len(source), source[1], source[-1], list(source)
+    (4, 'b', 'c', ['a', 'b', '', 'c'])
+    """
+    __slots__ = ('data', 'context', '_offsets', '__weakref__')
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        # the context of the lines, see :py:func:`custolint.context.index`
+        self.context: Optional['Context'] = None
+        self._offsets: Optional[List[int]] = None
+
+    @classmethod
+    def read(cls, path: Path) -> 'Source':
+        """
+        Content of a file
+        """
+        return cls(path.read_bytes())
+
+    @property
+    def offsets(self) -> List[int]:
+        """
+        Offset of the start of each line, and of the end of the content
+        """
+        if self._offsets is None:
+            self._offsets = [0, *itertools.accumulate(map(len, self.data.splitlines(True)))]
+
+        return self._offsets
+
+    @overload
+    def __getitem__(self, index: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(len(self))[index]]
+
+        offsets = self.offsets
+        position = index + len(self) if index < 0 else index
+        if not 0 <= position < len(self):
+            raise IndexError(index)
+
+        return self.data[offsets[position]:offsets[position + 1]].decode().rstrip('\r\n')
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[position] for position in range(len(self)))
+
+
+def _size(content: Sequence[str]) -> int:
+    if isinstance(content, Source):
+        return len(content.data)
+
+    return sum(map(len, content))
+
+
+class Sources(MutableMapping[Path, Sequence[str]]):
+    """
+    Contents of the files, the least recently used evicted beyond ``max_size`` bytes,
+    the last one is always kept
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self._contents: 'OrderedDict[Path, Sequence[str]]' = OrderedDict()
+
+    def __getitem__(self, path: Path) -> Sequence[str]:
+        content = self._contents[path]
+        self._contents.move_to_end(path)
+        return content
+
+    def __setitem__(self, path: Path, content: Sequence[str]) -> None:
+        if path in self._contents:
+            del self[path]
+
+        self._contents[path] = content
+        self.size += _size(content)
+        while self.size > self.max_size and len(self._contents) > 1:
+            evicted = next(iter(self._contents))
+            LOG.debug('Evict the content of %s', evicted)
+            del self[evicted]
+
+    def __delitem__(self, path: Path) -> None:
+        self.size -= _size(self._contents.pop(path))
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._contents
+
+    def __iter__(self) -> Iterator[Path]:
+        return iter(self._contents)
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+
+SOURCES = Sources(env.SOURCES_SIZE)
+
+
+def lines(path: Path, cache: MutableMapping[Path, Sequence[str]]) -> Sequence[str]:
+    """
+    Lines of a file, read once into the cache, e.g. :py:data:`SOURCES`
+    """
+    if path not in cache:
+        cache[path] = Source.read(path)
+
+    return cache[path]
+
+
+__all__ = [
+    'SOURCES',
+    'Source',
+    'Sources',
+    'lines',
+]
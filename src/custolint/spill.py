@@ -0,0 +1,133 @@
+"""
+The tools output spilled to disk.
+
+A pylint report of a large code base is hundreds of MB, kept in memory it would be
+copied by the decoding and the splitting into lines. Instead the stdout of the tool is
+redirected to a temporary file, see :py:class:`Output`, then read line by line through
+:py:mod:`mmap`, so the memory stays flat whatever the output size.
+
+The parsers accept the output as a :py:class:`Output`, a string or lines,
+see :py:func:`text_lines`, e.g. the in-process execution returns a string.
+"""
+from typing import IO, Iterable, Iterator, Optional, Tuple, Union
+
+import asyncio
+import contextlib
+import mmap
+import os
+import tempfile
+
+from . import jobs
+
+
+class Output:
+    """
+    The stdout of a tool, spilled to an anonymous temporary file
+    """
+
+    def __init__(self) -> None:
+        self.file: IO[bytes] = tempfile.TemporaryFile()
+
+    def size(self) -> int:
+        """
+        Number of bytes written by the tool
+        """
+        return os.fstat(self.file.fileno()).st_size
+
+    @contextlib.contextmanager
+    def mapped(self) -> Iterator[Union[bytes, mmap.mmap]]:
+        """
+        The whole output as a read-only memory map, removed on exit
+        """
+        try:
+            if not self.size():  # an empty file can not be mapped
+                yield b''
+                return
+
+            with mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield buffer
+        finally:
+            self.close()
+
+    def lines(self) -> Iterator[memoryview]:
+        """
+        Lines of the output without the line ending, through a read-only memory map,
+        same lines as ``str.split("\\n")``.
+
+        .. important:: a line is valid until the next one is read,
+            decode or copy it before, e.g. ``str(line, 'utf-8')``
+        """
+        size = self.size()
+        if not size:  # an empty file can not be mapped
+            yield memoryview(b'')
+            return
+
+        with mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            view = memoryview(buffer)
+            line: Optional[memoryview] = None
+            try:
+                start = 0
+                while start <= size:
+                    end = buffer.find(b"\n", start)
+                    if end < 0:
+                        end = size
+
+                    line = view[start:end]
+                    yield line
+                    # the memory map can not be closed while a line refers to it
+                    line.release()
+                    start = end + 1
+            finally:
+                if line is not None:
+                    line.release()
+                view.release()
+
+    def close(self) -> None:
+        """
+        Remove the temporary file
+        """
+        self.file.close()
+
+
+Stdout = Union[str, Output, Iterable[str]]
+
+
+async def execute(command: str) -> Tuple[Output, jobs.Result]:
+    """
+    Execute a command with its output spilled to disk, see :py:func:`custolint.jobs.execute`
+    """
+    stdout = Output()
+    try:
+        result = await jobs.execute(command, stdout=stdout.file)
+    except asyncio.CancelledError:
+        stdout.close()
+        raise
+
+    return stdout, result
+
+
+def text_lines(stdout: Stdout) -> Iterator[str]:
+    """
+    Decoded lines of a tool output, the spilled output is removed once read
+
+    >>> list(text_lines("a.py:1: message\\nb.py:2: message"))
+    ['a.py:1: message', 'b.py:2: message']
+    """
+    if isinstance(stdout, str):
+        yield from stdout.split("\n")
+    elif isinstance(stdout, Output):
+        try:
+            for line in stdout.lines():
+                yield str(line, 'utf-8')
+        finally:
+            stdout.close()
+    else:
+        yield from stdout
+
+
+__all__ = [
+    'Output',
+    'Stdout',
+    'execute',
+    'text_lines',
+]
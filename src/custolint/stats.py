@@ -0,0 +1,132 @@
+"""
+Statistics of the filters, to find the slow or the dead ones.
+
+With ``--filter-stats`` (or ``CUSTOLINT_FILTER_STATS`` environment variable) every filter
+of the chain, see :py:data:`custolint._typing.FiltersType`, counts its evaluations,
+its hits, the messages it skips, and its cumulative time. The rules of
+:py:mod:`custolint.rules` count their evaluations and hits as well, under their section name,
+e.g. ``pylint:test-fixture``. They are evaluated together, their time is the one of the filter.
+
+At the end of the run, a number ``N`` logs the ``N`` most expensive counters,
+a ``.json`` file name writes all of them.
+
+.. code-block:: bash
+
+    $ CUSTOLINT_FILTER_STATS=10 custolint pylint
+    $ custolint mypy --filter-stats=filter-stats.json
+"""
+from typing import Any, Dict, Iterable
+
+import functools
+import json
+import logging
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from . import _typing
+
+LOG = logging.getLogger(__name__)
+ENABLED = False
+
+
+class Counter:  # pylint: disable=too-few-public-methods
+    """
+    Evaluations, hits and cumulative time in seconds
+    """
+    __slots__ = ('evaluations', 'hits', 'seconds')
+
+    def __init__(self) -> None:
+        self.evaluations = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+
+COUNTERS: Dict[str, Counter] = defaultdict(Counter)
+
+
+def _target(target: str) -> str:
+    if not target.endswith('.json') and not target.isdigit():
+        raise ValueError(f"expect a number or a .json file name, got {target!r}")
+
+    return target
+
+
+def enable(target: str) -> None:
+    """
+    Count the evaluations of the filters, e.g. ``--filter-stats``,
+    reported to the target, a number of counters to log or a ``.json`` file name
+    """
+    global ENABLED  # pylint: disable=global-statement
+    _target(target)
+    ENABLED = True
+
+
+def count(name: str, hit: bool, seconds: float = 0.0) -> None:
+    """
+    Count an evaluation
+    """
+    counter = COUNTERS[name]
+    counter.evaluations += 1
+    counter.hits += hit
+    counter.seconds += seconds
+
+
+def count_rules(names: Iterable[str], hits: Iterable[str]) -> None:
+    """
+    Count an evaluation of the rules, and the hits of the ones skipping the message
+    """
+    for name in names:
+        COUNTERS[name].evaluations += 1
+    for name in hits:
+        COUNTERS[name].hits += 1
+
+
+def instrument(filter_item: _typing.FiltersType) -> _typing.FiltersType:
+    """
+    The filter counting its evaluations, the filter itself unless enabled
+    """
+    if not ENABLED:
+        return filter_item
+
+    name = f"{filter_item.__module__}.{filter_item.__qualname__}"
+
+    @functools.wraps(filter_item)
+    def timed(*args: Any) -> bool:
+        start = time.perf_counter()
+        hit = filter_item(*args)
+        count(name, hit, time.perf_counter() - start)
+        return hit
+
+    return timed
+
+
+def report(target: str) -> None:
+    """
+    Log the most expensive counters, or write all of them to a ``.json`` file
+    """
+    if _target(target).endswith('.json'):
+        Path(target).write_text(json.dumps({
+            name: {'evaluations': counter.evaluations, 'hits': counter.hits,
+                   'seconds': counter.seconds}
+            for name, counter in sorted(COUNTERS.items())
+        }, indent=2), encoding='utf-8')
+        LOG.info('Filter statistics written to %s', target)
+        return
+
+    ranked = sorted(COUNTERS.items(),
+                    key=lambda item: (item[1].seconds, item[1].evaluations), reverse=True)
+    LOG.info('%-48s %12s %12s %10s', 'filter', 'evaluations', 'hits', 'seconds')
+    for name, counter in ranked[:int(target)]:
+        LOG.info('%-48s %12d %12d %10.4f', name, counter.evaluations, counter.hits, counter.seconds)
+
+
+__all__ = [
+    'COUNTERS',
+    'Counter',
+    'count',
+    'count_rules',
+    'enable',
+    'instrument',
+    'report',
+]
@@ -0,0 +1,61 @@
+"""
+Throughput of the text output parsers on a generated pylint log
+
+.. code-block:: bash
+
+    $ python tests/benchmark_parser.py 1000000
+"""
+from typing import Callable, Iterable
+
+import sys
+import time
+
+from custolint import generics, spill
+
+MODULE_MESSAGES = 20
+
+
+def _pylint_log(lines: int) -> bytes:
+    log = []
+    for module in range(lines // (MODULE_MESSAGES + 1)):
+        log.append(f'************* Module custolint.module_{module}')
+        log.extend(
+            f'src/custolint/module_{module}.py:{line}:4: '
+            f'W0511: TODO add parser for {line} (fixme)'
+            for line in range(1, MODULE_MESSAGES + 1)
+        )
+    log.extend(('', '-' * 70, 'Your code has been rated at 9.99/10', ''))
+
+    return "\n".join(log).encode()
+
+
+def _measure(name: str, lines: int, parse: Callable[[], Iterable[object]]) -> float:
+    start = time.perf_counter()
+    messages = sum(1 for _ in parse())
+    elapsed = time.perf_counter() - start
+
+    print(f'{name:<10} {messages:>9} messages {elapsed:6.2f}s {lines / elapsed:>12,.0f} lines/s')
+    return elapsed
+
+
+def main(lines: int) -> None:
+    log = _pylint_log(lines)
+    lines = log.count(b'\n') + 1
+
+    def _per_line() -> Iterable[object]:
+        # the tool output decoded then split, each line parsed on its own
+        return generics._parse_text_output(log.decode().split("\n"))
+
+    def _bulk() -> Iterable[object]:
+        stdout = spill.Output()
+        stdout.file.write(log)
+        stdout.file.flush()
+        return generics._parse_text_output(stdout)
+
+    per_line = _measure('per-line', lines, _per_line)
+    bulk = _measure('bulk', lines, _bulk)
+    print(f'speed-up   {per_line / bulk:.1f}x')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -1,5 +1,6 @@
-from typing import Any, Callable, Iterator, Optional
+from typing import IO, Any, Callable, Iterator, Optional
 
+import concurrent.futures
 import os
 import textwrap
 from pathlib import Path
@@ -9,7 +10,7 @@ import bash
 import pytest
 
 from custolint.contributors import Contributors
-from custolint import git
+from custolint import cache, env, git, jobs, sources
 
 
 @pytest.fixture(autouse=True, scope='session')
@@ -25,6 +26,38 @@ def cd_into_root() -> Iterator[None]:
     os.chdir(previous_cwd)
 
 
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: Path) -> Iterator[Path]:
+    """
+    Do not share the cache across the tests nor with the developer one,
+    disabled unless a test enables it with :py:func:`.fixture_cache_enabled`
+    """
+    with \
+            mock.patch.object(env, 'CACHE_DIR', str(tmp_path / 'cache')), \
+            mock.patch.object(env, 'CACHE_URL', ''), \
+            mock.patch.object(cache, '_STORAGE', None), \
+            mock.patch.object(cache, 'ENABLED', False):
+        yield tmp_path / 'cache'
+
+
+@pytest.fixture(autouse=True)
+def sources_cache() -> Iterator[None]:
+    """
+    Do not share the contents read by the filters across the tests
+    """
+    with mock.patch.object(sources, 'SOURCES', sources.Sources(env.SOURCES_SIZE)):
+        yield
+
+
+@pytest.fixture(name='cache_enabled')
+def fixture_cache_enabled() -> Iterator[None]:
+    """
+    Read and write the cache of the test
+    """
+    with mock.patch.object(cache, 'ENABLED', True):
+        yield
+
+
 def patch_bash(stdout: Optional[str] = '',
                stderr: Optional[str] = '',
                code: Optional[int] = 0) -> mock.MagicMock:
@@ -52,6 +85,57 @@ def fixture_path_bash() -> Iterator[Callable[..., mock.Mock]]:
     yield patch_bash
 
 
+def patch_execute(stdout: Optional[str] = '',
+                  stderr: Optional[str] = '',
+                  code: Optional[int] = 0) -> mock.AsyncMock:
+    """
+    Wrapper for patching :py:func:`custolint.jobs.execute`, to be used by py:func:`.fixture_patch_execute`
+
+    The stdout is written into the ``stdout`` file when the command spills its output.
+    """
+    results = [
+        jobs.Result(
+            stdout=textwrap.dedent(stdout).encode(),
+            stderr=textwrap.dedent(stderr).encode(),
+            code=code
+        )
+    ]
+
+    def _execute(_: str, stdout: Optional[IO[bytes]] = None) -> jobs.Result:
+        result = results.pop(0)
+        if stdout is None:
+            return result
+
+        stdout.write(result.stdout)
+        stdout.flush()
+        return result._replace(stdout=b'')
+
+    return mock.patch.object(
+        target=jobs,
+        attribute="execute",
+        side_effect=_execute
+    )
+
+
+@pytest.fixture(name='worker_threads')
+def fixture_worker_threads() -> Iterator[None]:
+    """
+    Call the in-process linters of ``jobs.call`` in a thread, the mocks can not be pickled
+    """
+    with \
+            concurrent.futures.ThreadPoolExecutor(1) as executor, \
+            mock.patch.object(jobs, '_executor', return_value=executor):
+        yield
+
+
+@pytest.fixture(name='patch_execute')
+def fixture_patch_execute() -> Iterator[Callable[..., mock.AsyncMock]]:
+    """
+    fixture to patch ``jobs.execute`` call
+    """
+    yield patch_execute
+
+
 @pytest.fixture(name='path_mock')
 def _path_mock() -> Callable[..., mock.Mock]:
     def _(name: str, **kwargs: Any) -> mock.Mock:
@@ -0,0 +1,239 @@
+from typing import Dict, Iterator
+
+import http.server
+import os
+import socket
+import threading
+from pathlib import Path
+from unittest import mock
+
+import bash
+import pytest
+
+from custolint import cache, env, mypycache
+
+pytestmark = pytest.mark.usefixtures('cache_enabled')
+
+
+class _StandInStore(http.server.BaseHTTPRequestHandler):
+    """
+    In-memory HTTP ``GET``/``PUT`` store
+    """
+    entries: Dict[str, bytes] = {}
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        if self.path not in self.entries:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(self.entries[self.path])))
+        self.end_headers()
+        self.wfile.write(self.entries[self.path])
+
+    def do_PUT(self) -> None:  # pylint: disable=invalid-name
+        self.entries[self.path] = self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *_) -> None:  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture(name='store_url')
+def fixture_store_url() -> Iterator[str]:
+    _StandInStore.entries = {}
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _StandInStore)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f'http://127.0.0.1:{server.server_address[1]}/custolint'
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_blob_id(tmp_path: Path):
+    path = tmp_path / 'a.py'
+    path.write_text('import os\n')
+
+    assert cache.blob_id(path) == bash.bash(f'git hash-object {path}').stdout.decode().strip()
+
+
+def test_namespace(tmp_path: Path):
+    config = tmp_path / 'pylintrc'
+    config.write_text('[MAIN]\n')
+    namespace = cache.namespace('pylint', config, 'pylint {lint_file}')
+
+    assert namespace == cache.namespace('pylint', config, 'pylint {lint_file}')
+    assert namespace != cache.namespace('flake8', config, 'pylint {lint_file}')
+    assert namespace != cache.namespace('pylint', None, 'pylint {lint_file}')
+    assert namespace != cache.namespace('pylint', config, 'pylint --jobs=2 {lint_file}')
+
+    config.write_text('[MAIN]\njobs=2\n')
+    assert namespace != cache.namespace('pylint', config, 'pylint {lint_file}')
+
+    with mock.patch.object(cache, 'ENABLED', False):
+        assert cache.namespace('pylint', config, 'pylint {lint_file}') is None
+
+
+def test_lookup_and_store(tmp_path: Path):
+    clean, dirty = tmp_path / 'clean.py', tmp_path / 'dirty.py'
+    clean.write_text('import os\n')
+    dirty.write_text('import sys\n')
+    paths = [str(clean), str(dirty)]
+
+    assert cache.lookup('namespace', paths) == ([], paths)
+
+    cache.store('namespace', paths, [(str(dirty), 1, 'W0611: Unused import sys'),
+                                     ('other.py', 1, 'not linted here')])
+
+    assert cache.lookup('namespace', paths) == ([(str(dirty), 1, 'W0611: Unused import sys')], [])
+    assert cache.lookup('other-namespace', paths) == ([], paths)
+
+    dirty.write_text('import sys  # changed\n')
+    assert cache.lookup('namespace', paths) == ([], [str(dirty)])
+
+
+def test_lookup_same_content(tmp_path: Path):
+    paths = []
+    for directory in ('a', 'b'):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / 'm.py').write_text('import sys\n')
+        paths.append(str(tmp_path / directory / 'm.py'))
+
+    cache.store('namespace', paths[:1], [(paths[0], 1, 'W0611: Unused import sys')])
+
+    # the messages of a file are not reported for another file of the same content
+    assert cache.lookup('namespace', paths[1:]) == ([], paths[1:])
+    assert cache.lookup('namespace', paths) == ([(paths[0], 1, 'W0611: Unused import sys')],
+                                                paths[1:])
+
+
+def test_evict(tmp_path: Path, cache_dir: Path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f'{i}.py'
+        path.write_text(f'VALUE = {i}\n')
+        paths.append(str(path))
+        cache.store('namespace', [str(path)], [])
+
+    entries = sorted(cache_dir.glob('entries/lint/*/*.json'))
+    for age, entry in enumerate(entries):
+        os.utime(entry, (age, age))
+
+    cache.evict(max_size=2 * entries[0].stat().st_size)
+
+    assert sorted(cache_dir.glob('entries/lint/*/*.json')) == entries[1:]
+
+
+def test_evict_entries_only(tmp_path: Path, cache_dir: Path):
+    path = tmp_path / 'a.py'
+    path.write_text('VALUE = 1\n')
+    cache.store('namespace', [str(path)], [])
+    # e.g. the mypy cache, next to the entries
+    mypy_cache = Path(mypycache.cache_dir(None), '3.11')
+    mypy_cache.mkdir(parents=True)
+    (mypy_cache / 'a.data.json').write_text('{}')
+    unknown = cache_dir / 'entries' / 'other' / 'ab' / 'entry.json'
+    unknown.parent.mkdir(parents=True)
+    unknown.write_text('{}')
+    directory = cache_dir / 'entries' / 'lint' / 'ab' / 'directory'
+    directory.mkdir(parents=True)
+
+    cache.evict(max_size=0)
+
+    assert not list(cache_dir.glob('entries/lint/*/*.json'))
+    assert (mypy_cache / 'a.data.json').exists() and unknown.exists() and directory.is_dir()
+
+
+def test_storage_selection(store_url: str):
+    assert isinstance(cache.storage(), cache.DirectoryStorage)
+
+    with \
+            mock.patch.object(env, 'CACHE_URL', store_url), \
+            mock.patch.object(cache, '_STORAGE', None):
+        assert isinstance(cache.storage(), cache.HttpStorage)
+
+
+def test_directory_storage_atomic_put(tmp_path: Path):
+    storage = cache.DirectoryStorage(tmp_path, max_size=1024)
+    storage.put('lint/ab/abc.json', b'[]')
+
+    assert storage.get('lint/ab/abc.json') == b'[]'
+    assert storage.get('lint/ab/missing.json') is None
+    # no temporary file left behind
+    assert [path.name for path in (tmp_path / 'lint' / 'ab').iterdir()] == ['abc.json']
+
+
+def test_http_storage(store_url: str, tmp_path: Path):
+    path = tmp_path / 'a.py'
+    path.write_text('import sys\n')
+
+    with \
+            mock.patch.object(env, 'CACHE_URL', store_url), \
+            mock.patch.object(cache, '_STORAGE', None):
+        assert cache.lookup('namespace', [str(path)]) == ([], [str(path)])
+
+        cache.store('namespace', [str(path)], [(str(path), 1, 'W0611: Unused import sys')])
+
+        assert cache.lookup('namespace', [str(path)]) == (
+            [(str(path), 1, 'W0611: Unused import sys')], []
+        )
+
+    assert list(_StandInStore.entries) == [
+        f"/custolint/{cache.key('lint', 'namespace', str(path), cache.blob_id(path))}"
+    ]
+
+
+def test_http_storage_not_available(caplog: pytest.LogCaptureFixture):
+    storage = cache.HttpStorage('http://127.0.0.1:1/custolint', timeout=0.5)
+
+    assert storage.get('lint/ab/abc.json') is None
+    storage.put('lint/ab/abc.json', b'[]')
+
+    assert not storage.available
+    # reported once, the store is not requested anymore
+    assert len(caplog.messages) == 1
+    assert caplog.messages[0].startswith(
+        "Cache store 'http://127.0.0.1:1/custolint' is not available, continue without it"
+    )
+
+
+def test_corrupted_entry(cache_dir: Path):
+    entry_key = cache.key('lint', 'namespace', 'blob')
+    (cache_dir / 'entries' / entry_key).parent.mkdir(parents=True)
+    (cache_dir / 'entries' / entry_key).write_text('[')
+
+    assert cache.get(entry_key) is None
+
+
+def test_http_storage_read_timeout():
+    # accepts the connections in the backlog but never replies
+    with socket.socket() as silent_server:
+        silent_server.bind(('127.0.0.1', 0))
+        silent_server.listen()
+        storage = cache.HttpStorage(f'http://127.0.0.1:{silent_server.getsockname()[1]}',
+                                    timeout=0.2)
+
+        assert storage.get('lint/ab/abc.json') is None
+        assert not storage.available
+
+
+def test_lookup_and_store_combined(tmp_path: Path):
+    paths = []
+    for name in ('a.py', 'b.py'):
+        (tmp_path / name).write_text('VALUE = 1\n')
+        paths.append(str(tmp_path / name))
+    message = (paths[1], 1, 'R0801: Similar lines in 2 files')
+
+    assert cache.lookup_combined('namespace', paths) is None
+
+    cache.store_combined('namespace', paths, [message])
+
+    assert cache.lookup_combined('namespace', paths[::-1]) == [message]
+    assert cache.lookup_combined('namespace', paths[:1]) is None
+
+    (tmp_path / 'a.py').write_text('VALUE = 2\n')
+    assert cache.lookup_combined('namespace', paths) is None
@@ -0,0 +1,87 @@
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from custolint import context, sources
+
+SOURCE = '''\
+import pytest
+
+
+class TestA:
+    @pytest.fixture(name='a')
+    @staticmethod
+    def fixture_a(
+        value: int,
+    ) -> int:
+        """Value of a"""
+        return value
+
+    def test_a(self, a): pass
+
+
+def test_b():
+    pass
+'''.splitlines()
+
+
+@pytest.mark.parametrize('line_number, name, signature', (
+    pytest.param(1, None, False, id='module'),
+    pytest.param(4, 'TestA', True, id='class'),
+    pytest.param(5, 'fixture_a', True, id='decorator'),
+    pytest.param(8, 'fixture_a', True, id='multi-line-signature'),
+    pytest.param(10, 'fixture_a', False, id='docstring'),
+    pytest.param(12, 'TestA', False, id='class-body'),
+    pytest.param(13, 'test_a', True, id='one-liner'),
+    pytest.param(17, 'test_b', False, id='function-body'),
+    pytest.param(100, None, False, id='out-of-file'),
+))
+def test_scope(line_number: int, name: str, signature: bool):
+    scope = context.index(Path('test_a.py'), SOURCE).scope(line_number)
+
+    assert (scope and scope.name) == name
+    assert bool(scope and scope.signature(line_number)) is signature
+
+
+def test_scope_kinds():
+    scopes = {scope.name: scope for scope in context.index(Path('test_a.py'), SOURCE).scopes}
+
+    assert scopes['fixture_a'].decorators == ('pytest.fixture', 'staticmethod')
+    assert scopes['TestA'].kind == 'class'
+    assert scopes['test_b'].kind == 'def' and not scopes['test_b'].decorators
+
+
+def test_syntax_error():
+    assert context.index(Path('a.py'), ['def a(']).scope(1) is None
+
+
+def test_cached_by_content():
+    content = sources.Source("\n".join(SOURCE).encode())
+
+    with mock.patch.dict(context._SCOPES, clear=True), \
+            mock.patch.object(context, '_parse', wraps=context._parse) as parse:
+        first = context.index(Path('a.py'), content)
+        # kept with the content, the lines are not indexed again
+        assert content.context is first
+        assert context.index(Path('a.py'), content) is first
+        # the same content read by another run
+        assert context.index(Path('b.py'), list(SOURCE)) == first
+
+    parse.assert_called_once()
+
+
+def test_cached_least_recently_used():
+    with mock.patch.dict(context._SCOPES, clear=True), \
+            mock.patch.object(context, 'SCOPES_SIZE', 2), \
+            mock.patch.object(context, '_parse', wraps=context._parse) as parse:
+        context.index(Path('a.py'), ['a = 1'])
+        context.index(Path('b.py'), ['b = 1'])
+        context.index(Path('a.py'), ['a = 1'])
+        # evicts b, the least recently used
+        context.index(Path('c.py'), ['c = 1'])
+        context.index(Path('a.py'), ['a = 1'])
+        assert len(context._SCOPES) == 2
+        context.index(Path('b.py'), ['b = 1'])
+
+    assert parse.call_count == 4
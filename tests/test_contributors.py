@@ -0,0 +1,67 @@
+from datetime import date
+from unittest import mock
+
+import pytest
+
+from custolint import _typing, env
+from custolint.contributors import Contributors
+
+CHANGES = {
+    'a.py': {
+        1: {'email': 'john.snow@some-domain.eu', 'author': 'John Snow', 'date': '2022-08-25'},
+        2: {'email': 'gus.fring@some-domain.com', 'author': 'Gus Fring', 'date': '2022-08-25'},
+    },
+    'b.py': {
+        5: {'email': 'gus.fring@some-domain.com', 'author': 'Gus Fring', 'date': '2022-08-25'},
+    },
+}
+
+
+@pytest.mark.parametrize('white, black, expected', (
+    pytest.param('', '', CHANGES, id='all'),
+    pytest.param('John Snow', '', {'a.py': {1: CHANGES['a.py'][1]}}, id='white'),
+    pytest.param('', 'john.snow@some-domain.eu', {
+        'a.py': {2: CHANGES['a.py'][2]},
+        'b.py': CHANGES['b.py']
+    }, id='black'),
+    pytest.param('non-existing-white', '', {}, id='nobody'),
+))
+def test_filter_changes(white: str, black: str, expected):
+    assert Contributors.from_cli(white, black).filter_changes(CHANGES) == expected
+
+
+@pytest.mark.parametrize('since, until, expected', (
+    pytest.param(date(2022, 8, 25), None, CHANGES, id='since-included'),
+    pytest.param(date(2022, 8, 26), None, {}, id='since'),
+    pytest.param(None, date(2022, 8, 25), CHANGES, id='until-included'),
+    pytest.param(None, date(2022, 8, 24), {}, id='until'),
+))
+def test_filter_changes_date_range(since: date, until: date, expected):
+    contributors = Contributors.from_cli('', '', since=since, until=until)
+
+    assert contributors.filter_changes(CHANGES) == expected
+
+
+def test_filter_log_line_date_range():
+    lint = _typing.Lint(
+        message='some-message',
+        author='John Snow',
+        email='john.snow@some-domain.eu',
+        date='2022-08-25',
+        file_name='a.py',
+        line_number=1
+    )
+
+    assert list(Contributors.from_cli('', '', since=date(2022, 8, 1)).filter_log_line([lint])) == [lint]
+    assert not list(Contributors.from_cli('', '', until=date(2022, 8, 1)).filter_log_line([lint]))
+
+
+def test_from_env():
+    with \
+            mock.patch.object(env, 'CONTRIBUTORS', ''), \
+            mock.patch.object(env, 'SKIP_CONTRIBUTORS', 'John Snow'), \
+            mock.patch.object(env, 'SINCE_DATE', '2022-08-01'), \
+            mock.patch.object(env, 'UNTIL_DATE', ''):
+        contributors = Contributors.from_env()
+
+    assert contributors == Contributors(white=(), black=('John Snow', ), since=date(2022, 8, 1))
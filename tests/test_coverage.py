@@ -6,6 +6,7 @@ import pytest
 
 from custolint import coverage
 from custolint.contributors import Contributors
+from custolint.generics import SYSTEM_EXIT_CODE_DRY_AND_CLEAN
 
 
 @pytest.mark.parametrize('missing, expect', (
@@ -59,15 +60,15 @@ def test_process_missing_lines(missing: str, expect: List):
     )) == expect
 
 
-def test_compare_with_main_branch_with_missing(patch_bash: Callable):
+def test_compare_with_main_branch_with_missing(patch_execute: Callable):
     with \
-            mock.patch.object(coverage.git, 'changes') as changes, \
+            mock.patch.object(coverage.git, 'changes_async') as changes, \
             mock.patch.object(
                 coverage,
                 '_process_missing_lines',
                 return_value=[1, 2, 3]
             ) as process_missing_lines,\
-            patch_bash(stdout="""
+            patch_execute(stdout="""
         Name                        Stmts   Miss Branch BrPart  Cover   Missing
         -----------------------------------------------------------------------
         src/custolint/__init__.py       5      0      0      0   100%
@@ -93,10 +94,10 @@ def test_compare_with_main_branch_with_missing(patch_bash: Callable):
         ]
 
 
-def test_compare_with_main_branch_error(patch_bash: Callable, caplog):
+def test_compare_with_main_branch_error(patch_execute: Callable, caplog):
     with \
-            mock.patch.object(coverage.git, 'changes'), \
-            patch_bash(stderr="some_error", code=1), \
+            mock.patch.object(coverage.git, 'changes_async'), \
+            patch_execute(stderr="some_error", code=1), \
             pytest.raises(SystemExit, match='1'):
 
         list(coverage.compare_with_main_branch('.coverage'))
@@ -104,6 +105,23 @@ def test_compare_with_main_branch_error(patch_bash: Callable, caplog):
     assert caplog.messages == ['Coverage command failed: some_error']
 
 
-def test_cli(non_existing_white: Contributors):
-    with pytest.raises(SystemExit, match=str(1)):
-        coverage.cli(non_existing_white, 0, '.not-a-coverage')
+def test_cli():
+    contributor = {'email': 'john@snow.eu', 'author': 'John Snow', 'date': '2023-06-01'}
+
+    with \
+            mock.patch.object(coverage.git, 'changes_async',
+                              return_value={'src/custolint/git.py': {1: contributor}}), \
+            pytest.raises(SystemExit, match='^1$'):
+        coverage.cli(Contributors.from_cli('john@snow.eu', ''), 0, '.not-a-coverage')
+
+
+def test_cli_no_change_of_the_contributors(non_existing_white: Contributors):
+    # the contributors filter emptied the changes
+    with \
+            mock.patch.object(coverage.git, 'changes_async', return_value={}) as changes_async, \
+            mock.patch.object(coverage.jobs, 'execute') as execute:
+        assert coverage.cli(non_existing_white, 0, '.not-a-coverage', halt=False) \
+            == SYSTEM_EXIT_CODE_DRY_AND_CLEAN
+
+    changes_async.assert_called_once_with(contributors=non_existing_white)
+    execute.assert_not_called()
@@ -0,0 +1,89 @@
+from typing import Iterator
+
+import json
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from custolint import dmypy, jobs, mypy, spill
+
+
+@pytest.fixture(name='project')
+def fixture_project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """
+    A project with a type error, its daemon is stopped at the end
+    """
+    project = tmp_path / 'project'
+    project.mkdir()
+    (project / 'a.py').write_text('VALUE: int = "a"\n')
+    (project / 'mypy.ini').write_text('[mypy]\nstrict = True\n')
+    monkeypatch.chdir(project)
+
+    yield project
+
+    jobs.run(dmypy.stop())
+
+
+def _pid() -> int:
+    return int(json.loads((dmypy.status_dir() / 'status.json').read_text())['pid'])
+
+
+def test_check_reuses_the_daemon(project: Path):
+    config = project / 'mypy.ini'
+
+    output = jobs.run(dmypy.check(['a.py'], f'--config-file={config}', config))
+    assert list(spill.text_lines(output)) == [
+        'a.py:1: error: Incompatible types in assignment '
+        '(expression has type "str", variable has type "int")  [assignment]',
+        'Found 1 error in 1 file (checked 1 source file)',
+        '',
+    ]
+    pid = _pid()
+
+    (project / 'a.py').write_text('VALUE: int = 1\n')
+    output = jobs.run(dmypy.check(['a.py'], f'--config-file={config}', config))
+    assert list(spill.text_lines(output)) == ['Success: no issues found in 1 source file', '']
+    assert _pid() == pid
+
+
+@pytest.mark.parametrize('change', (
+    pytest.param(lambda config: config.write_text('[mypy]\nstrict = False\n'), id='config'),
+    pytest.param(lambda _: mock.patch.object(dmypy, 'mypy_version', '0.0.0').start(), id='version'),
+))
+def test_restart_on_change(project: Path, change):
+    config = project / 'mypy.ini'
+    jobs.run(dmypy.start(f'--config-file={config}', config))
+    pid = _pid()
+
+    change(config)
+    try:
+        jobs.run(dmypy.start(f'--config-file={config}', config))
+    finally:
+        mock.patch.stopall()
+
+    assert _pid() != pid
+
+
+def test_daemon_failure(project: Path, caplog: pytest.LogCaptureFixture):
+    with pytest.raises(SystemExit):
+        jobs.run(dmypy.start('--no-such-option', None))
+
+    assert caplog.messages[-1].startswith('Mypy daemon failed to start: ')
+    assert not (dmypy.status_dir() / 'fingerprint').exists()
+
+
+def test_compare_with_main_branch_daemon(project: Path):
+    changes = {'a.py': {1: {'email': 'a@b.c', 'date': 'today', 'author': 'John Snow'}}}
+
+    with \
+            mock.patch.object(mypy.env, 'MYPY_DAEMON', True), \
+            mock.patch.object(mypy.env, 'MYPY_DEPENDENTS', 0), \
+            mock.patch.object(mypy.env, 'CONFIG_D', str(project)), \
+            mock.patch.object(mypy.git, 'changes_async', return_value=changes):
+        lints = list(mypy.compare_with_main_branch(filters=()))
+
+    assert [lint.message for lint in lints] == [
+        'Incompatible types in assignment '
+        '(expression has type "str", variable has type "int")  [assignment]'
+    ]
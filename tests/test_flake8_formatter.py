@@ -0,0 +1,33 @@
+import argparse
+from pathlib import Path
+from unittest import mock
+
+from flake8.violation import Violation
+
+from custolint import flake8_formatter, git
+
+CONTRIBUTOR = {'email': 'john@snow.eu', 'author': 'John Snow', 'date': '2023-06-01'}
+
+
+def test_formatter(tmp_path: Path):
+    output_file = tmp_path / 'flake8.txt'
+    formatter = flake8_formatter.Formatter(argparse.Namespace(
+        output_file=str(output_file), color='never', show_source=True, tee=False
+    ))
+    changes = {'src/a.py': {2: CONTRIBUTOR}}
+
+    with mock.patch.object(git, 'changes_async', return_value=changes) as changes_async:
+        formatter.start()
+        formatter.handle(Violation('F401', './src/a.py', 2, 1, "'os' imported but unused",
+                                   'import os\n'))
+        # not a changed line, neither the violation nor its source are written
+        formatter.handle(Violation('F401', './src/a.py', 3, 1, "'sys' imported but unused",
+                                   'import sys\n'))
+        formatter.stop()
+
+    changes_async.assert_called_once()
+    assert output_file.read_text().splitlines() == [
+        "src/a.py:2 1: F401 'os' imported but unused ## john@snow.eu:2023-06-01",
+        'import os',
+        '^',
+    ]
@@ -1,26 +1,28 @@
+import asyncio
 import re
+from pathlib import Path
 from typing import Any, Callable, Sequence
 from unittest import mock
 
 import pytest
 
 from custolint import _typing  # noqa: protected member
-from custolint import generics
+from custolint import generics, jobs, spill
 
 from custolint.contributors import Contributors
 
 
 def test_lint_compare_with_main_branch_no_python_files_in_changes():
-    with mock.patch.object(generics.git, "changes"):
+    with mock.patch.object(generics.git, "changes_async"):
         assert not list(generics.lint_compare_with_main_branch(
             execute_command='pylint or flake8',
             filters=tuple()
         ))
 
 
-def test_lint_compare_with_main_branch_with_python_files_in_changes(patch_bash: Callable):
+def test_lint_compare_with_main_branch_with_python_files_in_changes(patch_execute: Callable):
     with \
-            patch_bash(
+            patch_execute(
                 stdout="""
                 ************* Module custolint.pylint
                 src/custolint/pylint.py:35:0: C0301: Line too long (111/100) (line-too-long)
@@ -33,7 +35,7 @@ def test_lint_compare_with_main_branch_with_python_files_in_changes(patch_bash:
                 Your code has been rated at 9.95/10 (previous run: 9.92/10, +0.03)
                 """
             ), \
-            mock.patch.object(generics.git, "changes", return_value={
+            mock.patch.object(generics.git, "changes_async", return_value={
                 'src/custolint/pylint.py': {
                     35: {
                         'email': 'a@b.c',
@@ -78,9 +80,9 @@ def test_lint_compare_with_main_branch_with_python_files_in_changes(patch_bash:
         ]
 
 
-def test_lint_compare_with_main_branch_similarity(patch_bash: Callable):
+def test_lint_compare_with_main_branch_similarity(patch_execute: Callable):
     with \
-            patch_bash(
+            patch_execute(
                 stdout="""
                 ************* Module custolint.pylint
                 src/custolint/pylint.py:35:0: XXXX: Similar lines in
@@ -88,7 +90,7 @@ def test_lint_compare_with_main_branch_similarity(patch_bash: Callable):
                 line 2
                 """
             ), \
-            mock.patch.object(generics.git, "changes", return_value={
+            mock.patch.object(generics.git, "changes_async", return_value={
                 'src/custolint/pylint.py': {
                     35: {
                         'email': 'a@b.c',
@@ -118,13 +120,13 @@ def test_lint_compare_with_main_branch_similarity(patch_bash: Callable):
         ]
 
 
-def test_lint_compare_with_main_branch_lint_command_error(patch_bash: Callable, caplog):
+def test_lint_compare_with_main_branch_lint_command_error(patch_execute: Callable, caplog):
     with \
-            patch_bash(
+            patch_execute(
                 stderr='some lint error',
                 code=1
             ), \
-            mock.patch.object(generics.git, "changes", return_value={
+            mock.patch.object(generics.git, "changes_async", return_value={
                 'src/custolint/pylint.py': None,
             }),\
             pytest.raises(SystemExit):
@@ -181,6 +183,45 @@ def test_parse_message_fail_to_parse():
         )
 
 
+@pytest.mark.parametrize('stdout', (
+    pytest.param(
+        "************* Module a\n"
+        "a.py:1:0: C0114: Missing module docstring (missing-module-docstring)\n"
+        "a.py:35:4: F401 'logging' imported but unused\n"
+        "\n"
+        "------------------------------------------------------------------\n"
+        "Your code has been rated at 9.99/10 (previous run: 9.99/10, +0.00)\n",
+        id='banners'
+    ),
+    pytest.param(
+        "a.py:1:0: R0801: Similar lines in 2 files\n"
+        "==a:[1:3]\n"
+        "==b:[3:5]\n",
+        id='similar-lines'
+    ),
+    pytest.param('', id='empty'),
+    pytest.param('a.py:1:0: message without line ending', id='no-line-ending'),
+))
+def test_parse_text_output_bulk(stdout: str):
+    spilled = spill.Output()
+    spilled.file.write(stdout.encode())
+    spilled.file.flush()
+
+    per_line = list(generics._parse_text_output(stdout.split("\n")))
+
+    assert list(generics._parse_text_output(stdout)) == per_line
+    assert list(generics._parse_text_output(spilled)) == per_line
+
+
+def test_parse_text_output_bulk_fail_to_parse():
+    with pytest.raises(RuntimeError, match=re.escape(
+        "Can not parse lint line 'Found 16 errors in 4 files (checked 9 source files)'"
+    )):
+        list(generics._parse_text_output(
+            "a.py:1: message\nFound 16 errors in 4 files (checked 9 source files)\n"
+        ))
+
+
 @pytest.mark.parametrize("error_code, halt_on_n_messages", (
     pytest.param(generics.SYSTEM_EXIT_CODE_WITH_ALL_MESSAGES_INCLUDED, 0, id='halt_on_0_messages'),
     pytest.param(generics.SYSTEM_EXIT_CODE_WITH_HALT_ON_N_MESSAGES, 2, id='halt_on_2_messages'),
@@ -611,3 +652,389 @@ def test_group_by_email_and_file_name_no_halt(
             halt_on_n_messages=halt_on_n_messages,
             halt=False
         ) == error_code
+
+
+@pytest.mark.usefixtures('worker_threads')
+def test_lint_compare_with_main_branch_in_process():
+    changes = {
+        'src/custolint/pylint.py': {
+            35: {
+                'email': 'a@b.c',
+                'date': 'today',
+                'author': 'John Snow'
+            }
+        },
+    }
+    with \
+            mock.patch.object(generics.env, 'IN_PROCESS', True), \
+            mock.patch.object(generics.jobs, 'execute') as execute, \
+            mock.patch.object(generics.git, "changes_async", return_value=changes):
+
+        in_process = mock.Mock(return_value=[
+            ('src/custolint/pylint.py', 35, '0: C0301: Line too long (111/100) (line-too-long)'),
+            ('src/custolint/pylint.py', 36, '0: C0301: Line too long (111/100) (line-too-long)'),
+        ])
+
+        assert list(generics.lint_compare_with_main_branch(
+            execute_command='pylint',
+            filters=tuple(),
+            in_process=in_process
+        )) == [
+            _typing.Lint(
+                author='John Snow',
+                file_name='src/custolint/pylint.py',
+                line_number=35,
+                message='0: C0301: Line too long (111/100) (line-too-long)',
+                email='a@b.c',
+                date='today'
+            )
+        ]
+
+    in_process.assert_called_once_with(['src/custolint/pylint.py'])
+    execute.assert_not_called()
+
+
+@pytest.mark.usefixtures('worker_threads')
+def test_lint_compare_with_main_branch_lazy_blame():
+    changes = generics.git.LazyChanges(Path('/path/to/git'), {'src/custolint/pylint.py': {35, 36}})
+    blame = _typing.Blame(
+        author='John Snow',
+        email='a@b.c',
+        date='today',
+        file_name='src/custolint/pylint.py',
+        line_number=35
+    )
+
+    with \
+            mock.patch.object(generics.git, "_blame_ranges", return_value=[blame]) as blame_ranges, \
+            mock.patch.object(generics.git, "changes_async", return_value=changes):
+
+        in_process = mock.Mock(return_value=[
+            ('src/custolint/pylint.py', 35, '0: C0301: Line too long (111/100) (line-too-long)'),
+            ('src/custolint/pylint.py', 40, '0: C0301: Line too long (111/100) (line-too-long)'),
+        ])
+
+        with mock.patch.object(generics.env, 'IN_PROCESS', True):
+            assert list(generics.lint_compare_with_main_branch(
+                execute_command='pylint',
+                filters=tuple(),
+                in_process=in_process
+            )) == [
+                _typing.Lint(
+                    author='John Snow',
+                    file_name='src/custolint/pylint.py',
+                    line_number=35,
+                    message='0: C0301: Line too long (111/100) (line-too-long)',
+                    email='a@b.c',
+                    date='today'
+                )
+            ]
+
+    # only the changed line with a finding is blamed
+    blame_ranges.assert_awaited_once_with(
+        Path('/path/to/git'), 'src/custolint/pylint.py', [(35, 1)], None, None
+    )
+
+
+@pytest.mark.parametrize("error_code, halt_on_n_messages, output_count", (
+    pytest.param(generics.SYSTEM_EXIT_CODE_WITH_ALL_MESSAGES_INCLUDED, 0, 4, id='halt_on_0_messages'),
+    pytest.param(generics.SYSTEM_EXIT_CODE_WITH_HALT_ON_N_MESSAGES, 2, 2, id='halt_on_2_messages'),
+))
+def test_filter_output_async(error_code: int,
+                             halt_on_n_messages: int,
+                             output_count: int,
+                             contributors: Contributors):
+    with mock.patch.object(generics, 'output') as output:
+        assert jobs.run(generics.filer_output_async(
+            log=jobs.replay([
+                _typing.Lint(
+                    author='John Snow',
+                    file_name="file_name",
+                    line_number=i,
+                    message="message",
+                    date='today',
+                    email='email'
+                ) for i in range(1, 5)
+            ]),
+            contributors=contributors,
+            halt_on_n_messages=halt_on_n_messages,
+            halt=False,
+        )) == error_code
+
+    assert output.call_count == output_count
+
+
+def test_filter_output_async_with_filter_and_contributors():
+    def my_dummy_test_filter(path, message, line_number, cache) -> bool:
+        del path, message, cache
+        return line_number == 1
+
+    with mock.patch.object(generics, 'output') as output:
+        assert jobs.run(generics.filer_output_async(
+            log=jobs.replay([my_dummy_test_filter] + [
+                _typing.Lint(
+                    author='John Snow',
+                    file_name="file_name",
+                    line_number=i,
+                    message="message",
+                    date='today',
+                    email=email
+                ) for i, email in ((1, 'true.contributor'),
+                                   (2, 'true.contributor'),
+                                   (3, 'false.contributor'))
+            ]),
+            contributors=Contributors.from_cli('true.contributor', ''),
+            halt_on_n_messages=0,
+            halt=False,
+        )) == generics.SYSTEM_EXIT_CODE_WITH_ALL_MESSAGES_INCLUDED
+
+    assert output.call_args_list == [
+        mock.call('%s:%d %s ## %s:%s', 'file_name', 2, 'message', 'true.contributor', 'today')
+    ]
+
+
+@pytest.mark.parametrize('halt, expect', (
+    pytest.param(False, generics.SYSTEM_EXIT_CODE_WITH_ALL_MESSAGES_INCLUDED, id='no-halt'),
+    pytest.param(True, SystemExit, id='halt'),
+))
+def test_run_commands(halt: bool, expect: Any, capsys):
+    changes = {'a.py': {}}
+
+    async def first(changes: _typing.Changes, halt: bool) -> int:
+        assert changes == {'a.py': {}}
+        assert not halt
+        await asyncio.sleep(0.01)
+        generics.output('%s first', 'a')
+        return generics.SYSTEM_EXIT_CODE_WITH_ALL_MESSAGES_INCLUDED
+
+    async def second(changes: _typing.Changes, halt: bool) -> int:
+        del changes, halt
+        generics.output('%s second', 'b')
+        return generics.SYSTEM_EXIT_CODE_DRY_AND_CLEAN
+
+    with mock.patch.object(generics.git, 'changes_async', return_value=changes) as changes_async:
+        if expect is SystemExit:
+            with pytest.raises(SystemExit, match=str(generics.SYSTEM_EXIT_CODE_WITH_ALL_MESSAGES_INCLUDED)):
+                jobs.run(generics.run_commands([first, second], halt=halt))
+            assert capsys.readouterr().out == 'a first\n'
+        else:
+            assert jobs.run(generics.run_commands([first, second], halt=halt)) == expect
+            # the output is kept in the order of the commands
+            assert capsys.readouterr().out == 'a first\nb second\n'
+
+    changes_async.assert_awaited_once_with(contributors=None)
+
+
+def test_prioritize():
+    changes = {
+        'a.py': {1: {}},
+        'b.py': {1: {}, 2: {}, 3: {}},
+        'c.py': {1: {}, 2: {}},
+    }
+
+    assert generics.prioritize(['a.py', 'b.py', 'c.py'], changes) == ['b.py', 'c.py', 'a.py']
+
+
+def test_lint_chunks_deadline(caplog):
+    paths = [f'{i}.py' for i in range(generics.PRIORITY_CHUNK_SIZE + 1)]
+
+    async def _execute_lint_command(_, chunk, options):
+        assert options == ()
+        if len(chunk) == 1:  # the last chunk does not finish in time
+            await asyncio.sleep(10)
+        return '\n'.join(f'{path}:1: some message' for path in chunk)
+
+    async def _main():
+        return [messages async for messages in generics._lint_chunks(
+            execute_command='pylint',
+            parser=generics._parse_text_output,
+            in_process=None,
+            paths=paths,
+            deadline=generics.time.monotonic() + 0.2
+        )]
+
+    with mock.patch.object(generics, '_execute_lint_command', side_effect=_execute_lint_command):
+        assert jobs.run(_main()) == [
+            ((), paths[:-1], [(path, 1, ' some message') for path in paths[:-1]])
+        ]
+
+    assert caplog.messages == [f'Time budget exceeded, 1 files were not checked: {paths[-1]}']
+
+
+def test_lint_chunks_deadline_in_process(caplog):
+    async def _main():
+        return [messages async for messages in generics._lint_chunks(
+            execute_command='pylint',
+            parser=generics._parse_text_output,
+            in_process=mock.Mock(),
+            paths=['a.py'],
+            deadline=generics.time.monotonic() - 1
+        )]
+
+    with mock.patch.object(generics.env, 'IN_PROCESS', True):
+        assert not jobs.run(_main())
+
+    assert caplog.messages == ['Time budget exceeded, 1 files were not checked: a.py']
+
+
+@pytest.mark.usefixtures('worker_threads')
+def test_lint_chunks_deadline_in_process_running(caplog):
+    def _lint(arguments):
+        # the event loop keeps running the deadline meanwhile
+        generics.time.sleep(0.5)
+        return [(arguments[0], 1, '0: C0301: Line too long (111/100) (line-too-long)')]
+
+    async def _main():
+        return [messages async for messages in generics._lint_chunks(
+            execute_command='pylint',
+            parser=generics._parse_text_output,
+            in_process=_lint,
+            paths=['a.py'],
+            deadline=generics.time.monotonic() + 0.1
+        )]
+
+    with mock.patch.object(generics.env, 'IN_PROCESS', True):
+        assert not jobs.run(_main())
+
+    assert caplog.messages == ['Time budget exceeded, 1 files were not checked: a.py']
+
+
+@pytest.mark.usefixtures('cache_enabled')
+def test_lint_compare_with_main_branch_cross_file_job_all_files(tmp_path: Path):
+    author = {'email': 'a@b.c', 'date': 'today', 'author': 'John Snow'}
+    paths = []
+    for index in range(generics.PRIORITY_CHUNK_SIZE + 2):
+        path = tmp_path / f'm{index:02}.py'
+        path.write_text(f'VALUE = {index}\n')
+        paths.append(str(path))
+    changes = {path: {1: author} for path in paths}
+    # a cache hit
+    generics.cache.store('namespace', paths[:1], [])
+    cross_file_job = mock.AsyncMock(return_value=[])
+
+    with mock.patch.object(generics, '_execute_lint_command', return_value='') as execute:
+        assert not jobs.run(jobs.collect(generics.lint_compare_with_main_branch_async(
+            execute_command='pylint {lint_file}',
+            filters=tuple(),
+            changes=changes,
+            deadline=generics.time.monotonic() + 60,
+            cache_namespace='namespace',
+            cross_file_job=cross_file_job
+        )))
+
+    # linted chunk by chunk, compared all at once
+    assert len(execute.call_args_list) == 2
+    cross_file_job.assert_awaited_once_with(paths)
+
+
+def test_remaining_time():
+    assert generics.remaining_time(None) is None
+    assert generics.remaining_time(generics.time.monotonic() - 1) == 0
+
+
+@pytest.mark.usefixtures('cache_enabled')
+def test_lint_compare_with_main_branch_cache():
+    changes = {
+        'src/custolint/pylint.py': {35: {'email': 'a@b.c', 'date': 'today', 'author': 'John Snow'}},
+        'src/custolint/flake8.py': {1: {'email': 'a@b.c', 'date': 'today', 'author': 'John Snow'}},
+    }
+    lint = _typing.Lint(
+        author='John Snow',
+        file_name='src/custolint/pylint.py',
+        line_number=35,
+        message=' C0301: Line too long (111/100) (line-too-long)',
+        email='a@b.c',
+        date='today'
+    )
+
+    def _compare():
+        return list(generics.lint_compare_with_main_branch(
+            execute_command='pylint {lint_file}',
+            filters=tuple(),
+            cache_namespace='namespace'
+        ))
+
+    with \
+            mock.patch.object(generics.git, "changes_async", return_value=changes), \
+            mock.patch.object(generics, '_execute_lint_command', return_value=(
+                'src/custolint/pylint.py:35: C0301: Line too long (111/100) (line-too-long)'
+            )) as execute_lint_command:
+
+        assert _compare() == [lint]
+        execute_lint_command.assert_awaited_once_with(
+            'pylint {lint_file}', ['src/custolint/pylint.py', 'src/custolint/flake8.py'], ()
+        )
+
+        execute_lint_command.reset_mock()
+        assert _compare() == [lint]
+        execute_lint_command.assert_not_awaited()
+
+
+@pytest.mark.usefixtures('cache_enabled')
+def test_lint_compare_with_main_branch_test_files_options():
+    changes = {
+        'tests/test_pylint.py': {1: {'email': 'a@b.c', 'date': 'today', 'author': 'John Snow'}},
+        'src/custolint/pylint.py': {1: {'email': 'a@b.c', 'date': 'today', 'author': 'John Snow'}},
+    }
+
+    async def _execute_lint_command(_, chunk, options):
+        return '\n'.join(f'{path}:1: linted with {options!r}' for path in chunk)
+
+    def _compare():
+        return [lint.message for lint in generics.lint_compare_with_main_branch(
+            execute_command='pylint {lint_file}',
+            filters=tuple(),
+            cache_namespace='namespace',
+            test_files_options=('--disable=protected-access', )
+        )]
+
+    with \
+            mock.patch.object(generics.git, "changes_async", return_value=changes), \
+            mock.patch.object(generics, '_execute_lint_command',
+                              side_effect=_execute_lint_command) as execute_lint_command:
+
+        assert _compare() == [" linted with ()", " linted with ('--disable=protected-access',)"]
+        assert execute_lint_command.await_args_list == [
+            mock.call('pylint {lint_file}', ['src/custolint/pylint.py'], ()),
+            mock.call('pylint {lint_file}', ['tests/test_pylint.py'], ('--disable=protected-access', )),
+        ]
+
+        execute_lint_command.reset_mock()
+        assert _compare() == [" linted with ()", " linted with ('--disable=protected-access',)"]
+        execute_lint_command.assert_not_awaited()
+
+
+def test_lint_compare_with_main_branch_cross_file_job(caplog):
+    changes = {
+        'a.py': {1: {'email': 'a@b.c', 'date': 'today', 'author': 'John Snow'}},
+        'b.py': {1: {'email': 'a@b.c', 'date': 'today', 'author': 'John Snow'}},
+    }
+
+    async def _duplicate_code(paths):
+        assert paths == ['a.py', 'b.py']
+        return [('b.py', 1, '0: R0801: Similar lines in 2 files (duplicate-code)')]
+
+    async def _slow_duplicate_code(_):
+        await asyncio.sleep(10)
+
+    def _compare(cross_file_job, deadline=None):
+        return [lint.message for lint in jobs.run(jobs.collect(
+            generics.lint_compare_with_main_branch_async(
+                execute_command='pylint {lint_file}',
+                filters=tuple(),
+                changes=changes,
+                deadline=deadline,
+                cross_file_job=cross_file_job
+            )
+        ))]
+
+    with mock.patch.object(generics, '_execute_lint_command', return_value='a.py:1: W0611: Unused'):
+        assert _compare(_duplicate_code) == [
+            ' W0611: Unused', '0: R0801: Similar lines in 2 files (duplicate-code)'
+        ]
+
+        assert _compare(_slow_duplicate_code, deadline=generics.time.monotonic() + 0.2) == [
+            ' W0611: Unused'
+        ]
+
+    assert caplog.messages == ['Time budget exceeded, the checks across the files were not done']
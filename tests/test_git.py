@@ -1,12 +1,15 @@
 from pathlib import Path
 from typing import Callable, List, Optional
 
+import asyncio
 import logging
+from datetime import date
 from contextlib import nullcontext as does_not_raise
 from unittest import mock
 
 from custolint import _typing  # noqa: protected member
 from custolint import git
+from custolint.contributors import Contributors
 
 import pytest
 from _pytest.logging import LogCaptureFixture
@@ -32,10 +35,10 @@ from _pytest.logging import LogCaptureFixture
         ) for i in [1, 2, 3]
     ]
 ])
-def test_git_changes_success(_, patch_bash: Callable, _autodetect: mock.Mock):
+def test_git_changes_success(_, patch_execute: Callable, _autodetect: mock.Mock):
     with \
             _autodetect, \
-            patch_bash(
+            patch_execute(
                 stdout="""
                 --- a/care/of/red/potato.py
                 +++ b/care/of/red/potato.py
@@ -86,10 +89,10 @@ def test_git_changes_success(_, patch_bash: Callable, _autodetect: mock.Mock):
         }
 
 
-def test_git_changes_error(patch_bash: Callable, caplog: LogCaptureFixture, _autodetect: mock.Mock):
+def test_git_changes_error(patch_execute: Callable, caplog: LogCaptureFixture, _autodetect: mock.Mock):
     with \
             _autodetect, \
-            patch_bash(stderr='no git installed', code=1), \
+            patch_execute(stderr='no git installed', code=1), \
             pytest.raises(SystemExit, match='1'):
 
         git.changes(do_pull_rebase=False)
@@ -97,19 +100,124 @@ def test_git_changes_error(patch_bash: Callable, caplog: LogCaptureFixture, _aut
     assert caplog.messages == ['Diff command failed: no git installed']
 
 
-def test_git_changes_debug_enabled(patch_bash: Callable,
+def test_git_changes_debug_enabled(patch_execute: Callable,
                                    caplog: LogCaptureFixture,
                                    _autodetect: mock.Mock):
     with \
             _autodetect, \
             mock.patch.object(git.LOG, 'isEnabledFor', return_value=True), \
-            patch_bash(stdout='some message about diff'):
+            patch_execute(stdout='some message about diff'):
 
         git.changes(do_pull_rebase=False)
 
     assert caplog.messages[2] == 'Git diff output some message about diff'
 
 
+def test_git_changes_lazy(patch_execute: Callable, _autodetect: mock.Mock):
+    with \
+            _autodetect, \
+            mock.patch.object(git, "_blame") as blame, \
+            patch_execute(
+                stdout="""
+                +++ b/care/of/red/potato.py
+                @@ -310 +310 @@ def get_audit_log(
+                @@ -321,2 +320,0 @@ def send_mail(subject: str, body: str, recipients: List[str], cc: List[str] = No
+                +++ b/care/of/yellow/banana.py
+                @@ -0,0 +1,3 @@
+                +++ b/care/of/deleted.py
+                @@ -1,3 +0,0 @@
+                """):
+
+        git_changes = asyncio.run(git.changes_async(do_pull_rebase=False, lazy=True))
+
+    blame.assert_not_called()
+    assert isinstance(git_changes, git.LazyChanges)
+    assert git_changes == {'care/of/red/potato.py': {}, 'care/of/yellow/banana.py': {}}
+    assert git_changes.lines == {'care/of/red/potato.py': {310}, 'care/of/yellow/banana.py': {1, 2, 3}}
+
+
+def test_lazy_changes_attribute(patch_execute: Callable):
+    changes = git.LazyChanges(Path('/path/to/git'), {'a/b/api/bar.py': {1, 2, 3, 7}, 'c.py': {1}})
+
+    with patch_execute(stdout=GIT_BLAME_PORCELAIN_1_3_OUTPUT) as execute:
+        asyncio.run(git.attribute(changes, [
+            ('a/b/api/bar.py', 1),
+            ('a/b/api/bar.py', 2),
+            ('a/b/api/bar.py', 3),
+            ('a/b/api/bar.py', 5),  # not changed
+            ('not/changed.py', 1),
+        ]))
+
+    execute.assert_awaited_once_with('git blame --line-porcelain -L 1,+3 -- /path/to/git/a/b/api/bar.py')
+    assert changes['a/b/api/bar.py'] == {
+        i: {'author': 'John Snow', 'email': 'john.snow@some-domain.eu', 'date': '2022-08-25'}
+        for i in [1, 2, 3]
+    }
+    assert changes['c.py'] == {}
+
+    # already attributed lines are not blamed again
+    with patch_execute() as execute:
+        asyncio.run(git.attribute(changes, [('a/b/api/bar.py', 1)]))
+
+    execute.assert_not_awaited()
+
+
+def test_lazy_changes_attribute_batched_per_file(patch_execute: Callable):
+    changes = git.LazyChanges(Path('/path/to/git'), {'a/b/api/bar.py': set(range(1, 10))})
+
+    with patch_execute(stdout=GIT_BLAME_PORCELAIN_1_3_OUTPUT) as execute:
+        asyncio.run(git.attribute(changes, [('a/b/api/bar.py', i) for i in (7, 1, 2, 3)]))
+
+    execute.assert_awaited_once_with(
+        'git blame --line-porcelain -L 1,+3 -L 7,+1 -- /path/to/git/a/b/api/bar.py'
+    )
+
+
+def test_lazy_changes_attribute_contributors(patch_execute: Callable):
+    changes = git.LazyChanges(
+        Path('/path/to/git'),
+        {'a/b/api/bar.py': {1, 2, 3}},
+        Contributors.from_cli('non-existing-white', '')
+    )
+
+    with patch_execute(stdout=GIT_BLAME_PORCELAIN_1_3_OUTPUT) as execute:
+        asyncio.run(git.attribute(changes, [('a/b/api/bar.py', 1)]))
+        asyncio.run(git.attribute(changes, [('a/b/api/bar.py', 1)]))
+
+    execute.assert_awaited_once()
+    assert changes == {'a/b/api/bar.py': {}}
+
+
+def test_git_changes_contributors(patch_execute: Callable, _autodetect: mock.Mock):
+    blame = _typing.Blame(
+        author='John Snow',
+        file_name='care/of/red/potato.py',
+        line_number=310,
+        email='gus.fring@some-domain.com',
+        date='2021-06-25'
+    )
+
+    with \
+            _autodetect, \
+            mock.patch.object(git, "_blame", return_value=[blame]), \
+            patch_execute(stdout="""
+                +++ b/care/of/red/potato.py
+                @@ -310 +310 @@ def get_audit_log(
+                """):
+
+        assert asyncio.run(git.changes_async(
+            do_pull_rebase=False,
+            contributors=Contributors.from_cli('', 'John Snow')
+        )) == {}
+
+
+def test_attribute_eager_changes(patch_execute: Callable):
+    with patch_execute() as execute:
+        asyncio.run(git.attribute({'a.py': {}}, [('a.py', 1)]))
+
+    execute.assert_not_awaited()
+
+
 GIT_BLAME_PORCELAIN_1_3_OUTPUT = (
     "005661f440bcdfefb2fd41d4e781351471dfb3ef 1 1 2\n"
     "author John Snow\n"
@@ -219,26 +327,105 @@ def test_blame(file_name: str,  # pylint: disable=too-many-arguments
                bash_stdout: str,
                git_command: str,
                expect: List,
-               patch_bash: Callable):
+               patch_execute: Callable):
 
     for the_line_number in the_line_numbers:
-        with patch_bash(stdout=bash_stdout, stderr='',) as bash:
+        with patch_execute(stdout=bash_stdout, stderr='',) as execute:
 
-            blame = list(git._blame(
+            blame = list(asyncio.run(git._blame(
                 root_dir=Path('/path/to/git'),
                 line_number=the_line_number,
                 file_name=file_name
-            ))
+            )))
             assert blame == expect
-            bash.assert_called_once_with(git_command)
+            execute.assert_awaited_once_with(git_command)
+
+
+def test_blame_since(patch_execute: Callable):
+    boundary_output = GIT_BLAME_PORCELAIN_1_3_OUTPUT.replace(
+        "summary make custolint installable\n"
+        "filename  a/b/api/bar.py\n"
+        "        name = custolint\n",
+        "summary make custolint installable\n"
+        "boundary\n"
+        "filename  a/b/api/bar.py\n"
+        "        name = custolint\n",
+    )
+
+    with patch_execute(stdout=boundary_output) as execute:
+        blame = list(asyncio.run(git._blame(
+            root_dir=Path('/path/to/git'),
+            line_number='1,3',
+            file_name='a/b/api/bar.py',
+            since=date(2022, 1, 1)
+        )))
 
+    execute.assert_awaited_once_with(
+        'git blame --line-porcelain --root --since=2022-01-01 -L 1,+3 -- /path/to/git/a/b/api/bar.py'
+    )
+    # the line 2 is older than the since date
+    assert [i.line_number for i in blame] == [1, 3]
+
+
+@pytest.mark.usefixtures('cache_enabled')
+@pytest.mark.parametrize('author_mail, expect_executions', [
+    pytest.param('<john.snow@some-domain.eu>', 1, id='committed'),
+    pytest.param('<not.committed.yet>', 2, id='not-committed-yet'),
+])
+def test_blame_cache(author_mail: str, expect_executions: int, tmp_path: Path):
+    (tmp_path / 'a' / 'b' / 'api').mkdir(parents=True)
+    (tmp_path / 'a' / 'b' / 'api' / 'bar.py').write_text('[metadata]\nname\nversion\n')
+    output = GIT_BLAME_PORCELAIN_1_3_OUTPUT.replace('<john.snow@some-domain.eu>', author_mail)
+
+    def _blame():
+        return list(asyncio.run(git._blame(
+            root_dir=tmp_path,
+            line_number='1,3',
+            file_name='a/b/api/bar.py',
+            head='005661f440bcdfefb2fd41d4e781351471dfb3ef'
+        )))
+
+    with mock.patch.object(git.jobs, 'execute', return_value=git.jobs.Result(
+            stdout=output.encode(), stderr=b'', code=0
+    )) as execute:
+        assert _blame() == _blame()
+
+    assert execute.await_count == expect_executions
+
+
+@pytest.mark.usefixtures('cache_enabled')
+def test_git_changes_snapshot(_autodetect: mock.Mock):
+    blame = _typing.Blame(
+        author='John Snow',
+        file_name='care/of/red/potato.py',
+        line_number=310,
+        email='gus.fring@some-domain.com',
+        date='2021-06-25'
+    )
+    diff = git.jobs.Result(stdout=b'+++ b/care/of/red/potato.py\n@@ -310 +310 @@\n',
+                           stderr=b'', code=0)
+    head = git.jobs.Result(stdout=b'005661f440bcdfefb2fd41d4e781351471dfb3ef\n',
+                           stderr=b'', code=0)
 
-def test_blame_with_command_error(patch_bash: Callable):
     with \
-            patch_bash(stderr='some_error', code=1),\
-            pytest.raises(SystemExit):
+            _autodetect, \
+            mock.patch.object(git, "_blame", return_value=[blame]) as blame_mock, \
+            mock.patch.object(git.jobs, 'execute', side_effect=[diff, head, diff, head]):
+
+        first = asyncio.run(git.changes_async(do_pull_rebase=False))
+        second = asyncio.run(git.changes_async(do_pull_rebase=False))
+
+    blame_mock.assert_awaited_once()
+    assert first == second == {
+        'care/of/red/potato.py': {
+            310: {'author': 'John Snow', 'email': 'gus.fring@some-domain.com', 'date': '2021-06-25'}
+        }
+    }
+
 
-        next(git._blame(
+def test_blame_with_command_error(patch_execute: Callable):
+    with patch_execute(stderr='some_error', code=1), pytest.raises(SystemExit):
+        asyncio.run(git._blame(
             root_dir=Path('/path/to/git'),
             line_number='1',
             file_name="a.py"
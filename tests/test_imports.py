@@ -0,0 +1,74 @@
+from pathlib import Path
+from unittest import mock
+
+import bash
+import pytest
+
+from custolint import imports
+
+
+@pytest.fixture(name='project')
+def fixture_project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+    ``pkg.a`` is imported by ``pkg.b``, itself imported by ``c``
+    """
+    files = {
+        'pkg/__init__.py': '',
+        'pkg/a.py': 'def f() -> int:\n    return 1\n',
+        'pkg/b.py': 'from .a import f\n',
+        'c.py': 'import pkg.b\n',
+        'd.py': 'import os\n',
+    }
+    for name, content in files.items():
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text(content)
+
+    monkeypatch.chdir(tmp_path)
+    bash.bash('git init --quiet && git add .')
+
+    return tmp_path
+
+
+@pytest.mark.parametrize('changed, depth, expect', (
+    pytest.param(['pkg/a.py'], 0, [], id='disabled'),
+    pytest.param(['pkg/a.py'], 1, ['pkg/b.py'], id='direct'),
+    pytest.param(['pkg/a.py'], 2, ['pkg/b.py', 'c.py'], id='transitive'),
+    pytest.param(['pkg/a.py'], 5, ['pkg/b.py', 'c.py'], id='deeper-than-graph'),
+    pytest.param(['pkg/a.py', 'pkg/b.py'], 1, ['c.py'], id='changed-not-repeated'),
+    pytest.param(['d.py'], 1, [], id='not-imported'),
+))
+def test_dependents(project: Path, changed, depth: int, expect):
+    assert imports.dependents(changed, depth) == expect
+
+
+def test_imported_modules(project: Path):
+    assert imports.imported_modules('pkg/b.py', 'pkg.b') == ['pkg', 'pkg.a', 'pkg.a.f']
+    assert imports.imported_modules('c.py', 'c') == ['pkg', 'pkg.b']
+    assert imports.module_name('pkg/__init__.py') == 'pkg'
+
+
+@pytest.mark.usefixtures('cache_enabled')
+def test_imported_modules_cache(project: Path):
+    assert imports.imported_modules('c.py', 'c') == ['pkg', 'pkg.b']
+
+    with mock.patch.object(imports, '_parse', return_value=['pkg', 'pkg.a']) as parse:
+        assert imports.imported_modules('c.py', 'c') == ['pkg', 'pkg.b']
+        parse.assert_not_called()
+
+        (project / 'c.py').write_text('import pkg.a\n')
+        imports.imported_modules('c.py', 'c')
+        parse.assert_called_once_with('c.py', 'c')
+
+
+def test_syntax_error(project: Path):
+    (project / 'e.py').write_text('import (\n')
+
+    assert imports.imported_modules('e.py', 'e') == []
+
+
+@pytest.mark.usefixtures('cache_enabled')
+def test_reverse_graph_not_evicting(project: Path):
+    with mock.patch.object(imports.cache, 'evict') as evict:
+        assert imports.reverse_graph(['pkg/b.py', 'c.py'])['pkg.a'] == {'pkg/b.py'}
+
+    evict.assert_not_called()
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import pytest
+
+from custolint import inprocess
+
+
+@pytest.fixture(name='lint_file')
+def _lint_file(tmp_path: Path) -> str:
+    path = tmp_path / 'module_a.py'
+    path.write_text('"""Module a"""\nimport os\n\n\ndef function_a(x):\n    return x\n')
+    return str(path)
+
+
+def test_pylint(lint_file: str):
+    assert (
+        lint_file, 2, '0: W0611: Unused import os (unused-import)'
+    ) in list(inprocess.pylint([lint_file], config=None))
+
+
+def test_flake8(lint_file: str):
+    assert list(inprocess.flake8([lint_file], config=Path('config.d/.flake8'))) == [
+        (lint_file, 2, "1: F401 'os' imported but unused"),
+    ]
+
+
+def test_mypy(lint_file: str, tmp_path: Path):
+    stdout, stderr, code = inprocess.mypy([
+        '--strict', '--show-error-codes', f'--cache-dir={tmp_path / ".mypy_cache"}', lint_file
+    ])
+
+    assert f'{lint_file}:5: error: Function is missing a type annotation  [no-untyped-def]' in stdout
+    assert not stderr
+    assert code == 1
@@ -0,0 +1,183 @@
+import asyncio
+import os
+import time
+from unittest import mock
+
+import pytest
+
+from custolint import jobs
+
+
+def test_execute_success():
+    assert jobs.run(jobs.execute('echo "a b"')) == jobs.Result(stdout=b'a b\n', stderr=b'', code=0)
+
+
+def test_execute_spilled(tmp_path):
+    with open(tmp_path / 'stdout', 'w+b') as stdout:
+        result = jobs.run(jobs.execute('echo "a b"', stdout=stdout))
+        stdout.seek(0)
+
+        assert result == jobs.Result(stdout=b'', stderr=b'', code=0)
+        assert stdout.read() == b'a b\n'
+
+
+def test_execute_error():
+    result = jobs.run(jobs.execute('ls /not/a/directory'))
+
+    assert result.code
+    assert result.stderr
+    assert not result.stdout
+
+
+def test_execute_concurrently():
+    async def _main():
+        return await asyncio.gather(*(jobs.execute(f'echo {i}') for i in range(20)))
+
+    assert [result.stdout for result in jobs.run(_main())] == [f'{i}\n'.encode() for i in range(20)]
+
+
+def test_collect_and_replay():
+    assert jobs.run(jobs.collect(jobs.replay([1, 2, 3]))) == [1, 2, 3]
+
+
+@pytest.mark.parametrize('content, expected', (
+    ('max 100000', None),
+    ('150000 100000', 1.5),
+    ('200000 100000', 2),
+))
+def test_cgroup_cpu_quota_v2(tmp_path, content, expected):
+    (tmp_path / 'cpu.max').write_text(content)
+
+    assert jobs.cgroup_cpu_quota(tmp_path) == expected
+
+
+@pytest.mark.parametrize('quota, expected', (
+    ('-1', None),
+    ('50000', 0.5),
+))
+def test_cgroup_cpu_quota_v1(tmp_path, quota, expected):
+    (tmp_path / 'cpu').mkdir()
+    (tmp_path / 'cpu' / 'cpu.cfs_quota_us').write_text(quota + '\n')
+    (tmp_path / 'cpu' / 'cpu.cfs_period_us').write_text('100000\n')
+
+    assert jobs.cgroup_cpu_quota(tmp_path) == expected
+
+
+def test_cgroup_cpu_quota_not_available(tmp_path):
+    assert jobs.cgroup_cpu_quota(tmp_path) is None
+
+
+def test_cpu_budget(tmp_path):
+    (tmp_path / 'cpu.max').write_text('250000 100000')
+
+    with mock.patch('os.sched_getaffinity', return_value=set(range(8))):
+        assert jobs.cpu_budget(tmp_path) == 3
+        assert jobs.cpu_budget(tmp_path / 'not-limited') == 8
+
+
+def test_scheduler_budget():
+    scheduler = jobs.Scheduler(2)
+    running = []
+
+    async def _job():
+        async with scheduler.slot():
+            running.append(True)
+            await asyncio.sleep(0.01)
+            peak = len(running)
+            running.pop()
+            return peak
+
+    async def _main():
+        return await asyncio.gather(*(_job() for _ in range(6)))
+
+    assert max(jobs.run(_main())) == 2
+
+
+def test_scheduler_global():
+    with mock.patch.object(jobs, '_SCHEDULER', None), mock.patch('custolint.env.JOBS', 3):
+        assert jobs.scheduler().budget == 3
+        assert jobs.scheduler() is jobs.scheduler()
+
+
+def test_lower_priority():
+    with mock.patch('os.nice', return_value=0) as nice, \
+            mock.patch('shutil.which', return_value='/usr/bin/ionice'), \
+            mock.patch('bash.bash') as bash:
+        bash.return_value.code = 0
+        jobs.lower_priority()
+
+    nice.assert_called_with(jobs.LOW_PRIORITY_NICENESS)
+    bash.assert_called_once_with(f'ionice -c 3 -p {jobs.os.getpid()}')
+
+
+def test_job_server_from_makeflags_fifo(tmp_path):
+    fifo = tmp_path / 'GMfifo'
+    os.mkfifo(fifo)
+
+    jobserver = jobs.JobServer.from_makeflags(f'-j2 --jobserver-auth=fifo:{fifo}')
+
+    assert jobserver.read_fd == jobserver.write_fd
+    os.close(jobserver.read_fd)
+
+
+def test_job_server_from_makeflags_not_available():
+    assert jobs.JobServer.from_makeflags('-k') is None
+    assert jobs.JobServer.from_makeflags('-j2 --jobserver-auth=1000,1001') is None
+
+
+def test_scheduler_job_server():
+    read_fd, write_fd = os.pipe()
+    # ``make -j3``: the implicit slot plus 2 tokens
+    os.write(write_fd, b'++')
+    scheduler = jobs.Scheduler(8, jobs.JobServer(read_fd, write_fd))
+    running = []
+
+    async def _job():
+        async with scheduler.slot():
+            running.append(True)
+            await asyncio.sleep(0.01)
+            peak = len(running)
+            running.pop()
+            return peak
+
+    async def _main():
+        return await asyncio.gather(*(_job() for _ in range(6)))
+
+    assert max(jobs.run(_main())) == 3
+    # all the tokens are given back to make
+    assert os.read(read_fd, 10) == b'++'
+    os.close(read_fd)
+    os.close(write_fd)
+
+
+def test_execute_cancelled():
+    async def _main():
+        task = asyncio.ensure_future(jobs.execute('sleep 10'))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    with mock.patch('asyncio.subprocess.Process.kill', autospec=True,
+                    side_effect=asyncio.subprocess.Process.kill) as kill:
+        jobs.run(_main())
+
+    kill.assert_called_once()
+
+
+def test_call():
+    # in a worker process of the run, stopped once done
+    assert jobs.run(jobs.call(os.getpid)) != os.getpid()
+    assert jobs._EXECUTOR is None
+
+
+def test_call_abandoned():
+    async def _main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(jobs.call(time.sleep, 30), 1)
+
+    start = time.monotonic()
+    jobs.run(_main())
+    # the worker still running the call is stopped
+    assert time.monotonic() - start < 10
+    assert not jobs._CALLS and jobs._WORKERS is None
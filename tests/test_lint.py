@@ -8,10 +8,10 @@ import pytest
 
 @pytest.mark.parametrize('config_exists, implementation, expect_command', (
     # pylint: disable=line-too-long
-    pytest.param(True, pylint, 'pylint --rcfile=config.d/pylintrc {lint_file}', id='pylint-config-exists'),
-    pytest.param(False, pylint, 'pylint  {lint_file}', id='pylint-config-do-not-exists'),
-    pytest.param(True, flake8, 'flake8 --config=config.d/.flake8 {lint_file}', id='flake8-config-exists'),
-    pytest.param(False, flake8, 'flake8  {lint_file}', id='flake8-config-do-not-exists')
+    pytest.param(True, pylint, 'pylint --rcfile=config.d/pylintrc --disable=duplicate-code --output-format=json {lint_file}', id='pylint-config-exists'),
+    pytest.param(False, pylint, 'pylint  --disable=duplicate-code --output-format=json {lint_file}', id='pylint-config-do-not-exists'),
+    pytest.param(True, flake8, 'flake8 --config=config.d/.flake8 --format=default {lint_file}', id='flake8-config-exists'),
+    pytest.param(False, flake8, 'flake8  --format=default {lint_file}', id='flake8-config-do-not-exists')
     # pylint: enable=line-too-long
 ))
 def test_compare_with_main_branch(config_exists: bool,
@@ -26,7 +26,5 @@ def test_compare_with_main_branch(config_exists: bool,
 
         list(implementation.compare_with_main_branch())
 
-        lint_compare_with_main_branch.assert_called_with(
-            execute_command=expect_command,
-            filters=(implementation._filter,)
-        )
+        assert lint_compare_with_main_branch.call_args.kwargs['execute_command'] == expect_command
+        assert lint_compare_with_main_branch.call_args.kwargs['filters'] == (implementation._filter,)
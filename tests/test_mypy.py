@@ -1,6 +1,7 @@
 from pathlib import Path
 from typing import Any, Callable, Iterable, List, Optional, Sequence
 
+import asyncio
 import re
 from unittest import mock
 
@@ -72,17 +73,17 @@ def test_process_line_success(fields: Sequence[str], process_result: Optional[_t
     }) == process_result
 
 
-def test_compare_with_main_branch_no_file_affected(patch_bash: Callable):
+def test_compare_with_main_branch_no_file_affected(patch_execute: Callable):
     with \
-            patch_bash(stdout='xxx'), \
-            mock.patch.object(mypy.git, 'changes', return_value={}):
+            patch_execute(stdout='xxx'), \
+            mock.patch.object(mypy.git, 'changes_async', return_value={}):
         assert not list(mypy.compare_with_main_branch())
 
 
-def test_compare_with_main_branch_mypy_exception(patch_bash: Callable, caplog):
+def test_compare_with_main_branch_mypy_exception(patch_execute: Callable, caplog):
     with \
-            patch_bash(stderr='Some exception', code=13), \
-            mock.patch.object(mypy.git, 'changes', return_value={
+            patch_execute(stderr='Some exception', code=13), \
+            mock.patch.object(mypy.git, 'changes_async', return_value={
                 'a.py': {
                     1: 'contributor_a'
                 }
@@ -93,6 +94,22 @@ def test_compare_with_main_branch_mypy_exception(patch_bash: Callable, caplog):
     assert caplog.messages == ['Mypy command failed: Some exception']
 
 
+def test_compare_with_main_branch_deadline(caplog):
+    async def _execute(_):
+        await asyncio.sleep(10)
+
+    async def _main():
+        return [line async for line in mypy.compare_with_main_branch_async(
+            changes={'a.py': {1: 'contributor_a'}},
+            deadline=mypy.generics.time.monotonic() + 0.1
+        )]
+
+    with mock.patch.object(mypy, '_execute', side_effect=_execute):
+        assert not asyncio.run(_main())
+
+    assert caplog.messages == ['Time budget exceeded, 1 files were not checked: a.py']
+
+
 @pytest.mark.parametrize('stdout, expect, process_line_return_value', (
     pytest.param("a.py:32: "
                  "error: Function is missing a return type annotation  "
@@ -118,12 +135,12 @@ def test_compare_with_main_branch_some_files_affected(
     stdout: str,
     expect: Iterable[str],
     process_line_return_value: Optional[Iterable[str]],
-    patch_bash: Callable[..., mock.Mock]
+    patch_execute: Callable[..., mock.AsyncMock]
 ):
 
     with \
-            patch_bash(stdout=stdout), \
-            mock.patch.object(mypy.git, 'changes', return_value={
+            patch_execute(stdout=stdout), \
+            mock.patch.object(mypy.git, 'changes_async', return_value={
                 'a.py': {
                     1: 'contributor_a'
                 }
@@ -149,7 +166,7 @@ def test_compare_with_main_branch_some_files_affected(
 @pytest.mark.parametrize('message, content, path, line_number', (
     pytest.param(
         'Some message [no-untyped-def]',
-        ['def my_dummy_test_filter(*args, **kwargs) -> bool:'],
+        ['def my_dummy_test_filter(*args, **kwargs) -> bool:', '    pass'],
         Path('test_a.py'),
         1,
         id='dummy-functions-in-test-files'
@@ -180,35 +197,35 @@ def test_compare_with_main_branch_some_files_affected(
     ),
     pytest.param(
         'Some message [type-arg]',
-        ['def test_a(name):'],
+        ['def test_a(name):', '    pass'],
         Path('test_a.py'),
         1,
         id='type_arg'
     ),
     pytest.param(
         'Some message [no-untyped-def]',
-        ['def test_a(name):'],
+        ['def test_a(name):', '    pass'],
         Path('test_a.py'),
         1,
         id='no-untyped-def'
     ),
     pytest.param(
         'Some message [attr-defined]',
-        ['def test_a(name):'],
+        ['def test_a(name):', '    pass'],
         Path('test_a.py'),
         1,
         id='attr-defined'
     ),
     pytest.param(
         "Use \"-> None\" if function does not return a value",
-        ['def test_a(name):'],
+        ['def test_a(name):', '    pass'],
         Path('test_a.py'),
         1,
         id='return-none'
     ),
     pytest.param(
         "dict-item",
-        ['def test_a(name):'],
+        ['def test_a(name):', '    pass'],
         Path('test_a.py'),
         1,
         id='dict-item'
@@ -278,3 +295,62 @@ def test_filter_true_not_cache(message: str, path_kwargs: Any, path_mock: mock.M
 
 def test_cli(non_existing_white: Contributors):
     assert mypy.cli(non_existing_white, 0, False) == SYSTEM_EXIT_CODE_DRY_AND_CLEAN
+
+
+@pytest.mark.parametrize('line, expect', (
+    pytest.param(
+        '{"file": "a.py", "line": 1, "column": 0, "message": "Function is missing a type annotation", '
+        '"hint": null, "code": "no-untyped-def", "severity": "error"}',
+        [
+            ('a.py', '1', 'error', 'Function is missing a type annotation  [no-untyped-def]'),
+        ],
+        id='error'
+    ),
+    pytest.param(
+        '{"file": "C:\\\\a.py", "line": 4, "column": 0, "message": "Function is missing a return type annotation", '
+        '"hint": "Use \\"-> None\\" if function does not return a value", "code": "no-untyped-def", "severity": "error"}',
+        [
+            ('C:\\a.py', '4', 'error', 'Function is missing a return type annotation  [no-untyped-def]'),
+            ('C:\\a.py', '4', 'note', 'Use "-> None" if function does not return a value'),
+        ],
+        id='error-with-hint-and-windows-path'
+    ),
+    pytest.param(
+        'a.py:32: error: Some message  [no-untyped-def]',
+        [
+            ['a.py', '32', ' error', ' Some message  [no-untyped-def]'],
+        ],
+        id='fallback-to-text'
+    ),
+))
+def test_parse_output_line(line: str, expect: List[Sequence[str]]):
+    assert list(mypy._parse_output_line(line)) == expect
+
+
+@pytest.mark.parametrize('version, expect', (
+    pytest.param('1.10.1', '', id='text'),
+    pytest.param('1.11.0', '--output=json', id='json'),
+    pytest.param('2.4.0+dev.abc', '--output=json', id='json-dev'),
+))
+def test_output_argument(version: str, expect: str):
+    with mock.patch.object(mypy, 'mypy_version', version):
+        assert mypy._output_argument() == expect
+
+
+@pytest.mark.parametrize('in_process_result, expect', (
+    pytest.param(('a.py:1: error: message', '', 1), 'a.py:1: error: message', id='success'),
+    pytest.param(('', 'mypy: error: unrecognized arguments', 2), SystemExit, id='error'),
+))
+@pytest.mark.usefixtures('worker_threads')
+def test_execute_in_process(in_process_result: tuple, expect: Any):
+    with \
+            mock.patch.object(mypy.env, 'IN_PROCESS', True), \
+            mock.patch.object(mypy.inprocess, 'mypy', return_value=in_process_result) as in_process:
+
+        if expect is SystemExit:
+            with pytest.raises(SystemExit, match='2'):
+                asyncio.run(mypy._execute('mypy --strict @/tmp/a b'))
+        else:
+            assert asyncio.run(mypy._execute('mypy --strict @/tmp/a b')) == expect
+
+    in_process.assert_called_once_with(['--strict', '@/tmp/a', 'b'])
@@ -0,0 +1,73 @@
+import io
+import logging
+import shutil
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from custolint import cache, jobs, mypycache
+
+pytestmark = pytest.mark.usefixtures('cache_enabled')
+
+
+@pytest.fixture(name='project')
+def fixture_project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    project = tmp_path / 'project'
+    project.mkdir()
+    (project / 'a.py').write_text('VALUE: int = 1\n')
+    (project / 'files').write_text('a.py\n')
+    monkeypatch.chdir(project)
+
+    return project
+
+
+def test_export_and_import(project: Path, _autodetect):
+    with _autodetect:
+        jobs.run(mypycache.export_cache(f'--strict {mypycache.argument(None)}', None, '@files'))
+        exported = sorted(path.relative_to(mypycache.cache_dir(None))
+                          for path in mypycache.cache_dir(None).rglob('*'))
+        assert exported
+
+        # a fresh checkout
+        shutil.rmtree(mypycache.cache_dir(None))
+
+        assert mypycache.import_cache(None)
+        assert sorted(path.relative_to(mypycache.cache_dir(None))
+                      for path in mypycache.cache_dir(None).rglob('*')) == exported
+
+        # the local cache is kept
+        assert not mypycache.import_cache(None)
+
+
+def test_import_without_archive(project: Path, _autodetect, caplog: pytest.LogCaptureFixture):
+    with _autodetect, caplog.at_level(logging.INFO, logger=mypycache.__name__):
+        assert not mypycache.import_cache(None)
+
+    assert caplog.messages == ['No mypy cache of the target branch, mypy analyses all the files']
+
+
+def test_import_unsafe_archive(project: Path, _autodetect, caplog: pytest.LogCaptureFixture):
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w:gz') as tar:
+        content = b'echo owned'
+        member = tarfile.TarInfo('../../.bashrc')
+        member.size = len(content)
+        tar.addfile(member, io.BytesIO(content))
+
+    with _autodetect:
+        cache.storage().put(mypycache._archive_key(None), archive.getvalue())
+        assert not mypycache.import_cache(None)
+
+    assert caplog.messages == ['Ignore the mypy cache archive, unexpected member paths']
+    assert not mypycache.cache_dir(None).exists()
+
+
+def test_fingerprint(tmp_path: Path):
+    config = tmp_path / 'mypy.ini'
+    config.write_text('[mypy]\nstrict = True\n')
+    fingerprint = mypycache.fingerprint(config)
+
+    assert fingerprint != mypycache.fingerprint(None)
+    config.write_text('[mypy]\n')
+    assert fingerprint != mypycache.fingerprint(config)
@@ -0,0 +1,102 @@
+from pathlib import Path
+
+import bash
+import pytest
+
+from custolint import cache, notes
+
+pytestmark = pytest.mark.usefixtures('cache_enabled')
+
+
+def _git(command: str, cwd: Path) -> str:
+    result = bash.bash(f'git -C {cwd} {command}')
+    assert not result.code, result.stderr.decode()
+    return str(result.stdout.decode().strip())
+
+
+@pytest.fixture(name='clones')
+def fixture_clones(tmp_path: Path):
+    """
+    Two clones of a local bare remote, on the same commit
+    """
+    origin = tmp_path / 'origin.git'
+    bash.bash(f'git init --bare --quiet {origin}')
+
+    clones = []
+    for name in ('ci', 'developer'):
+        clone = tmp_path / name
+        bash.bash(f'git clone --quiet {origin} {clone}')
+        _git('config user.email ci@x.y', clone)
+        _git('config user.name CI', clone)
+        clones.append(clone)
+
+    (clones[0] / 'a.py').write_text('import os\n')
+    _git('add a.py', clones[0])
+    _git('commit --quiet -m init', clones[0])
+    _git('push --quiet origin HEAD', clones[0])
+    _git('pull --quiet origin HEAD', clones[1])
+
+    return clones
+
+
+def test_share_through_remote(clones, monkeypatch: pytest.MonkeyPatch):
+    ci_clone, developer_clone = clones
+    entry_key = cache.key('lint', 'namespace', 'blob id')
+
+    monkeypatch.chdir(ci_clone)
+    storage = notes.attach('write')
+    assert storage is not None and storage.entries == {}
+    cache.put(entry_key, [['a.py', 1, 'W0611: Unused import os']])
+    notes.detach(storage, 'write')
+
+    # a different cache directory, as on another machine
+    monkeypatch.chdir(developer_clone)
+    cache.use(cache.DirectoryStorage(developer_clone / '.cache', max_size=1024))
+    storage = notes.attach('read')
+
+    assert storage is not None
+    assert storage.commit == _git('rev-parse HEAD', ci_clone)
+    assert cache.get(entry_key) == [['a.py', 1, 'W0611: Unused import os']]
+
+
+def test_read_mode_does_not_write(clones, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(clones[0])
+    storage = notes.attach('read')
+    assert storage is not None
+    cache.put(cache.key('lint', 'namespace', 'blob id'), [])
+    notes.detach(storage, 'read')
+
+    assert notes.read(storage.commit) == {}
+
+
+def test_no_remote_notes(clones, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture):
+    monkeypatch.chdir(clones[1])
+    storage = notes.attach('read')
+
+    assert storage is not None and storage.entries == {}
+    assert caplog.messages[0].startswith(
+        "Could not fetch 'refs/notes/custolint' from origin, use the local notes: fatal: "
+    )
+
+
+def test_foreign_note(clones, monkeypatch: pytest.MonkeyPatch):
+    _git('notes --ref=refs/notes/custolint add -m "reviewed" HEAD', clones[0])
+
+    monkeypatch.chdir(clones[0])
+    assert notes.read('HEAD') == {}
+
+
+def test_cache_disabled(clones, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(clones[0])
+    monkeypatch.setattr(cache, 'ENABLED', False)
+
+    assert notes.attach('read') is None
+
+
+def test_only_json_entries(clones, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(clones[0])
+    storage = notes.attach('write')
+    assert storage is not None
+    cache.storage().put(cache.key('mypy', 'archive', suffix='.tar.gz'), b'\x1f\x8b')
+
+    assert not storage.used
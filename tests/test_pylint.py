@@ -2,7 +2,7 @@ from typing import Optional
 
 import pytest
 
-from custolint import pylint
+from custolint import jobs, pylint, spill
 from pathlib import Path
 from unittest import mock
 
@@ -74,12 +74,12 @@ def test_filter_false(path: Path, message: str):
 
 
 @pytest.mark.parametrize('message, line_content', (
-    pytest.param('Some Message (missing-function-docstring)', b'def test_some_function():'),
-    pytest.param('Some Message (missing-module-docstring)', b'def test_some_function():'),
-    pytest.param('Some Message (protected-access)', b'def test_some_function():'),
-    pytest.param('todo: space-1234: do that', b'def test_some_function():'),
-    pytest.param('R0801: Similar lines in 1000 files', b'def test_some_function():'),
-    pytest.param('Some Message (missing-function-docstring)', b'def mock_get_data(*_, **__):')
+    pytest.param('Some Message (missing-function-docstring)', b'def test_some_function():\n    pass'),
+    pytest.param('Some Message (missing-module-docstring)', b'def test_some_function():\n    pass'),
+    pytest.param('Some Message (protected-access)', b'def test_some_function():\n    pass'),
+    pytest.param('todo: space-1234: do that', b'def test_some_function():\n    pass'),
+    pytest.param('R0801: Similar lines in 1000 files', b'def test_some_function():\n    pass'),
+    pytest.param('Some Message (missing-function-docstring)', b'def mock_get_data(*_, **__):\n    pass')
 ))
 def test_filter_test_functions_true(message: str, line_content: bytes):
     assert pylint._filter(
@@ -95,12 +95,32 @@ def test_filter_test_functions_true(message: str, line_content: bytes):
     )
 
 
+@pytest.mark.parametrize('symbol', pylint.disabled_in_test_files())
+def test_disabled_in_test_files(symbol: str):
+    # the messages not computed for the test files are the ones filtered out anyway
+    assert pylint._filter(
+        path=path_mock(name='test_a.py'),
+        message=f'0: Some Message ({symbol})',
+        line_number=1,
+        cache={}
+    )
+    assert pylint._lint_arguments(())['test_files_options'] == (
+        f"--disable={','.join(pylint.disabled_in_test_files())}",
+    )
+
+
+def test_disabled_in_test_files_default():
+    assert pylint.disabled_in_test_files() == [
+        'missing-module-docstring', 'protected-access', 'too-many-public-methods'
+    ]
+
+
 @pytest.mark.parametrize('message, file_name, previous_line_content, line_content, is_filtered', (
     pytest.param(
         'Some Message (missing-function-docstring)',
         'not_test_module.py',
         None,
-        'def filter_test_functions(',
+        'def filter_test_functions():',
         True,
         id='do-filter-missing-function-docstring'
     ),
@@ -132,7 +152,7 @@ def test_filter_test_functions_true(message: str, line_content: bytes):
         'Some Message (missing-function-docstring)',
         'not_test_module.py',
         None,
-        'def do_that(',
+        'def do_that():',
         False,
         id='do-not-filter'
     ),
@@ -164,7 +184,8 @@ def test_filter_no_test_functions_true(message: str,
             **{
                 'read_bytes.return_value': "\n".join((
                     (previous_line_content or ''),
-                    line_content
+                    line_content,
+                    '    pass'
                 )).encode()
             }
         ),
@@ -176,3 +197,122 @@ def test_filter_no_test_functions_true(message: str,
 
 def test_cli(non_existing_white: Contributors):
     assert pylint.cli(non_existing_white, 0, False) == SYSTEM_EXIT_CODE_DRY_AND_CLEAN
+
+
+PYLINT_JSON_OUTPUT = """[
+    {
+        "type": "convention",
+        "module": "b",
+        "obj": "",
+        "line": 1,
+        "column": 0,
+        "path": "b.py",
+        "symbol": "missing-module-docstring",
+        "message": "Missing module docstring",
+        "message-id": "C0114"
+    },
+    {
+        "type": "refactor",
+        "module": "c",
+        "obj": "",
+        "line": 3,
+        "column": 0,
+        "path": "c.py",
+        "symbol": "duplicate-code",
+        "message": "Similar lines in 2 files\\n==b:[1:3]\\n==c:[3:5]\\nimport os",
+        "message-id": "R0801"
+    }
+]"""
+
+
+@pytest.mark.parametrize('stdout, expect', (
+    pytest.param(
+        PYLINT_JSON_OUTPUT,
+        [
+            ('b.py', 1, '0: C0114: Missing module docstring (missing-module-docstring)'),
+            ('c.py', 3, '0: R0801: Similar lines in 2 files (duplicate-code)'),
+        ],
+        id='json'
+    ),
+    pytest.param('', [], id='empty'),
+    pytest.param(
+        "************* Module b\n"
+        "b.py:1:0: C0114: Missing module docstring (missing-module-docstring)\n",
+        [
+            ('b.py', 1, '0: C0114: Missing module docstring (missing-module-docstring)'),
+        ],
+        id='fallback-to-text'
+    ),
+))
+def test_parse_json_output(stdout: str, expect: list):
+    assert list(pylint._parse_json_output(stdout)) == expect
+
+
+def test_parse_json_output_spilled(caplog):
+    stdout = spill.Output()
+    stdout.file.write(PYLINT_JSON_OUTPUT.encode()[:-50])
+    stdout.file.flush()
+
+    assert list(pylint._parse_json_output(stdout)) == [
+        ('b.py', 1, '0: C0114: Missing module docstring (missing-module-docstring)'),
+    ]
+    assert caplog.messages[0].startswith('Pylint JSON output is truncated: ')
+
+
+@pytest.mark.usefixtures('cache_enabled')
+def test_duplicate_code(tmp_path: Path):
+    duplicated = ''.join(f'VALUE_{i} = {i}\n' for i in range(10))
+    paths = []
+    for name in ('a.py', 'test_b.py', 'c.py'):
+        (tmp_path / name).write_text(f'"""{name}"""\n{duplicated}')
+        paths.append(str(tmp_path / name))
+
+    with mock.patch.object(pylint.env, 'CONFIG_D', str(tmp_path)):
+        # the test file is compared with the source file
+        messages = jobs.run(pylint.duplicate_code(paths[:2]))
+        assert [message for _, _, message in messages] == [
+            '0: R0801: Similar lines in 2 files (duplicate-code)'
+        ]
+
+        with mock.patch.object(pylint.generics, '_execute_lint_command') as execute_lint_command:
+            assert jobs.run(pylint.duplicate_code(paths[:2])) == messages
+            execute_lint_command.assert_not_called()
+
+        assert jobs.run(pylint.duplicate_code(paths))
+        # a single file
+        assert not jobs.run(pylint.duplicate_code(paths[2:]))
+
+
+@pytest.mark.usefixtures('worker_threads')
+@pytest.mark.parametrize('in_process', (False, True), ids=('command', 'in-process'))
+def test_duplicate_code_reported_once(tmp_path: Path, in_process: bool):
+    duplicated = ''.join(f'VALUE_{i} = {i}\n' for i in range(10))
+    contributor = {'email': 'john@snow.eu', 'author': 'John Snow', 'date': '2023-06-01'}
+    changes = {}
+    # the test file is linted apart
+    for name in ('a.py', 'test_b.py'):
+        (tmp_path / name).write_text(f'"""{name}"""\n{duplicated}')
+        changes[str(tmp_path / name)] = {line: contributor for line in range(1, 12)}
+
+    with \
+            mock.patch.object(pylint.env, 'CONFIG_D', str(tmp_path)), \
+            mock.patch.object(pylint.env, 'IN_PROCESS', in_process), \
+            mock.patch.object(pylint.git, 'changes_async', return_value=changes):
+        lines = list(pylint.compare_with_main_branch(filters=()))
+
+    # compared across the groups, not computed by the main run as well
+    assert [line.message for line in lines if 'duplicate-code' in line.message] == [
+        '0: R0801: Similar lines in 2 files (duplicate-code)'
+    ]
+
+
+def test_lint_arguments_duplicate_code():
+    with mock.patch.object(pylint.env, 'CONFIG_D', '/not/existing'):
+        arguments = pylint._lint_arguments(())
+
+    # checked across all the files by its own job, whatever the groups of the main run
+    assert arguments['execute_command'] == \
+        'pylint  --disable=duplicate-code --output-format=json {lint_file}'
+    assert arguments['in_process'].keywords['options'] == ('--disable=duplicate-code', )
+    assert arguments['cross_file_job'] is pylint.duplicate_code
+    assert arguments['test_files_options']
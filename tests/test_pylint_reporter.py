@@ -0,0 +1,46 @@
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from pylint.lint import Run
+
+from custolint import git
+from custolint.contributors import Contributors
+
+CONTRIBUTOR = {'email': 'john@snow.eu', 'author': 'John Snow', 'date': '2023-06-01'}
+
+
+@pytest.fixture(name='lint_file')
+def _lint_file(tmp_path: Path) -> str:
+    path = tmp_path / 'module_a.py'
+    path.write_text('"""Module a"""\nimport os\nimport sys\n\n\ndef function_a():\n    return 1\n')
+    return str(path)
+
+
+def test_reporter(lint_file: str, capsys: pytest.CaptureFixture[str]):
+    changes = {lint_file: {2: CONTRIBUTOR, 6: CONTRIBUTOR}}
+
+    with mock.patch.object(git, 'changes_async', return_value=changes) as changes_async:
+        Run(['--output-format=custolint.pylint_reporter.Reporter', '--persistent=n', lint_file],
+            exit=False)
+
+    changes_async.assert_called_once()
+    assert capsys.readouterr().out.splitlines() == [
+        f'{lint_file}:6 0: C0116: Missing function or method docstring '
+        '(missing-function-docstring) ## john@snow.eu:2023-06-01',
+        # the unused ``sys`` import is not a changed line
+        f'{lint_file}:2 0: W0611: Unused import os (unused-import) ## john@snow.eu:2023-06-01',
+    ]
+
+
+def test_reporter_contributors(lint_file: str, capsys: pytest.CaptureFixture[str]):
+    changes = {lint_file: {2: CONTRIBUTOR}}
+
+    with \
+            mock.patch.object(Contributors, 'from_env',
+                              return_value=Contributors.from_cli('', 'John Snow')), \
+            mock.patch.object(git, 'changes_async', return_value=changes):
+        Run(['--load-plugins=custolint.pylint_reporter', '--output-format=custolint',
+             '--persistent=n', lint_file], exit=False)
+
+    assert not capsys.readouterr().out
@@ -0,0 +1,160 @@
+from typing import Iterator
+
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from custolint import rules
+
+
+@pytest.fixture(name='config_d')
+def fixture_config_d(tmp_path: Path) -> Iterator[Path]:
+    with mock.patch.object(rules.env, 'CONFIG_D', str(tmp_path)):
+        yield tmp_path
+
+
+def test_default_rules():
+    names = {rule.name for tool in rules.CODES for rule in rules.load(tool, [rules.DEFAULT_RULES])}
+
+    assert {'test-function-docstring', 'pydantic-validator', 'test-dummy-function'} <= names
+
+
+def test_config_d_rules(config_d: Path):
+    (config_d / 'rules.ini').write_text(
+        '[pylint:property-docstring]\n'
+        'enabled = no\n'
+        '\n'
+        '[pylint:test-fixture]\n'
+        'line = def fake_\n'
+        'test_files = yes\n'
+        '\n'
+        '[pylint:no-print]\n'
+        'codes = bad-builtin, print-used\n'
+        'line = print\\(\n'
+    )
+
+    paths = [rules.DEFAULT_RULES, config_d / 'rules.ini']
+    loaded = {rule.name: rule for rule in rules.load('pylint', paths)}
+
+    assert 'property-docstring' not in loaded
+    assert loaded['test-fixture'].line == 'def fake_'
+    assert loaded['no-print'] == rules.Rule(
+        name='no-print', codes=frozenset({'bad-builtin', 'print-used'}), line=r'print\('
+    )
+
+    matcher = rules.matcher('pylint')
+    assert matcher is rules.matcher('pylint')
+    assert matcher.skip(Path('a.py'), '0: W0141: Used builtin print (bad-builtin)', 1,
+                        {Path('a.py'): ['    print(1)']})
+
+
+@pytest.mark.parametrize('section', (
+    pytest.param('[pylint:a]\nline = (\n', id='regex'),
+    pytest.param('[pylint:a]\nlines = a\n', id='unknown-option'),
+    pytest.param('[pylint:a]\ntest_files = maybe\n', id='boolean'),
+))
+def test_invalid_rule(section: str, tmp_path: Path, caplog: pytest.LogCaptureFixture):
+    (tmp_path / 'rules.ini').write_text(section)
+
+    with pytest.raises(SystemExit):
+        rules.load('pylint', [tmp_path / 'rules.ini'])
+
+    assert caplog.messages[-1].startswith("Invalid filter rule 'pylint:a': ")
+
+
+def test_skip_dispatch(path_mock):
+    matcher = rules.Matcher([
+        # a group of its own does not shift the groups of the next rules
+        rules.Rule(name='a', codes=frozenset({'code-a'}), line='skip (me|you)'),
+        rules.Rule(name='b', codes=frozenset(), message='anything', test_files=True),
+        rules.Rule(name='c', codes=frozenset({'code-c'}), message='^0: ', previous_line='@c'),
+        rules.Rule(name='d', codes=frozenset({'code-a'}), line='^@c$'),
+    ], 'pylint')
+    path = path_mock('a.py', **{'read_bytes.return_value': b'@c\nskip me\n'})
+
+    # no rule of the code, the file is not read
+    assert not matcher.skip(path, '0: some (code-b)', 2, {})
+    path.read_bytes.assert_not_called()
+    # no rule for the test files only
+    assert not matcher.skip(path, '0: anything (code-b)', 2, {})
+
+    assert matcher.skip(path, '0: some (code-a)', 2, {})
+    assert matcher.skip(path, '0: some (code-a)', 1, {})
+    assert matcher.skip(path, '0: some (code-c)', 2, {})
+    assert not matcher.skip(path, '1: some (code-c)', 2, {})
+    assert not matcher.skip(path, '0: some (code-c)', 1, {})
+
+
+def test_skip_without_reading(path_mock):
+    matcher = rules.Matcher([
+        rules.Rule(name='a', codes=frozenset(), line='def mock_', test_files=True),
+        rules.Rule(name='b', codes=frozenset({'protected-access'}), test_files=True),
+    ], 'pylint')
+    path = path_mock('test_a.py')
+
+    assert matcher.skip(path, '0: W0212: Access to a protected member (protected-access)', 1, {})
+    path.read_bytes.assert_not_called()
+
+
+def test_test_files_codes():
+    matcher = rules.Matcher([
+        rules.Rule(name='a', codes=frozenset({'code-b', 'code-a'}), test_files=True),
+        rules.Rule(name='b', codes=frozenset({'code-c'}), line='def mock_', test_files=True),
+        rules.Rule(name='c', codes=frozenset({'code-d'})),
+        rules.Rule(name='d', codes=frozenset(), test_files=True),
+    ], 'pylint')
+
+    # only the unconditional rules of the test files, with codes
+    assert matcher.test_files_codes == ('code-a', 'code-b')
+
+
+def test_skip_scope(path_mock):
+    matcher = rules.Matcher([
+        rules.Rule(name='a', codes=frozenset({'code-a'}), scope='test_.*', signature=True),
+        rules.Rule(name='b', codes=frozenset({'code-b'}), decorator='property'),
+        rules.Rule(name='c', codes=frozenset({'code-c'}), line='pass', scope='b'),
+    ], 'pylint')
+    path = path_mock('a.py', **{'read_bytes.return_value': (
+        b'def test_a(\n'
+        b'    name,\n'
+        b'):\n'
+        b'    pass\n'
+        b'@other\n'
+        b'@property\n'
+        b'def b(self):\n'
+        b'    pass\n'
+    )})
+    cache = {}
+
+    # a multi-line signature, not the body
+    assert matcher.skip(path, '0: some (code-a)', 2, cache)
+    assert not matcher.skip(path, '0: some (code-a)', 4, cache)
+    # a stack of decorators, the whole scope
+    assert matcher.skip(path, '0: some (code-b)', 7, cache)
+    assert matcher.skip(path, '0: some (code-b)', 8, cache)
+    assert not matcher.skip(path, '0: some (code-b)', 2, cache)
+    # the whole name
+    assert matcher.skip(path, '0: some (code-c)', 8, cache)
+    assert not matcher.skip(path, '0: some (code-c)', 4, cache)
+    path.read_bytes.assert_called_once()
+
+
+def test_skip_memo(path_mock):
+    matcher = rules.Matcher([
+        rules.Rule(name='a', codes=frozenset({'code-a'}), message='skip', line='def test_'),
+    ], 'pylint')
+    message_step, line_step = matcher.buckets['code-a', False].steps
+    path = path_mock('a.py', **{'read_bytes.return_value': b'def test_a():\n    pass\n'})
+
+    assert matcher.skip(path, '0: skip (code-a)', 1, {})
+    assert not matcher.skip(path, '0: keep (code-a)', 1, {})
+    assert matcher.skip(path, '0: skip (code-a)', 1, {})
+
+    assert message_step.memo == {'0: skip (code-a)': 1, '0: keep (code-a)': 0}
+    assert line_step.memo == {'def test_a():': 1}
+
+    with mock.patch.object(rules, 'MEMO_SIZE', 1):
+        assert not matcher.skip(path, '0: skip (code-a)', 2, {})
+
+    assert line_step.memo == {'    pass': 0}
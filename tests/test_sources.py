@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+
+from custolint import generics, sources
+
+
+@pytest.mark.parametrize('data, lines', (
+    pytest.param(b'', [], id='empty'),
+    pytest.param(b'a\nb\n', ['a', 'b'], id='trailing-newline'),
+    pytest.param(b'a\r\nb\rc', ['a', 'b', 'c'], id='line-boundaries'),
+    pytest.param('é\n\nà'.encode(), ['é', '', 'à'], id='utf-8'),
+))
+def test_source(data: bytes, lines):
+    source = sources.Source(data)
+
+    assert list(source) == lines == data.decode().splitlines()
+    assert len(source) == len(lines)
+    assert source[1:] == lines[1:]
+
+
+def test_source_lazy_offsets():
+    source = sources.Source(b'a\nb\n')
+    assert source._offsets is None
+
+    assert source[-1] == 'b'
+    assert source.offsets == [0, 2, 4]
+    with pytest.raises(IndexError):
+        source[2]  # pylint: disable=pointless-statement
+
+
+def test_sources_evict():
+    contents = sources.Sources(max_size=4)
+    contents[Path('a.py')] = sources.Source(b'a\n')
+    contents[Path('b.py')] = ['b']
+    # the least recently used is evicted first
+    assert contents[Path('a.py')]
+    contents[Path('c.py')] = sources.Source(b'c\n')
+
+    assert list(contents) == [Path('a.py'), Path('c.py')]
+    assert contents.size == 4
+
+    # the last content is kept, whatever its size
+    contents[Path('d.py')] = sources.Source(b'too large')
+    assert list(contents) == [Path('d.py')]
+    assert contents.size == 9
+
+
+def test_lines_shared(tmp_path: Path):
+    path = tmp_path / 'a.py'
+    path.write_text('a = 1\n')
+
+    first = sources.lines(path, generics._LintOutput(0).cache)
+    path.write_text('a = 2\n')
+
+    # read once for the tools of the run
+    assert sources.lines(path, generics._LintOutput(0).cache) is first
+    assert first[0] == 'a = 1'
@@ -0,0 +1,67 @@
+import tracemalloc
+
+import pytest
+
+from custolint import jobs, spill
+
+
+def _spilled(content: bytes) -> spill.Output:
+    output = spill.Output()
+    output.file.write(content)
+    output.file.flush()
+    return output
+
+
+@pytest.mark.parametrize('content', (
+    pytest.param(b'', id='empty'),
+    pytest.param(b'a.py:1: message', id='no-line-ending'),
+    pytest.param(b'a.py:1: message\n', id='line-ending'),
+    pytest.param(b'\n\na.py:1: message\n\nb.py:2: \xc3\xa9\n', id='blank-lines'),
+))
+def test_text_lines(content: bytes):
+    output = _spilled(content)
+
+    assert list(spill.text_lines(output)) == content.decode().split("\n")
+    # the temporary file is removed once read
+    assert output.file.closed
+
+
+def test_lines_released():
+    output = _spilled(b'a\nb\n')
+    lines = output.lines()
+    line = next(lines)
+
+    assert bytes(line) == b'a'
+    next(lines)
+    # only valid until the next line
+    with pytest.raises(ValueError):
+        bytes(line)
+
+    lines.close()
+    output.close()
+
+
+def test_text_lines_of_lines():
+    assert list(spill.text_lines(['a', 'b'])) == ['a', 'b']
+
+
+def test_execute_spilled_output():
+    output = spill.Output()
+    jobs.run(jobs.execute('seq 3', stdout=output.file))
+
+    assert list(spill.text_lines(output)) == ['1', '2', '3', '']
+
+
+def test_flat_memory():
+    line = b'src/custolint/generics.py:79:9: W0511: TODO add parser (fixme)\n'
+    output = _spilled(line * 200_000)  # 13 MB
+
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in spill.text_lines(output))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert count == 200_001
+    assert peak < 100_000
@@ -0,0 +1,86 @@
+from typing import Iterator
+
+import json
+from collections import defaultdict
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from custolint import _typing, generics, rules, stats
+from custolint.contributors import Contributors
+
+
+@pytest.fixture(name='enabled')
+def fixture_enabled() -> Iterator[None]:
+    with \
+            mock.patch.object(stats, 'ENABLED', False), \
+            mock.patch.object(stats, 'COUNTERS', defaultdict(stats.Counter)):
+        stats.enable('10')
+        yield
+
+
+def _skip_a(path: Path, *_) -> bool:
+    return path.name == 'a.py'
+
+
+def test_instrument_disabled():
+    assert stats.instrument(_skip_a) is _skip_a
+
+
+@pytest.mark.usefixtures('enabled')
+def test_filer_output(contributors: Contributors):
+    lines = [
+        _typing.Lint('some message', 'John', 'john@snow.eu', '2023-06-01', file_name, 1)
+        for file_name in ('a.py', 'b.py', 'c.py')
+    ]
+
+    generics.filer_output([_skip_a, *lines], contributors, 0, halt=False)
+
+    counter = stats.COUNTERS[f"{__name__}._skip_a"]
+    assert (counter.evaluations, counter.hits) == (3, 1)
+    assert counter.seconds > 0
+
+
+@pytest.mark.usefixtures('enabled')
+def test_rules(path_mock):
+    matcher = rules.Matcher([
+        rules.Rule(name='a', codes=frozenset({'code-a'}), message='skip'),
+        rules.Rule(name='b', codes=frozenset({'code-a'}), line='never'),
+    ], 'pylint')
+    path = path_mock('a.py', **{'read_bytes.return_value': b'a = 1\n'})
+
+    assert matcher.skip(path, '0: skip (code-a)', 1, {})
+    assert not matcher.skip(path, '0: keep (code-a)', 1, {})
+
+    assert {name: (counter.evaluations, counter.hits)
+            for name, counter in stats.COUNTERS.items()} == {
+        'pylint:a': (2, 1),
+        'pylint:b': (2, 0),
+    }
+
+
+@pytest.mark.usefixtures('enabled')
+def test_report(tmp_path: Path, caplog: pytest.LogCaptureFixture):
+    caplog.set_level('INFO')
+    stats.count('slow', True, 2.0)
+    stats.count('fast', False, 1.0)
+    stats.count_rules(['pylint:dead'], [])
+
+    stats.report('1')
+    assert len(caplog.messages) == 2
+    assert caplog.messages[1].startswith('slow ')
+
+    stats.report(str(tmp_path / 'stats.json'))
+    assert json.loads((tmp_path / 'stats.json').read_text()) == {
+        'fast': {'evaluations': 1, 'hits': 0, 'seconds': 1.0},
+        'pylint:dead': {'evaluations': 1, 'hits': 0, 'seconds': 0.0},
+        'slow': {'evaluations': 1, 'hits': 1, 'seconds': 2.0},
+    }
+
+
+def test_enable_invalid():
+    with mock.patch.object(stats, 'ENABLED', False), pytest.raises(ValueError):
+        stats.enable('stats.txt')
+
+    assert not stats.ENABLED